@@ -5,7 +5,10 @@ from sf_trader.config import Config
 from sf_trader.dal.dao.surface_dao import SurfaceDAO
 from sf_trader.service.order_service import OrderService
 from sf_trader.service.portfolio_service import PortfolioService
+from sf_trader.service.risk_history_service import RiskHistoryService, HOLDINGS_SOURCES
+from sf_trader.service.snapshot_service import SnapshotService
 from sf_trader.service.summary_service import SummaryService
+from sf_trader.service.watch_service import WatchService
 
 
 @click.group()
@@ -22,11 +25,33 @@ def cli():
     default="config.yml",
     help="Path to configuration file",
 )
-def get_portfolio(config_path: Path):
+def warm(config_path: Path):
+    """Snapshot the data date's database slices and covariance locally"""
+    config = Config(config_path)
+    snapshot_service = SnapshotService(config)
+
+    snapshot_service.warm()
+
+
+@cli.command()
+@click.option(
+    "--config-path",
+    "-c",
+    type=click.Path(exists=True, path_type=Path),
+    default="config.yml",
+    help="Path to configuration file",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Recompute even when the stage cache holds a result for the same inputs",
+)
+def get_portfolio(config_path: Path, force: bool):
     config = Config(config_path)
     portfolio_service = PortfolioService(config)
 
-    portfolio_service.get_write_portfolio()
+    portfolio_service.get_write_portfolio(force=force)
 
 
 @cli.command()
@@ -37,11 +62,47 @@ def get_portfolio(config_path: Path):
     default="config.yml",
     help="Path to configuration file",
 )
-def get_orders(config_path: Path):
+@click.option(
+    "--turnover-penalty",
+    type=float,
+    default=0.1,
+    help="Weight on squared turnover from current holdings, 0 keeps the upstream weights",
+)
+@click.option(
+    "--live-prices",
+    is_flag=True,
+    default=False,
+    help="Value holdings at broker quotes instead of the data date's prices",
+)
+def reoptimize(config_path: Path, turnover_penalty: float, live_prices: bool):
+    """Re-solve the upstream weights against current holdings"""
+    config = Config(config_path)
+    portfolio_service = PortfolioService(config)
+
+    portfolio_service.get_write_reoptimized_portfolio(
+        turnover_penalty=turnover_penalty, live_prices=live_prices
+    )
+
+
+@cli.command()
+@click.option(
+    "--config-path",
+    "-c",
+    type=click.Path(exists=True, path_type=Path),
+    default="config.yml",
+    help="Path to configuration file",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Recompute even when the stage cache holds a result for the same inputs",
+)
+def get_orders(config_path: Path, force: bool):
     config = Config(config_path)
     order_service = OrderService(config=config)
 
-    order_service.get_write_orders()
+    order_service.get_write_orders(force=force)
 
 
 @cli.command()
@@ -52,13 +113,38 @@ def get_orders(config_path: Path):
     default="config.yml",
     help="Path to configuration file",
 )
-def get_portfolio_summary(config_path: Path):
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the summary frames to a .json, .parquet or .arrow file instead of printing",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Rows per printed table",
+)
+@click.option(
+    "--all",
+    "show_all",
+    is_flag=True,
+    help="Print every row instead of the top rows",
+)
+def get_portfolio_summary(
+    config_path: Path, output: Path | None, top: int, show_all: bool
+):
     config = Config(config_path)
     surface_dao = SurfaceDAO(config)
-    summary_service = SummaryService(config)
+    summary_service = SummaryService(config, surface_dao=surface_dao)
 
     portfolio = surface_dao.read_portfolio()
-    summary_service.get_portfolio_summary(shares=portfolio)
+    summary_service.get_portfolio_summary(
+        shares=portfolio,
+        output=str(output) if output else None,
+        top_n=None if show_all else top,
+    )
 
 
 @cli.command()
@@ -69,14 +155,68 @@ def get_portfolio_summary(config_path: Path):
     default="config.yml",
     help="Path to configuration file",
 )
-def get_orders_summary(config_path: Path):
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the summary frames to a .json, .parquet or .arrow file instead of printing",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Rows per printed table",
+)
+@click.option(
+    "--all",
+    "show_all",
+    is_flag=True,
+    help="Print every row instead of the top rows",
+)
+def get_orders_summary(
+    config_path: Path, output: Path | None, top: int, show_all: bool
+):
     config = Config(config_path)
     surface_dao = SurfaceDAO(config)
-    summary_service = SummaryService(config)
+    summary_service = SummaryService(config, surface_dao=surface_dao)
 
     orders = surface_dao.read_orders()
     portfolio = surface_dao.read_portfolio()
-    summary_service.get_orders_summary(shares=portfolio, orders=orders)
+    summary_service.get_orders_summary(
+        shares=portfolio,
+        orders=orders,
+        output=str(output) if output else None,
+        top_n=None if show_all else top,
+    )
+
+
+@cli.command()
+@click.option(
+    "--config-path",
+    "-c",
+    type=click.Path(exists=True, path_type=Path),
+    default="config.yml",
+    help="Path to configuration file",
+)
+@click.option(
+    "--refresh",
+    type=float,
+    default=1.0,
+    help="Seconds between redraws",
+)
+@click.option(
+    "--live-prices",
+    is_flag=True,
+    default=False,
+    help="Re-quote held tickers from the broker on every refresh",
+)
+def watch(config_path: Path, refresh: float, live_prices: bool):
+    """Live portfolio metrics updated incrementally as positions and prices change"""
+    config = Config(config_path)
+    watch_service = WatchService(config)
+
+    watch_service.watch(refresh_interval=refresh, live_prices=live_prices)
 
 
 @cli.command()
@@ -87,11 +227,83 @@ def get_orders_summary(config_path: Path):
     default="config.yml",
     help="Path to configuration file",
 )
-def post_orders(config_path: Path):
+@click.option(
+    "--start",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="First date of the history",
+)
+@click.option(
+    "--end",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Last date of the history (defaults to data-date)",
+)
+@click.option(
+    "--source",
+    type=click.Choice(HOLDINGS_SOURCES),
+    default="optimal-weights",
+    help="Holdings to measure: the optimal weights table or the portfolio surface replayed daily",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="data/risk_history.parquet",
+    help="Parquet file to write the time series to",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes (defaults to the number of CPUs)",
+)
+def risk_history(
+    config_path: Path,
+    start,
+    end,
+    source: str,
+    output: Path,
+    workers: int | None,
+):
+    """Daily total and active risk, exposures and position counts over a date range"""
+    config = Config(config_path)
+    risk_history_service = RiskHistoryService(config)
+
+    risk_history_service.write_risk_history(
+        start=start.date(),
+        end=end.date() if end else config.data_date,
+        output=str(output),
+        source=source,
+        workers=workers,
+    )
+
+
+@cli.command()
+@click.option(
+    "--config-path",
+    "-c",
+    type=click.Path(exists=True, path_type=Path),
+    default="config.yml",
+    help="Path to configuration file",
+)
+@click.option(
+    "--wait",
+    type=float,
+    default=0,
+    help="Seconds to follow fills after posting (0 to return immediately)",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Post only the orders of the last journaled run that were never acked",
+)
+def post_orders(config_path: Path, wait: float, resume: bool):
     config = Config(config_path)
     order_service = OrderService(config)
 
-    order_service.post_orders()
+    order_service.post_orders(wait=wait, resume=resume)
 
 
 @cli.command()
@@ -102,11 +314,40 @@ def post_orders(config_path: Path):
     default="config.yml",
     help="Path to configuration file",
 )
-def cancel_orders(config_path: Path):
+@click.option(
+    "--ticker",
+    "-t",
+    "tickers",
+    multiple=True,
+    help="Only cancel orders for this ticker (repeatable)",
+)
+@click.option(
+    "--action",
+    type=click.Choice(["BUY", "SELL"], case_sensitive=False),
+    default=None,
+    help="Only cancel orders on this side",
+)
+@click.option(
+    "--global",
+    "global_cancel",
+    is_flag=True,
+    help="Cancel every working order on the account, from any client or TWS",
+)
+def cancel_orders(
+    config_path: Path, tickers: tuple[str, ...], action: str | None, global_cancel: bool
+):
+    """Cancel this client's open orders, optionally filtered by ticker or side"""
+    if global_cancel and (tickers or action):
+        raise click.UsageError("--global can not be combined with --ticker or --action")
+
     config = Config(config_path)
     order_service = OrderService(config=config)
 
-    order_service.cancel_orders()
+    order_service.cancel_orders(
+        tickers=list(tickers) or None,
+        action=action.upper() if action else None,
+        global_cancel=global_cancel,
+    )
 
 
 @cli.command()
@@ -1,7 +1,10 @@
 import yaml
 import datetime as dt
 
-from sf_trader.dal.broker import get_broker
+from sf_trader.dal.broker import MARKET_DATA_TYPES, get_broker
+from sf_trader.dal.models.no_trade_bands import NoTradeBands
+from sf_trader.dal.models.pre_trade_limits import PreTradeLimits
+from sf_trader.dal.models.scenario_settings import ScenarioSettings, StressScenario
 
 _config = None
 
@@ -49,9 +52,163 @@ class Config:
         except ValueError as e:
             raise ConfigError(f"Invalid path configuration: {e}")
 
+        # Get covariance storage dtype
+        self.covariance_dtype = raw_config.get("covariance-dtype", "float64")
+        if self.covariance_dtype not in ("float32", "float64"):
+            raise ConfigError(
+                f"'covariance-dtype' must be 'float32' or 'float64', got {self.covariance_dtype}"
+            )
+
+        # Get snapshot directory
+        self.snapshot_dir = raw_config.get("snapshot-dir")
+
+        # Get ticker to barrid mapping index path
+        self.mapping_index_path = raw_config.get("mapping-index-path")
+
+        # Get streaming option for large DAO queries
+        self.streaming = bool(raw_config.get("streaming", False))
+
+        # Get contract cache path
+        self.contract_cache_path = raw_config.get("contract-cache-path")
+
+        # Get order event directory
+        self.order_events_dir = raw_config.get("order-events-dir")
+
+        # Get order journal path
+        self.order_journal_path = raw_config.get("order-journal-path")
+
+        # Get stage cache directory
+        self.stage_cache_dir = raw_config.get("stage-cache-dir")
+
+        # Get pre-trade check limits
+        self.pre_trade_limits = self._parse_pre_trade_limits(raw_config.get("pre-trade-checks"))
+
+        # Get no-trade bands for small order deltas
+        self.no_trade_bands = self._parse_no_trade_bands(raw_config.get("no-trade-bands"))
+
+        # Get Monte Carlo VaR and stress scenario settings
+        self.scenario_settings = self._parse_scenario_settings(raw_config.get("scenario-risk"))
+
+        # Get number of broker connections to shard orders across
+        self.connections = raw_config.get("connections", 1)
+        if not isinstance(self.connections, int) or self.connections < 1:
+            raise ConfigError("'connections' must be a positive integer")
+
+        # Get market data type for broker quotes
+        self.market_data_type = raw_config.get("market-data-type", "delayed")
+        if self.market_data_type not in MARKET_DATA_TYPES:
+            raise ConfigError(
+                f"'market-data-type' must be one of {', '.join(MARKET_DATA_TYPES)}, "
+                f"got {self.market_data_type}"
+            )
+
         # Get broker
         broker_name = raw_config.get("broker")
-        self.broker = get_broker(broker_name, self.data_date)
+        self.broker = get_broker(
+            broker_name,
+            self.data_date,
+            contract_cache_path=self.contract_cache_path,
+            connections=self.connections,
+            market_data_type=MARKET_DATA_TYPES[self.market_data_type],
+        )
+
+    @staticmethod
+    def _parse_pre_trade_limits(raw_limits: dict | None) -> PreTradeLimits | None:
+        if raw_limits is None:
+            return None
+        if not isinstance(raw_limits, dict):
+            raise ConfigError("'pre-trade-checks' must be a mapping of limits")
+
+        limits = {}
+        for key in (
+            "max-order-notional",
+            "max-order-pct-account",
+            "max-gross-turnover-pct",
+            "max-price-deviation-pct",
+        ):
+            value = raw_limits.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                raise ConfigError(f"'pre-trade-checks.{key}' must be a positive number")
+            limits[key.replace("-", "_")] = None if value is None else float(value)
+
+        restricted_tickers = raw_limits.get("restricted-tickers", [])
+        if not isinstance(restricted_tickers, list):
+            raise ConfigError("'pre-trade-checks.restricted-tickers' must be a list of tickers")
+
+        return PreTradeLimits(
+            **limits,
+            restricted_tickers=restricted_tickers,
+            restricted_list_path=raw_limits.get("restricted-list-path"),
+        )
+
+    @staticmethod
+    def _parse_no_trade_bands(raw_bands: dict | None) -> NoTradeBands | None:
+        if raw_bands is None:
+            return None
+        if not isinstance(raw_bands, dict):
+            raise ConfigError("'no-trade-bands' must be a mapping of bands")
+
+        bands = {}
+        for key in ("pct-target-weight", "min-notional", "min-shares"):
+            value = raw_bands.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                raise ConfigError(f"'no-trade-bands.{key}' must be a positive number")
+            bands[key.replace("-", "_")] = None if value is None else float(value)
+
+        return NoTradeBands(**bands)
+
+    @staticmethod
+    def _parse_scenario_settings(raw_settings: dict | None) -> ScenarioSettings | None:
+        if raw_settings is None:
+            return None
+        if not isinstance(raw_settings, dict):
+            raise ConfigError("'scenario-risk' must be a mapping of settings")
+
+        settings = {}
+        for key in ("simulations", "chunk-size", "horizon-days"):
+            value = raw_settings.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, int) or value < 1:
+                raise ConfigError(f"'scenario-risk.{key}' must be a positive integer")
+            settings[key.replace("-", "_")] = value
+
+        confidence_levels = raw_settings.get("confidence-levels", [0.95, 0.99])
+        if not isinstance(confidence_levels, list) or not all(
+            isinstance(level, float) and 0 < level < 1 for level in confidence_levels
+        ):
+            raise ConfigError("'scenario-risk.confidence-levels' must be a list of fractions")
+
+        stress_scenarios = []
+        for raw_scenario in raw_settings.get("stress-scenarios", []):
+            name = raw_scenario.get("name")
+            date = raw_scenario.get("date")
+            market_shock = raw_scenario.get("market-shock")
+            if not name or (date is None) == (market_shock is None):
+                raise ConfigError(
+                    "Each 'scenario-risk.stress-scenarios' entry needs a name and "
+                    "exactly one of 'date' or 'market-shock'"
+                )
+            if isinstance(date, str):
+                try:
+                    date = dt.datetime.strptime(date, "%Y-%m-%d").date()
+                except ValueError as e:
+                    raise ConfigError(f"Invalid stress scenario date for '{name}': {e}")
+
+            stress_scenarios.append(
+                StressScenario(
+                    name=name,
+                    date=date,
+                    market_shock=None if market_shock is None else float(market_shock),
+                )
+            )
+
+        return ScenarioSettings(
+            **settings,
+            confidence_levels=confidence_levels,
+            seed=raw_settings.get("seed"),
+            stress_scenarios=stress_scenarios,
+        )
 
 
 def set_config(config: Config) -> None:
@@ -0,0 +1,489 @@
+import asyncio
+import itertools
+import threading
+import time
+import polars as pl
+
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+from sf_trader.dal.broker.async_broker_client import AsyncBrokerClient
+from sf_trader.dal.broker.broker_client import SubmittedCallback
+from sf_trader.dal.broker.contract_cache import ContractCache, ticker_from_ibkr_symbol_expr
+from sf_trader.dal.broker.positions_cache import PositionsCache
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+    PricesSchema,
+    SharesSchema,
+    CancellationsSchema,
+    OpenOrdersSchema,
+)
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+from ibapi.sync_wrapper import TWSSyncWrapper, Contract, Order, OrderCancel
+from ibapi.account_summary_tags import AccountSummaryTags
+from rich import print
+
+if TYPE_CHECKING:
+    from sf_trader.dal.broker.IB_gateway_client import IBGatewayClient
+    from sf_trader.dal.broker.ibkr_client import IBKRClient
+
+# Error codes that are informational for the request they are attached to
+NON_FATAL_ERROR_CODES = {399, 2104, 2106, 2107, 2108, 2158, 10167}
+ORDER_CANCELLED_CODE = 202
+
+# reqMarketDataType values, delayed data needs no market data subscription
+MARKET_DATA_TYPES = {"live": 1, "frozen": 2, "delayed": 3, "delayed-frozen": 4}
+DELAYED_MARKET_DATA = MARKET_DATA_TYPES["delayed"]
+
+# Bid, ask and last price ticks (live and delayed)
+PRICE_TICKS = {1: "bid", 2: "ask", 4: "last", 66: "bid", 67: "ask", 68: "last"}
+
+
+class PendingRequests:
+    """Asyncio futures keyed by request, resolved from the IB reader thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, tuple[asyncio.AbstractEventLoop, asyncio.Future, list]] = {}
+
+    def open(self, key: Hashable) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._pending[key] = (loop, future, [])
+        return future
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def append(self, key: Hashable, item: Any) -> None:
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry[2].append(item)
+
+    def resolve(self, key: Hashable, result: Any = None) -> None:
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+
+        loop, future, items = entry
+        value = items if result is None else result
+        loop.call_soon_threadsafe(lambda: future.done() or future.set_result(value))
+
+    def fail(self, key: Hashable, error: Exception) -> None:
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+
+        loop, future, _ = entry
+        loop.call_soon_threadsafe(lambda: future.done() or future.set_exception(error))
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+
+class AsyncIBGatewayClient(AsyncBrokerClient):
+    """Async IB client whose requests are futures resolved from IB callbacks.
+
+    Shares the connection of a TWSSyncWrapper; callbacks are chained so the sync
+    wrapper keeps working alongside it.
+    """
+
+    def __init__(
+        self,
+        app: TWSSyncWrapper,
+        contract_cache: ContractCache | None = None,
+        positions_cache: PositionsCache | None = None,
+        timeout: float = 30,
+        max_in_flight: int = 50,
+        max_messages_per_second: float = 45,
+        market_data_type: int = DELAYED_MARKET_DATA,
+    ) -> None:
+        self._app = app
+        self._market_data_type = market_data_type
+        self._contract_cache = contract_cache or ContractCache()
+        self._positions_cache = positions_cache
+        self._timeout = timeout
+        self._max_in_flight = max_in_flight
+        self._message_interval = 1 / max_messages_per_second
+        self._last_message_time = 0.0
+        self._pace_lock = asyncio.Lock()
+        self._order_id_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1_000_000)
+        self._next_order_id: int | None = None
+
+        self._requests = PendingRequests()
+        self._order_acks = PendingRequests()
+        self._order_cancels = PendingRequests()
+        self._install_callbacks()
+
+    @classmethod
+    def from_client(
+        cls, client: "IBGatewayClient | IBKRClient", **kwargs
+    ) -> "AsyncIBGatewayClient":
+        return cls(
+            client._app,
+            contract_cache=client._contract_cache,
+            positions_cache=client._positions_cache,
+            market_data_type=client._market_data_type,
+            **kwargs,
+        )
+
+    def _chain(self, name: str, handler: Callable[..., None]) -> None:
+        original = getattr(self._app, name)
+
+        def chained(*args):
+            result = original(*args)
+            handler(*args)
+            return result
+
+        setattr(self._app, name, chained)
+
+    def _install_callbacks(self) -> None:
+        self._chain("nextValidId", self._on_next_valid_id)
+        self._chain("accountSummary", self._on_account_summary)
+        self._chain("accountSummaryEnd", self._on_account_summary_end)
+        self._chain("position", self._on_position)
+        self._chain("positionEnd", self._on_position_end)
+        self._chain("tickPrice", self._on_tick_price)
+        self._chain("tickSnapshotEnd", self._on_tick_snapshot_end)
+        self._chain("openOrder", self._on_open_order)
+        self._chain("openOrderEnd", self._on_open_order_end)
+        self._chain("orderStatus", self._on_order_status)
+        self._chain("error", self._on_error)
+
+    # Callbacks (IB reader thread)
+
+    def _on_next_valid_id(self, order_id: int) -> None:
+        self._requests.resolve("next_valid_id", order_id)
+
+    def _on_account_summary(self, req_id, account, tag, value, currency) -> None:
+        self._requests.append(req_id, (account, tag, value))
+
+    def _on_account_summary_end(self, req_id) -> None:
+        self._requests.resolve(req_id)
+
+    def _on_position(self, account, contract, position, avg_cost) -> None:
+        self._requests.append("positions", (account, contract.symbol, float(position)))
+
+    def _on_position_end(self) -> None:
+        self._requests.resolve("positions")
+
+    def _on_tick_price(self, req_id, tick_type, price, attrib) -> None:
+        if tick_type in PRICE_TICKS and price > 0:
+            self._requests.append(req_id, (PRICE_TICKS[tick_type], price))
+
+    def _on_tick_snapshot_end(self, req_id) -> None:
+        self._requests.resolve(req_id)
+
+    def _on_open_order(self, order_id, contract, order, order_state) -> None:
+        shares = float(order.totalQuantity)
+        # filledQuantity is left unset (a huge sentinel) until the order trades
+        filled = float(getattr(order, "filledQuantity", 0) or 0)
+        self._requests.append(
+            "open_orders",
+            {
+                "order_id": order_id,
+                "ticker": contract.symbol,
+                "action": order.action,
+                "shares": shares,
+                "remaining": shares - filled if 0 <= filled <= shares else shares,
+            },
+        )
+
+    def _on_open_order_end(self) -> None:
+        self._requests.resolve("open_orders")
+
+    def _on_order_status(self, order_id, status, *args) -> None:
+        self._order_acks.resolve(order_id, status)
+        if status in ("Cancelled", "ApiCancelled"):
+            self._order_cancels.resolve(order_id, status)
+
+    def _on_error(self, *args) -> None:
+        if len(args) == 4:
+            req_id, error_code, error_string, _ = args
+        elif len(args) == 5:
+            req_id, _, error_code, error_string, _ = args
+        else:
+            return
+
+        if error_code == ORDER_CANCELLED_CODE:
+            self._order_cancels.resolve(req_id, "Cancelled")
+            return
+
+        if error_code in NON_FATAL_ERROR_CODES:
+            return
+
+        error = RuntimeError(f"{error_code} {error_string}")
+        self._order_acks.fail(req_id, error)
+        self._order_cancels.fail(req_id, error)
+        self._requests.fail(req_id, error)
+
+    # Helpers (event loop)
+
+    async def _pace(self) -> None:
+        """Keep outgoing messages under the IB message rate limit."""
+        async with self._pace_lock:
+            wait = self._last_message_time + self._message_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_message_time = time.monotonic()
+
+    async def _wait(self, requests: PendingRequests, key: Hashable, future: asyncio.Future) -> Any:
+        try:
+            return await asyncio.wait_for(future, self._timeout)
+        finally:
+            requests.discard(key)
+
+    async def _get_next_order_id(self) -> int:
+        async with self._order_id_lock:
+            if self._next_order_id is None:
+                future = self._requests.open("next_valid_id")
+                self._app.reqIds(-1)
+                self._next_order_id = await self._wait(self._requests, "next_valid_id", future)
+
+            order_id = self._next_order_id
+            self._next_order_id += 1
+            return order_id
+
+    @staticmethod
+    def _build_order(order_: dict) -> Order:
+        order = Order()
+        order.action = order_.get("action")
+        order.orderType = "MKT"
+        order.totalQuantity = order_.get("shares")
+        order.tif = 'DAY'
+        return order
+
+    # Broker interface
+
+    async def get_prices(self, tickers: list[str]) -> PricesDF:
+        semaphore = asyncio.Semaphore(self._max_in_flight)
+        self._app.reqMarketDataType(self._market_data_type)
+
+        async def get_price(ticker: str) -> dict | None:
+            async with semaphore:
+                req_id = next(self._request_ids)
+                contract = Contract()
+                contract.symbol = ticker.replace(".", " ")
+                contract.secType = "STK"
+                contract.exchange = "SMART"
+                contract.currency = "USD"
+
+                future = self._requests.open(req_id)
+                await self._pace()
+                self._app.reqMktData(req_id, contract, "", True, False, [])
+                try:
+                    ticks = dict(await self._wait(self._requests, req_id, future))
+                except Exception:
+                    return None
+
+            price = ticks.get("last")
+            if price is None and "bid" in ticks and "ask" in ticks:
+                price = (ticks["bid"] + ticks["ask"]) / 2
+
+            return None if price is None else {"ticker": ticker, "price": price}
+
+        results = await asyncio.gather(*(get_price(ticker) for ticker in tickers))
+        prices = pl.DataFrame(
+            [result for result in results if result is not None],
+            schema={"ticker": pl.String, "price": pl.Float64},
+        ).pipe(encode_tickers)
+
+        return PricesSchema.validate(prices)
+
+    async def get_account_value(self) -> float:
+        req_id = next(self._request_ids)
+        future = self._requests.open(req_id)
+        self._app.reqAccountSummary(req_id, "All", AccountSummaryTags.NetLiquidation)
+        try:
+            rows = await self._wait(self._requests, req_id, future)
+        finally:
+            self._app.cancelAccountSummary(req_id)
+
+        client_account_id = rows[0][0]
+        return float(
+            next(
+                value
+                for account, tag, value in rows
+                if account == client_account_id and tag == "NetLiquidation"
+            )
+        )
+
+    async def get_positions(self) -> SharesDF:
+        # A snapshot request would cancel the connection's position subscription
+        if self._positions_cache is not None:
+            self._positions_cache.subscribe(self._app)
+            return await asyncio.to_thread(self._positions_cache.get_positions, self._timeout)
+
+        future = self._requests.open("positions")
+        self._app.reqPositions()
+        try:
+            rows = await self._wait(self._requests, "positions", future)
+        finally:
+            self._app.cancelPositions()
+
+        client_account_id = rows[0][0] if rows else None
+        positions = (
+            pl.DataFrame(
+                [(symbol, shares) for account, symbol, shares in rows if account == client_account_id],
+                schema={"ticker": pl.String, "shares": pl.Float64},
+                orient="row",
+            )
+            .with_columns(ticker_from_ibkr_symbol_expr())
+            .pipe(encode_tickers)
+        )
+
+        return SharesSchema.validate(positions)
+
+    async def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        orders = await asyncio.to_thread(
+            self._contract_cache.prepare_orders, self._app, orders.with_row_index("index")
+        )
+        semaphore = asyncio.Semaphore(self._max_in_flight)
+
+        async def post_order(order_: dict) -> None:
+            async with semaphore:
+                order_id = await self._get_next_order_id()
+                future = self._order_acks.open(order_id)
+                await self._pace()
+                self._app.placeOrder(
+                    order_id, self._contract_cache.build_contract(order_), self._build_order(order_)
+                )
+                try:
+                    await self._wait(self._order_acks, order_id, future)
+                    print(
+                        f"✓ {order_.get('ticker')}: {order_.get('action')} {order_.get('shares')} @ MKT"
+                    )
+                except Exception as e:
+                    print(f"✗ Error placing order for {order_.get('ticker')}: {str(e)}")
+                else:
+                    if on_submitted is not None:
+                        on_submitted(order_.get("index"))
+
+        await asyncio.gather(*(post_order(order_) for order_ in orders.to_dicts()))
+
+    async def get_open_orders(self, all_clients: bool = True) -> OpenOrdersDF:
+        """Working orders in one request, from every API client or only this connection's."""
+        future = self._requests.open("open_orders")
+        if all_clients:
+            self._app.reqAllOpenOrders()
+        else:
+            self._app.reqOpenOrders()
+        rows = await self._wait(self._requests, "open_orders", future)
+
+        open_orders = (
+            pl.DataFrame(
+                rows,
+                schema={
+                    "order_id": pl.Int64,
+                    "ticker": pl.String,
+                    "action": pl.String,
+                    "shares": pl.Float64,
+                    "remaining": pl.Float64,
+                },
+            )
+            .with_columns(ticker_from_ibkr_symbol_expr())
+            # An order is re-sent when its status changes mid snapshot, keep the latest
+            .unique("order_id", keep="last", maintain_order=True)
+            .pipe(encode_tickers)
+        )
+
+        return OpenOrdersSchema.validate(open_orders)
+
+    async def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        if global_cancel and (tickers is not None or action is not None):
+            raise ValueError("A global cancel can not be filtered by ticker or action")
+
+        # Orders can only be cancelled by the connection that placed them, unless globally
+        open_orders = await self.get_open_orders(all_clients=global_cancel)
+
+        if tickers is not None:
+            open_orders = open_orders.filter(pl.col("ticker").is_in(tickers))
+        if action is not None:
+            open_orders = open_orders.filter(pl.col("action") == action)
+
+        if open_orders.is_empty():
+            print("No open orders to cancel")
+            return CancellationsSchema.validate(CancellationsSchema.create_empty().pipe(encode_tickers))
+
+        print(f"Found {open_orders.height} open order(s) to cancel")
+
+        order_ids = open_orders["order_id"].to_list()
+        futures = {order_id: self._order_cancels.open(order_id) for order_id in order_ids}
+        start = time.monotonic()
+
+        async def await_cancel(order_id: int) -> dict:
+            try:
+                status = await self._wait(self._order_cancels, order_id, futures[order_id])
+                error = None
+            except Exception as e:
+                status = "Failed"
+                error = str(e) or type(e).__name__
+
+            return {
+                "order_id": order_id,
+                "status": status,
+                "latency_ms": (time.monotonic() - start) * 1000,
+                "error": error,
+            }
+
+        async def send_cancel(order_id: int) -> None:
+            await self._pace()
+            self._app.cancelOrder(order_id, OrderCancel())
+
+        if global_cancel:
+            # One message cancels every working order on the account, from any client
+            self._app.reqGlobalCancel(OrderCancel())
+            results = await asyncio.gather(*(await_cancel(order_id) for order_id in order_ids))
+        else:
+            # Pipeline the per-order cancels and collect confirmations as they arrive
+            waiters = [asyncio.ensure_future(await_cancel(order_id)) for order_id in order_ids]
+            for order_id in order_ids:
+                await send_cancel(order_id)
+            results = await asyncio.gather(*waiters)
+
+        cancellations = (
+            open_orders.drop("remaining").join(
+                pl.DataFrame(
+                    results,
+                    schema={
+                        "order_id": pl.Int64,
+                        "status": pl.String,
+                        "latency_ms": pl.Float64,
+                        "error": pl.String,
+                    },
+                ),
+                on="order_id",
+                how="left",
+            )
+            .with_columns(
+                pl.when(pl.col("status") == "Failed")
+                .then(None)
+                .otherwise(pl.col("latency_ms"))
+                .alias("latency_ms")
+            )
+            .pipe(encode_tickers)
+        )
+
+        failed = cancellations.filter(pl.col("status") == "Failed")
+        for order_ in failed.to_dicts():
+            print(f"✗ Error cancelling order {order_['order_id']}: {order_['error']}")
+
+        print(f"✓ Cancelled {cancellations.height - failed.height}/{cancellations.height} order(s)")
+
+        return CancellationsSchema.validate(cancellations)
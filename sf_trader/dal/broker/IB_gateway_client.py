@@ -1,10 +1,26 @@
 import polars as pl
 import time
 
-from sf_trader.dal.broker.broker_client import BrokerClient
-from sf_trader.dal.models.schema_models import PricesDF, OrdersDF, SharesDF, SharesSchema
-from ibapi.sync_wrapper import TWSSyncWrapper, Contract, Order, OrderCancel
+from sf_trader.dal.broker.broker_client import BrokerClient, SubmittedCallback
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+    SubmissionsDF,
+    SubmissionsSchema,
+)
+from ibapi.sync_wrapper import TWSSyncWrapper, Order
 from ibapi.account_summary_tags import AccountSummaryTags
+from sf_trader.dal.broker.contract_cache import ContractCache
+from sf_trader.dal.broker.order_tracker import OrderTracker
+from sf_trader.dal.broker.positions_cache import PositionsCache
+from sf_trader.dal.broker.async_broker_client import SyncBrokerAdapter
+from sf_trader.dal.broker.IB_gateway_async_client import (
+    AsyncIBGatewayClient,
+    DELAYED_MARKET_DATA,
+)
 from rich import print
 
 
@@ -17,9 +33,20 @@ class IBGatewayClient(BrokerClient):
         client_id: int = 8675309,
         timeout: int = 30,
         connect: bool = True,
+        contract_cache_path: str | None = None,
+        contract_cache: ContractCache | None = None,
+        market_data_type: int = DELAYED_MARKET_DATA,
     ) -> None:
+        self._client_id = client_id
+        self._market_data_type = market_data_type
+        self._contract_cache = contract_cache or ContractCache(contract_cache_path)
+        self._async_client: SyncBrokerAdapter | None = None
         self._app = app or TWSSyncWrapper(timeout=timeout)
         self._install_ib_message_filter()
+        self._order_tracker = OrderTracker()
+        self._order_tracker.attach(self._app)
+        self._positions_cache = PositionsCache()
+        self._positions_cache.attach(self._app)
 
         if connect:
             if not self._app.connect_and_start(
@@ -31,6 +58,15 @@ class IBGatewayClient(BrokerClient):
             
         print("Connected to IB Gateway")
 
+    @property
+    def app(self) -> TWSSyncWrapper:
+        """The wrapper this client's connection runs on."""
+        return self._app
+
+    @property
+    def client_id(self) -> int:
+        return self._client_id
+
     def _install_ib_message_filter(self) -> None:
         original_error = self._app.error
 
@@ -59,27 +95,9 @@ class IBGatewayClient(BrokerClient):
             return original_error(*args)
 
         self._app.error = filtered_error
-    
-    @staticmethod
-    def _convert_ticker_to_ibkr_format(ticker: str) -> str:
-        """Convert ticker format from BRK.B to BRK B for IBKR API."""
-        return ticker.replace(".", " ")
-
-    @staticmethod
-    def _convert_ticker_from_ibkr_format(ticker: str) -> str:
-        """Convert ticker format from BRK B to BRK.B from IBKR API."""
-        return ticker.replace(" ", ".")
-
-    def _build_stock_contract(self, ticker: str) -> Contract:
-        contract = Contract()
-        contract.symbol = self._convert_ticker_to_ibkr_format(ticker)
-        contract.secType = "STK"
-        contract.exchange = "SMART"
-        contract.currency = "USD"
-        return contract
 
     def get_prices(self, tickers: list[str]) -> PricesDF:
-        raise NotImplementedError("Implement market data retrieval for IB Gateway")
+        return self._get_async_client().get_prices(tickers)
 
     def get_account_value(self) -> float:
         account_summary: dict[str, dict[str, dict[str, str]]] = (
@@ -91,16 +109,24 @@ class IBGatewayClient(BrokerClient):
         )
         return float(net_liquidation_value)
 
-    def post_orders(self, orders: OrdersDF) -> None:
-        for order_ in orders.to_dicts():
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        self.submit_orders(orders, on_submitted)
+
+    def submit_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> SubmissionsDF:
+        """Place orders in sequence on this connection and report the outcome of each."""
+        # Outcomes are matched back by row, a ticker can have more than one order
+        if "index" not in orders.columns:
+            orders = orders.with_row_index("index")
+        prepared = self._contract_cache.prepare_orders(self._app, orders)
+        results = []
+
+        for order_ in prepared.to_dicts():
             try:
-                contract = Contract()
-                contract.symbol = self._convert_ticker_to_ibkr_format(
-                    order_.get("ticker")
-                )
-                contract.secType = "STK"
-                contract.exchange = "SMART"
-                contract.currency = "USD"
+                contract = self._contract_cache.build_contract(order_)
 
                 order = Order()
                 order.action = order_.get("action")
@@ -113,70 +139,78 @@ class IBGatewayClient(BrokerClient):
                 print(
                     f"✓ {order_.get('ticker')}: {order_.get('action')} {order_.get('shares')} @ MKT"
                 )
+                results.append({"index": order_.get("index"), "status": "Submitted", "error": None})
             except Exception as e:
                 error_msg = str(e)
                 if "No security definition" in error_msg or "200" in error_msg:
                     print(f"⚠ Skipping {order_.get('ticker')}: Security not found")
+                    status = "Skipped"
                 else:
                     print(
                         f"✗ Error placing order for {order_.get('ticker')}: {error_msg}"
                     )
+                    status = "Failed"
+                results.append({"index": order_.get("index"), "status": status, "error": error_msg})
+            else:
+                if on_submitted is not None:
+                    on_submitted(order_.get("index"))
 
             time.sleep(0.1)
 
-    def get_positions(self) -> SharesDF:
-        positions_summary: dict[str, list[dict]] = self._app.get_positions()
-        client_account_id = list(positions_summary.keys())[0]
-        positions_raw = positions_summary.get(client_account_id)
-
-        positions_list = [
-            {
-                "ticker": self._convert_ticker_from_ibkr_format(
-                    position.get("contract").symbol
-                ),
-                "shares": float(position.get("position")),
-            }
-            for position in positions_raw
-        ]
+        outcomes = pl.DataFrame(
+            results,
+            schema={"index": orders.schema["index"], "status": pl.String, "error": pl.String},
+        )
 
-        positions = pl.DataFrame(positions_list)
+        # Orders dropped by contract resolution never reach the broker
+        submissions = (
+            orders.select("index", "ticker", "action", "shares")
+            .join(outcomes, on="index", how="left", maintain_order="left")
+            .drop("index")
+            .with_columns(
+                pl.lit(self._client_id, dtype=pl.Int64).alias("client_id"),
+                pl.col("status").fill_null("Skipped"),
+                pl.col("error").fill_null(
+                    pl.when(pl.col("status").is_null()).then(pl.lit("Security not found"))
+                ),
+            )
+        )
 
-        return SharesSchema.validate(positions)
+        return SubmissionsSchema.validate(submissions)
 
-    def cancel_orders(self) -> None:
-        try:
-            # Get all open orders
-            open_orders = self._app.get_open_orders()
+    def get_positions(self) -> SharesDF:
+        # Served from the position subscription instead of a fresh snapshot
+        self._positions_cache.subscribe(self._app)
+        return self._positions_cache.get_positions()
 
-            if not open_orders:
-                print("No open orders to cancel")
-                return
+    def get_order_tracker(self) -> OrderTracker:
+        return self._order_tracker
 
-            print(f"Found {len(open_orders)} open order(s)")
+    def get_positions_cache(self) -> PositionsCache:
+        return self._positions_cache
 
-            # Cancel each order individually
-            cancelled_count = 0
-            for order_id, order_data in open_orders.items():
-                try:
-                    order_cancel = OrderCancel()
-                    self._app.cancel_order_sync(order_id, orderCancel=order_cancel)
-                    ticker = self._convert_ticker_from_ibkr_format(
-                        order_data.get("contract").symbol
-                    )
-                    action = order_data.get("order").action
-                    quantity = order_data.get("order").totalQuantity
-                    print(f"✓ Cancelled order {order_id}: {ticker} {action} {quantity}")
-                    cancelled_count += 1
-                    time.sleep(0.1)
-                except Exception as e:
-                    print(f"✗ Error cancelling order {order_id}: {str(e)}")
+    def _get_async_client(self) -> SyncBrokerAdapter:
+        """Callback-driven client sharing this connection, for pipelined requests."""
+        if self._async_client is None:
+            self._async_client = SyncBrokerAdapter(AsyncIBGatewayClient.from_client(self))
+        return self._async_client
 
-            print(f"✓ Cancelled {cancelled_count}/{len(open_orders)} order(s)")
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return self._get_async_client().cancel_orders(tickers, action, global_cancel)
 
-        except Exception as e:
-            print(f"✗ Error getting open orders: {str(e)}")
+    def get_open_orders(self) -> OpenOrdersDF:
+        return self._get_async_client().get_open_orders()
 
     def disconnect(self) -> None:
+        if getattr(self, "_async_client", None) is not None:
+            self._async_client.close()
+            self._async_client = None
+
         if hasattr(self, "_app") and self._app is not None:
             self._app.disconnect_and_stop()
             print("Disconnected from IB Gateway")
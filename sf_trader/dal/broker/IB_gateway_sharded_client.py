@@ -0,0 +1,144 @@
+import polars as pl
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sf_trader.dal.broker.broker_client import BrokerClient, SubmittedCallback
+from sf_trader.dal.broker.IB_gateway_client import IBGatewayClient
+from sf_trader.dal.broker.contract_cache import ContractCache
+from sf_trader.dal.broker.IB_gateway_async_client import DELAYED_MARKET_DATA
+from sf_trader.dal.broker.order_tracker import MergedOrderTracker
+from sf_trader.dal.broker.positions_cache import PositionsCache
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+    SubmissionsDF,
+    CancellationsSchema,
+    SubmissionsSchema,
+)
+from rich import print
+
+
+class ShardedIBGatewayClient(BrokerClient):
+    """Pool of IB Gateway connections with orders sharded across them by ticker.
+
+    Each connection has its own client ID and message-rate limit. Orders for a ticker
+    always land on the same connection, so they are placed in their original order.
+    """
+
+    def __init__(
+        self,
+        connections: int = 2,
+        host: str = "127.0.0.1",
+        port: int = 4002,
+        client_id: int = 8675309,
+        timeout: int = 30,
+        contract_cache_path: str | None = None,
+        market_data_type: int = DELAYED_MARKET_DATA,
+    ) -> None:
+        # Contracts are resolved once and shared by every connection
+        self._contract_cache = ContractCache(contract_cache_path)
+        self._clients = [
+            IBGatewayClient(
+                host=host,
+                port=port,
+                client_id=client_id + shard,
+                timeout=timeout,
+                contract_cache=self._contract_cache,
+                market_data_type=market_data_type,
+            )
+            for shard in range(connections)
+        ]
+        self._order_tracker = MergedOrderTracker(
+            {client.client_id: client.get_order_tracker() for client in self._clients}
+        )
+
+    @property
+    def _primary(self) -> IBGatewayClient:
+        return self._clients[0]
+
+    def shard_orders(self, orders: OrdersDF) -> dict[int, pl.DataFrame]:
+        """Split orders by ticker hash into one frame per connection."""
+        shards = orders.with_columns(
+            (pl.col("ticker").cast(pl.String).hash() % len(self._clients)).alias("shard")
+        ).partition_by("shard", as_dict=True, include_key=False, maintain_order=True)
+
+        return {shard: frame for (shard,), frame in shards.items()}
+
+    def get_prices(self, tickers: list[str]) -> PricesDF:
+        return self._primary.get_prices(tickers)
+
+    def get_account_value(self) -> float:
+        return self._primary.get_account_value()
+
+    def get_positions(self) -> SharesDF:
+        return self._primary.get_positions()
+
+    def get_positions_cache(self) -> PositionsCache:
+        return self._primary.get_positions_cache()
+
+    def get_order_tracker(self) -> MergedOrderTracker:
+        # Each connection tracks the orders it placed
+        return self._order_tracker
+
+    def get_open_orders(self) -> OpenOrdersDF:
+        # One connection sees the working orders of every client ID
+        return self._primary.get_open_orders()
+
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        self.submit_orders(orders, on_submitted)
+
+    def submit_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> SubmissionsDF:
+        """Submit each shard on its own connection in parallel and merge the reports."""
+        self._contract_cache.resolve(self._primary.app, orders["ticker"].to_list())
+        # Row indexes are kept through sharding so outcomes match the original orders
+        shards = self.shard_orders(orders.with_row_index("index"))
+
+        with ThreadPoolExecutor(max_workers=len(shards) or 1) as executor:
+            reports = list(
+                executor.map(
+                    lambda shard: self._clients[shard].submit_orders(shards[shard], on_submitted),
+                    shards,
+                )
+            )
+
+        if not reports:
+            return SubmissionsSchema.create_empty()
+
+        submissions = pl.concat(reports)
+
+        summary = submissions.group_by("status").len().sort("status")
+        print(
+            f"Submitted {orders.height} order(s) over {len(shards)} connection(s): "
+            + ", ".join(f"{row['len']} {row['status']}" for row in summary.to_dicts())
+        )
+
+        return SubmissionsSchema.validate(submissions)
+
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        # One global cancel covers every connection
+        if global_cancel:
+            return self._primary.cancel_orders(tickers, action, global_cancel=True)
+
+        # Orders can only be cancelled from the connection that placed them
+        with ThreadPoolExecutor(max_workers=len(self._clients)) as executor:
+            reports = list(
+                executor.map(lambda client: client.cancel_orders(tickers, action), self._clients)
+            )
+
+        return CancellationsSchema.validate(pl.concat(reports))
+
+    def disconnect(self) -> None:
+        for client in self._clients:
+            client.disconnect()
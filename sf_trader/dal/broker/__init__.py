@@ -1,18 +1,52 @@
 from .broker_client import BrokerClient
 from .ibkr_client import IBKRClient
 from .IB_gateway_client import IBGatewayClient
+from .IB_gateway_sharded_client import ShardedIBGatewayClient
 from .test_client import TestClient
+from .contract_cache import ContractCache
+from .async_broker_client import AsyncBrokerClient, AsyncBrokerAdapter, SyncBrokerAdapter
+from .IB_gateway_async_client import AsyncIBGatewayClient, MARKET_DATA_TYPES, DELAYED_MARKET_DATA
+from .async_test_client import AsyncTestClient
 import datetime as dt
 
 
-def get_broker(broker_name: str, data_date: dt.date) -> BrokerClient:
+def get_broker(
+    broker_name: str,
+    data_date: dt.date,
+    contract_cache_path: str | None = None,
+    connections: int = 1,
+    market_data_type: int = DELAYED_MARKET_DATA,
+) -> BrokerClient:
     match broker_name:
         case "ibkr":
-            return IBKRClient()
+            return IBKRClient(
+                contract_cache_path=contract_cache_path, market_data_type=market_data_type
+            )
+        case "ib" if connections > 1:
+            return ShardedIBGatewayClient(
+                connections=connections,
+                contract_cache_path=contract_cache_path,
+                market_data_type=market_data_type,
+            )
         case "ib":
-            return IBGatewayClient()
+            return IBGatewayClient(
+                contract_cache_path=contract_cache_path, market_data_type=market_data_type
+            )
         case "test":
             return TestClient(data_date)
 
 
-__all__ = ["BrokerClient", "IBKRClient", "IBGatewayClient", "TestClient"]
+__all__ = [
+    "BrokerClient",
+    "IBKRClient",
+    "IBGatewayClient",
+    "ShardedIBGatewayClient",
+    "TestClient",
+    "ContractCache",
+    "AsyncBrokerClient",
+    "AsyncBrokerAdapter",
+    "SyncBrokerAdapter",
+    "AsyncIBGatewayClient",
+    "AsyncTestClient",
+    "MARKET_DATA_TYPES",
+]
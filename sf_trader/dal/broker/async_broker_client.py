@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+from abc import ABC, abstractmethod
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from sf_trader.dal.broker.broker_client import BrokerClient, SubmittedCallback
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+)
+
+T = TypeVar("T")
+
+
+class AsyncBrokerClient(ABC):
+    @abstractmethod
+    async def get_prices(self, tickers: list[str]) -> PricesDF:
+        pass
+
+    @abstractmethod
+    async def get_account_value(self) -> float:
+        pass
+
+    @abstractmethod
+    async def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def get_positions(self) -> SharesDF:
+        pass
+
+    @abstractmethod
+    async def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        pass
+
+    async def get_open_orders(self) -> OpenOrdersDF | None:
+        """Working orders from every client on the account, if the broker reports them."""
+        return None
+
+
+class AsyncBrokerAdapter(AsyncBrokerClient):
+    """Exposes a sync BrokerClient through the async interface.
+
+    Calls run on worker threads one at a time, since the sync clients share a single connection.
+    """
+
+    def __init__(self, broker: BrokerClient) -> None:
+        self._broker = broker
+        self._lock = asyncio.Lock()
+
+    async def _call(self, method, *args) -> Any:
+        async with self._lock:
+            return await asyncio.to_thread(method, *args)
+
+    async def get_prices(self, tickers: list[str]) -> PricesDF:
+        return await self._call(self._broker.get_prices, tickers)
+
+    async def get_account_value(self) -> float:
+        return await self._call(self._broker.get_account_value)
+
+    async def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        return await self._call(self._broker.post_orders, orders, on_submitted)
+
+    async def get_positions(self) -> SharesDF:
+        return await self._call(self._broker.get_positions)
+
+    async def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return await self._call(self._broker.cancel_orders, tickers, action, global_cancel)
+
+    async def get_open_orders(self) -> OpenOrdersDF | None:
+        return await self._call(self._broker.get_open_orders)
+
+
+class SyncBrokerAdapter(BrokerClient):
+    """Exposes an AsyncBrokerClient through the sync interface using a background event loop."""
+
+    def __init__(self, broker: AsyncBrokerClient) -> None:
+        self._broker = broker
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get_prices(self, tickers: list[str]) -> PricesDF:
+        return self._run(self._broker.get_prices(tickers))
+
+    def get_account_value(self) -> float:
+        return self._run(self._broker.get_account_value())
+
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        return self._run(self._broker.post_orders(orders, on_submitted))
+
+    def get_positions(self) -> SharesDF:
+        return self._run(self._broker.get_positions())
+
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return self._run(self._broker.cancel_orders(tickers, action, global_cancel))
+
+    def get_open_orders(self) -> OpenOrdersDF | None:
+        return self._run(self._broker.get_open_orders())
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
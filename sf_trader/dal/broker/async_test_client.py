@@ -0,0 +1,48 @@
+from sf_trader.dal.broker.async_broker_client import AsyncBrokerClient
+from sf_trader.dal.broker.broker_client import SubmittedCallback
+from sf_trader.dal.broker.order_tracker import OrderTracker
+from sf_trader.dal.broker.test_client import TestClient
+import asyncio
+import datetime as dt
+
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    SharesDF,
+    OrdersDF,
+    CancellationsDF,
+    OpenOrdersDF,
+)
+
+
+class AsyncTestClient(AsyncBrokerClient):
+    def __init__(self, data_date: dt.date) -> None:
+        self._client = TestClient(data_date)
+
+    async def get_prices(self, tickers: list[str]) -> PricesDF:
+        return await asyncio.to_thread(self._client.get_prices, tickers)
+
+    async def get_account_value(self) -> float:
+        return self._client.get_account_value()
+
+    async def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        # The sync client records each order, so tracked fills match the sync path
+        await asyncio.to_thread(self._client.post_orders, orders, on_submitted)
+
+    async def get_positions(self) -> SharesDF:
+        return self._client.get_positions()
+
+    async def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return self._client.cancel_orders(tickers, action, global_cancel)
+
+    async def get_open_orders(self) -> OpenOrdersDF:
+        return self._client.get_open_orders()
+
+    def get_order_tracker(self) -> OrderTracker:
+        return self._client.get_order_tracker()
@@ -1,6 +1,19 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import TypeAlias
 
-from sf_trader.dal.models.schema_models import PricesDF, OrdersDF, SharesDF
+from sf_trader.dal.broker.order_tracker import OrderTracker
+from sf_trader.dal.broker.positions_cache import PositionsCache
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+)
+
+# Called with the row index, in the posted orders frame, of each order the broker accepted
+SubmittedCallback: TypeAlias = Callable[[int], None]
 
 
 class BrokerClient(ABC):
@@ -13,7 +26,9 @@ class BrokerClient(ABC):
         pass
 
     @abstractmethod
-    def post_orders(self, orders: OrdersDF) -> None:
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
         pass
 
     @abstractmethod
@@ -21,5 +36,26 @@ class BrokerClient(ABC):
         pass
 
     @abstractmethod
-    def cancel_orders(self) -> None:
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        """Cancel this client's open orders, optionally only those for the given tickers or action.
+
+        global_cancel instead cancels every working order on the account, from any client.
+        """
         pass
+
+    def get_order_tracker(self) -> OrderTracker | None:
+        """Tracker collecting order status and execution events, if the broker reports them."""
+        return None
+
+    def get_positions_cache(self) -> PositionsCache | None:
+        """Cache of holdings kept current by position updates, if the broker streams them."""
+        return None
+
+    def get_open_orders(self) -> OpenOrdersDF | None:
+        """Working orders from every client on the account, if the broker reports them."""
+        return None
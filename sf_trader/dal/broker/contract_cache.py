@@ -0,0 +1,155 @@
+import os
+import re
+import polars as pl
+
+from concurrent.futures import ThreadPoolExecutor
+from ibapi.sync_wrapper import TWSSyncWrapper, Contract
+from rich import print
+
+from sf_trader.dal.models.schema_models import OrdersDF, ContractsDF, ContractsSchema
+
+# IB error 200: the symbol has no contract, every other error is worth another try
+NO_SECURITY_DEFINITION = re.compile(r"\b200\b|No security definition", re.IGNORECASE)
+
+
+def ibkr_symbol_expr(column: str = "ticker") -> pl.Expr:
+    """Vectorized ticker conversion from BRK.B to BRK B for the IBKR API."""
+    return pl.col(column).str.replace_all(".", " ", literal=True)
+
+
+def ticker_from_ibkr_symbol_expr(column: str = "ticker") -> pl.Expr:
+    """Vectorized ticker conversion from BRK B to BRK.B from the IBKR API."""
+    return pl.col(column).str.replace_all(" ", ".", literal=True)
+
+
+class ContractCache:
+    """Ticker keyed cache of resolved IB contracts persisted to disk.
+
+    Lookups run one at a time by default, since TWSSyncWrapper isn't known to be thread
+    safe; max_workers only raises that for a client that is.
+    """
+
+    def __init__(
+        self, path: str | None = None, max_workers: int = 1, retries: int = 2
+    ) -> None:
+        self._path = path
+        self._max_workers = max_workers
+        self._retries = retries
+        self._contracts = self._load()
+
+    def _load(self) -> ContractsDF:
+        if self._path is not None and os.path.exists(self._path):
+            return ContractsSchema.validate(pl.read_parquet(self._path))
+
+        return ContractsSchema.create_empty()
+
+    def save(self) -> None:
+        if self._path is None:
+            return
+
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        self._contracts.write_parquet(self._path)
+
+    @property
+    def contracts(self) -> ContractsDF:
+        return self._contracts
+
+    def get_missing(self, tickers: list[str]) -> list[str]:
+        return (
+            pl.DataFrame({"ticker": tickers}, schema={"ticker": pl.String})
+            .unique()
+            .join(self._contracts, on="ticker", how="anti")
+            .sort("ticker")
+            .get_column("ticker")
+            .to_list()
+        )
+
+    def _resolve_one(self, app: TWSSyncWrapper, ticker: str, ib_symbol: str) -> dict | None:
+        """The resolved contract, or None when IB has no security definition for it.
+
+        Any other error, a timeout or a dropped connection, is retried and then raised.
+        """
+        contract = Contract()
+        contract.symbol = ib_symbol
+        contract.secType = "STK"
+        contract.exchange = "SMART"
+        contract.currency = "USD"
+
+        for attempt in range(self._retries + 1):
+            try:
+                details = app.get_contract_details(contract, timeout=10)
+                break
+            except Exception as e:
+                if NO_SECURITY_DEFINITION.search(str(e)):
+                    return None
+                if attempt == self._retries:
+                    raise
+
+        if not details:
+            return None
+
+        resolved = details[0].contract
+        return {
+            "ticker": ticker,
+            "ib_symbol": ib_symbol,
+            "con_id": int(resolved.conId),
+            "primary_exchange": resolved.primaryExchange or "",
+        }
+
+    def resolve(self, app: TWSSyncWrapper, tickers: list[str]) -> list[str]:
+        """Resolve uncached tickers. Returns the tickers IB has no security definition for."""
+        missing = self.get_missing(tickers)
+
+        if not missing:
+            return []
+
+        ib_symbols = (
+            pl.DataFrame({"ticker": missing})
+            .select(ibkr_symbol_expr())
+            .get_column("ticker")
+            .to_list()
+        )
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda args: self._resolve_one(app, *args), zip(missing, ib_symbols)
+                )
+            )
+
+        resolved = [result for result in results if result is not None]
+
+        if resolved:
+            self._contracts = ContractsSchema.validate(
+                pl.concat([self._contracts, pl.DataFrame(resolved)], how="diagonal_relaxed")
+                .unique("ticker", keep="last")
+                .sort("ticker")
+            )
+            self.save()
+
+        resolved_tickers = {result["ticker"] for result in resolved}
+        return [ticker for ticker in missing if ticker not in resolved_tickers]
+
+    def prepare_orders(self, app: TWSSyncWrapper, orders: OrdersDF) -> pl.DataFrame:
+        """Attach resolved contracts to orders and reject tickers that can not be resolved."""
+        unresolved = self.resolve(app, orders["ticker"].to_list())
+
+        for ticker in unresolved:
+            print(f"⚠ Skipping {ticker}: Security not found")
+
+        contracts = self._contracts.with_columns(
+            pl.col("ticker").cast(orders.schema["ticker"])
+        )
+
+        return orders.join(contracts, on="ticker", how="inner", maintain_order="left")
+
+    @staticmethod
+    def build_contract(order_: dict) -> Contract:
+        contract = Contract()
+        contract.conId = order_.get("con_id")
+        contract.symbol = order_.get("ib_symbol")
+        contract.secType = "STK"
+        contract.exchange = "SMART"
+        contract.primaryExchange = order_.get("primary_exchange")
+        contract.currency = "USD"
+        return contract
@@ -1,17 +1,43 @@
-from sf_trader.dal.broker.broker_client import BrokerClient
+from sf_trader.dal.broker.broker_client import BrokerClient, SubmittedCallback
 import polars as pl
 
-from sf_trader.dal.models.schema_models import PricesDF, OrdersDF, SharesDF, SharesSchema
-from ibapi.sync_wrapper import TWSSyncWrapper, Contract, Order, OrderCancel
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    OrdersDF,
+    SharesDF,
+    CancellationsDF,
+    OpenOrdersDF,
+)
+from ibapi.sync_wrapper import TWSSyncWrapper, Contract, Order
 from ibapi.account_summary_tags import AccountSummaryTags
+from sf_trader.dal.broker.contract_cache import ContractCache, ibkr_symbol_expr
+from sf_trader.dal.broker.order_tracker import OrderTracker
+from sf_trader.dal.broker.positions_cache import PositionsCache
+from sf_trader.dal.broker.async_broker_client import SyncBrokerAdapter
+from sf_trader.dal.broker.IB_gateway_async_client import (
+    AsyncIBGatewayClient,
+    DELAYED_MARKET_DATA,
+)
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
 from rich import print
 from tqdm import tqdm
 import time
 
 
 class IBKRClient(BrokerClient):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        contract_cache_path: str | None = None,
+        market_data_type: int = DELAYED_MARKET_DATA,
+    ) -> None:
+        self._contract_cache = ContractCache(contract_cache_path)
+        self._market_data_type = market_data_type
+        self._async_client: SyncBrokerAdapter | None = None
         self._app = TWSSyncWrapper(timeout=30)
+        self._order_tracker = OrderTracker()
+        self._order_tracker.attach(self._app)
+        self._positions_cache = PositionsCache()
+        self._positions_cache.attach(self._app)
         if not self._app.connect_and_start(
             host="127.0.0.1", port=7497, client_id=8675309
         ):
@@ -19,28 +45,26 @@ class IBKRClient(BrokerClient):
         else:
             print("Connected to TWS")
 
-    @staticmethod
-    def _convert_ticker_to_ibkr_format(ticker: str) -> str:
-        """Convert ticker format from BRK.B to BRK B for IBKR API."""
-        return ticker.replace(".", " ")
-
-    @staticmethod
-    def _convert_ticker_from_ibkr_format(ticker: str) -> str:
-        """Convert ticker format from BRK B to BRK.B from IBKR API."""
-        return ticker.replace(" ", ".")
-
     def get_prices(self, tickers: list[str]) -> PricesDF:
         prices_list = []
+        ib_symbols = (
+            pl.DataFrame({"ticker": tickers}, schema={"ticker": pl.String})
+            .select(ibkr_symbol_expr())
+            .get_column("ticker")
+            .to_list()
+        )
 
-        for ticker in tqdm(tickers, desc="Fetching prices", disable=True):
+        for ticker, ib_symbol in tqdm(
+            zip(tickers, ib_symbols), total=len(tickers), desc="Fetching prices", disable=True
+        ):
             contract = Contract()
-            contract.symbol = self._convert_ticker_to_ibkr_format(ticker)
+            contract.symbol = ib_symbol
             contract.secType = "STK"
             contract.exchange = "SMART"
             # contract.primaryExchange = "ISLAND"
             contract.currency = "USD"
 
-            self._app.reqMarketDataType(3)  # TODO: Change to live data
+            self._app.reqMarketDataType(self._market_data_type)
 
             prices_raw: dict[str, dict[int, dict]] = self._app.get_market_data_snapshot(
                 contract=contract, snapshot=False, timeout=5
@@ -60,7 +84,7 @@ class IBKRClient(BrokerClient):
 
             time.sleep(1)
 
-        prices = pl.DataFrame(prices_list)
+        prices = pl.DataFrame(prices_list).pipe(encode_tickers)
 
         return prices
 
@@ -74,16 +98,14 @@ class IBKRClient(BrokerClient):
         )
         return float(net_liquidation_value)
 
-    def post_orders(self, orders: OrdersDF) -> None:
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        orders = self._contract_cache.prepare_orders(self._app, orders.with_row_index("index"))
+
         for order_ in orders.to_dicts():
             try:
-                contract = Contract()
-                contract.symbol = self._convert_ticker_to_ibkr_format(
-                    order_.get("ticker")
-                )
-                contract.secType = "STK"
-                contract.exchange = "SMART"
-                contract.currency = "USD"
+                contract = self._contract_cache.build_contract(order_)
 
                 order = Order()
                 order.action = order_.get("action")
@@ -104,60 +126,41 @@ class IBKRClient(BrokerClient):
                     print(
                         f"✗ Error placing order for {order_.get('ticker')}: {error_msg}"
                     )
+            else:
+                if on_submitted is not None:
+                    on_submitted(order_.get("index"))
 
             time.sleep(0.1)
 
     def get_positions(self) -> SharesDF:
-        positions_summary: dict[str, list[dict]] = self._app.get_positions()
-        client_account_id = list(positions_summary.keys())[0]
-        positions_raw = positions_summary.get(client_account_id)
-
-        positions_list = [
-            {
-                "ticker": self._convert_ticker_from_ibkr_format(
-                    position.get("contract").symbol
-                ),
-                "shares": float(position.get("position")),
-            }
-            for position in positions_raw
-        ]
-
-        positions = pl.DataFrame(positions_list)
-
-        return SharesSchema.validate(positions)
+        # Served from the position subscription instead of a fresh snapshot
+        self._positions_cache.subscribe(self._app)
+        return self._positions_cache.get_positions()
 
-    def cancel_orders(self) -> None:
-        try:
-            # Get all open orders
-            open_orders = self._app.get_open_orders()
+    def get_order_tracker(self) -> OrderTracker:
+        return self._order_tracker
 
-            if not open_orders:
-                print("No open orders to cancel")
-                return
+    def get_positions_cache(self) -> PositionsCache:
+        return self._positions_cache
 
-            print(f"Found {len(open_orders)} open order(s)")
-
-            # Cancel each order individually
-            cancelled_count = 0
-            for order_id, order_data in open_orders.items():
-                try:
-                    order_cancel = OrderCancel()
-                    self._app.cancel_order_sync(order_id, orderCancel=order_cancel)
-                    ticker = self._convert_ticker_from_ibkr_format(
-                        order_data.get("contract").symbol
-                    )
-                    action = order_data.get("order").action
-                    quantity = order_data.get("order").totalQuantity
-                    print(f"✓ Cancelled order {order_id}: {ticker} {action} {quantity}")
-                    cancelled_count += 1
-                    time.sleep(0.1)
-                except Exception as e:
-                    print(f"✗ Error cancelling order {order_id}: {str(e)}")
+    def _get_async_client(self) -> SyncBrokerAdapter:
+        """Callback-driven client sharing this connection, for pipelined requests."""
+        if self._async_client is None:
+            self._async_client = SyncBrokerAdapter(AsyncIBGatewayClient.from_client(self))
+        return self._async_client
 
-            print(f"✓ Cancelled {cancelled_count}/{len(open_orders)} order(s)")
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return self._get_async_client().cancel_orders(tickers, action, global_cancel)
 
-        except Exception as e:
-            print(f"✗ Error getting open orders: {str(e)}")
+    def get_open_orders(self) -> OpenOrdersDF:
+        return self._get_async_client().get_open_orders()
 
     def __del__(self) -> None:
+        if self._async_client is not None:
+            self._async_client.close()
         self._app.disconnect_and_stop()
\ No newline at end of file
@@ -0,0 +1,229 @@
+import datetime as dt
+import os
+import struct
+import threading
+import time
+import zlib
+import polars as pl
+
+from sf_trader.dal.models.schema_models import OrdersDF, OrdersSchema
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+
+INTENT = 1
+ACK = 2
+ACTIONS = ("BUY", "SELL")
+
+# kind, action, run, seq, data date ordinal, shares, price, ticker, then a CRC32 of those fields
+RECORD = struct.Struct("<BBIIIdd16s")
+CHECKSUM = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + CHECKSUM.size
+
+JOURNAL_SCHEMA = {
+    "kind": pl.UInt8,
+    "run": pl.UInt32,
+    "seq": pl.UInt32,
+    "date": pl.Date,
+    "ticker": pl.String,
+    "action": pl.String,
+    "shares": pl.Float64,
+    "price": pl.Float64,
+}
+
+
+class OrderJournal:
+    """Append-only binary log of order submission intents and broker acks.
+
+    Every order of a run is journaled as an intent and made durable with one fsync before
+    any is sent. Acks are buffered and fsynced in groups, when the group fills, once the
+    flush interval has passed since the first buffered ack, or on close. Every record
+    carries the run's data date, so a run is only resumed on the day it was planned for.
+    Records are fixed size with a checksum, so a record torn by a crash is detected on open
+    and cut off before appending.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.2) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.run: int | None = None
+        self.date: dt.date | None = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._buffer: list[bytes] = []
+        self._last_flush = time.monotonic()
+        self._timer: threading.Timer | None = None
+        self._seqs: list[int] = []
+        self._orders: dict[int, tuple] = {}
+
+    @staticmethod
+    def _pack(
+        kind: int,
+        run: int,
+        seq: int,
+        date: dt.date,
+        ticker: str,
+        action: str,
+        shares: float,
+        price: float,
+    ) -> bytes:
+        encoded_ticker = ticker.encode()
+        if len(encoded_ticker) > 16:
+            raise ValueError(f"Ticker '{ticker}' is too long to journal")
+
+        body = RECORD.pack(
+            kind, ACTIONS.index(action), run, seq, date.toordinal(), shares, price, encoded_ticker
+        )
+        return body + CHECKSUM.pack(zlib.crc32(body))
+
+    def _read_valid(self) -> tuple[list[tuple], int]:
+        """Decoded records up to the first torn or corrupt one, and the byte length they span."""
+        if not os.path.exists(self.path):
+            return [], 0
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        records = []
+        for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+            body = data[offset : offset + RECORD.size]
+            (checksum,) = CHECKSUM.unpack_from(data, offset + RECORD.size)
+            if zlib.crc32(body) != checksum:
+                break
+
+            kind, action, run, seq, date, shares, price, ticker = RECORD.unpack(body)
+            records.append(
+                (
+                    kind,
+                    run,
+                    seq,
+                    dt.date.fromordinal(date),
+                    ticker.rstrip(b"\0").decode(),
+                    ACTIONS[action],
+                    shares,
+                    price,
+                )
+            )
+
+        return records, len(records) * RECORD_SIZE
+
+    def read(self) -> pl.DataFrame:
+        records, _ = self._read_valid()
+        return pl.DataFrame(records, schema=JOURNAL_SCHEMA, orient="row")
+
+    def _open(self) -> None:
+        if self._file is not None:
+            return
+
+        # Drop a torn tail so new records stay aligned
+        _, valid_length = self._read_valid()
+        if os.path.exists(self.path) and os.path.getsize(self.path) != valid_length:
+            os.truncate(self.path, valid_length)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+
+    def _write(self, records: list[bytes]) -> None:
+        self._file.write(b"".join(records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def begin(self, orders: OrdersDF, date: dt.date) -> int:
+        """Start a new run for a data date and durably journal an intent for every order in it."""
+        journal = self.read()
+        self.run = 1 if journal.is_empty() else int(journal["run"].max()) + 1
+        self.date = date
+        self._set_orders(orders.with_row_index("seq").rows(named=True))
+
+        with self._lock:
+            self._open()
+            self._write(
+                [
+                    self._pack(INTENT, self.run, seq, self.date, *order)
+                    for seq, order in self._orders.items()
+                ]
+            )
+            self._last_flush = time.monotonic()
+
+        return self.run
+
+    def resume(self, date: dt.date) -> OrdersDF:
+        """Orders of the last run that were never acked, continuing that run's journal.
+
+        The last run must be for the given data date, orders planned on another day's
+        data are never replayed.
+        """
+        journal = self.read()
+        unacked = pl.DataFrame(schema=JOURNAL_SCHEMA)
+
+        if not journal.is_empty():
+            self.run = int(journal["run"].max())
+            records = journal.filter(pl.col("run").eq(self.run))
+            self.date = records["date"][0]
+            if self.date != date:
+                raise ValueError(
+                    f"The last journaled run is for {self.date}, not the data date {date}; "
+                    "post the orders again without resuming"
+                )
+            unacked = (
+                records.filter(pl.col("kind").eq(INTENT))
+                .join(records.filter(pl.col("kind").eq(ACK)), on="seq", how="anti")
+                .sort("seq")
+            )
+
+        self._set_orders(unacked.rows(named=True))
+
+        return OrdersSchema.validate(
+            unacked.select("ticker", "price", "shares", "action").pipe(encode_tickers)
+        )
+
+    def _set_orders(self, rows: list[dict]) -> None:
+        self._orders = {
+            row["seq"]: (str(row["ticker"]), row["action"], row["shares"], row["price"])
+            for row in rows
+        }
+        self._seqs = list(self._orders)
+
+    def retain(self, rows: list[int]) -> None:
+        """Keep only these rows of the resumed orders, so acks map to the frame actually posted."""
+        self._seqs = [self._seqs[row] for row in rows]
+
+    def ack(self, index: int) -> None:
+        """Journal that the broker accepted the order at a row of the frame being posted.
+
+        The rows are the orders from begin or resume, in order, so the row maps to its seq.
+        """
+        seq = self._seqs[index]
+
+        with self._lock:
+            self._buffer.append(self._pack(ACK, self.run, seq, self.date, *self._orders[seq]))
+            if (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush()
+            elif self._timer is None:
+                # Don't leave acks in memory while the next submission blocks
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self._open()
+            self._write(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
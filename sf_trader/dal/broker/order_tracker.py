@@ -0,0 +1,266 @@
+import datetime as dt
+import os
+import threading
+import time
+import polars as pl
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from sf_trader.dal.models.schema_models import FillsDF, FillsSchema
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+
+TERMINAL_STATUSES = {"Filled", "Cancelled", "ApiCancelled", "Inactive"}
+
+ORDERS_SCHEMA = {
+    "order_id": pl.Int64,
+    "ticker": pl.String,
+    "action": pl.String,
+    "shares": pl.Float64,
+}
+
+STATUS_SCHEMA = {
+    "order_id": pl.Int64,
+    "status": pl.String,
+    "filled": pl.Float64,
+    "remaining": pl.Float64,
+    "avg_fill_price": pl.Float64,
+    "received_at": pl.Datetime("us"),
+}
+
+EXECUTIONS_SCHEMA = {
+    "exec_id": pl.String,
+    "order_id": pl.Int64,
+    "ticker": pl.String,
+    "side": pl.String,
+    "shares": pl.Float64,
+    "price": pl.Float64,
+    "received_at": pl.Datetime("us"),
+}
+
+
+class ColumnarLog:
+    """Append-only event log buffered per column and sealed into frames in batches."""
+
+    def __init__(self, schema: dict[str, pl.DataType], batch_size: int = 1024) -> None:
+        self.schema = schema
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._columns: dict[str, list] = {name: [] for name in schema}
+        self._chunks: list[pl.DataFrame] = []
+        self._persisted = 0
+
+    def _seal(self) -> None:
+        if not self._columns[next(iter(self.schema))]:
+            return
+        self._chunks.append(pl.DataFrame(self._columns, schema=self.schema))
+        self._columns = {name: [] for name in self.schema}
+
+    def append(self, row: tuple) -> None:
+        with self._lock:
+            for column, value in zip(self._columns.values(), row):
+                column.append(value)
+            if len(self._columns[next(iter(self.schema))]) >= self.batch_size:
+                self._seal()
+
+    def frame(self) -> pl.DataFrame:
+        with self._lock:
+            frames = self._chunks + [pl.DataFrame(self._columns, schema=self.schema)]
+        return pl.concat(frames, rechunk=False)
+
+    def take_unpersisted(self) -> list[pl.DataFrame]:
+        """Seal the open batch and return the batches not yet handed out for persistence."""
+        with self._lock:
+            self._seal()
+            batches = self._chunks[self._persisted :]
+            self._persisted = len(self._chunks)
+        return batches
+
+
+class OrderTracker:
+    """Collects orderStatus and execution callbacks into append-only columnar logs.
+
+    Fills are derived from the logs on demand, so monitoring many orders is a single
+    consumer waiting on updates rather than repeated position snapshots.
+    """
+
+    def __init__(self, batch_size: int = 1024) -> None:
+        self._orders = ColumnarLog(ORDERS_SCHEMA, batch_size)
+        self._statuses = ColumnarLog(STATUS_SCHEMA, batch_size)
+        self._executions = ColumnarLog(EXECUTIONS_SCHEMA, batch_size)
+        self._known_orders: set[int] = set()
+        self._session = dt.datetime.now().strftime("%Y%m%dT%H%M%S")
+        self._batch_number = 0
+        self._version = 0
+        self._updated = threading.Condition()
+        self._listeners: list[Callable[[], None]] = []
+
+    def _notify(self) -> None:
+        with self._updated:
+            self._version += 1
+            self._updated.notify_all()
+
+        for listener in self._listeners:
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call listener after every event this tracker records."""
+        self._listeners.append(listener)
+
+    def attach(self, app: Any) -> None:
+        """Chain the tracker onto an IB app's order callbacks."""
+
+        def chain(name: str, handler) -> None:
+            original = getattr(app, name)
+
+            def chained(*args):
+                result = original(*args)
+                handler(*args)
+                return result
+
+            setattr(app, name, chained)
+
+        chain("openOrder", self._on_open_order)
+        chain("orderStatus", self._on_order_status)
+        chain("execDetails", self._on_exec_details)
+
+    def _on_open_order(self, order_id, contract, order, order_state) -> None:
+        self.record_order(
+            order_id, contract.symbol.replace(" ", "."), order.action, float(order.totalQuantity)
+        )
+
+    def _on_order_status(self, order_id, status, filled, remaining, avg_fill_price, *args) -> None:
+        self.record_status(order_id, status, float(filled), float(remaining), avg_fill_price)
+
+    def _on_exec_details(self, req_id, contract, execution) -> None:
+        self.record_execution(
+            execution.execId,
+            execution.orderId,
+            contract.symbol.replace(" ", "."),
+            execution.side,
+            float(execution.shares),
+            execution.price,
+        )
+
+    def record_order(self, order_id: int, ticker: str, action: str, shares: float) -> None:
+        # openOrder is re-sent on every status change, only the first one is new
+        if order_id in self._known_orders:
+            return
+        self._known_orders.add(order_id)
+        self._orders.append((order_id, ticker, action, shares))
+        self._notify()
+
+    def record_status(
+        self, order_id: int, status: str, filled: float, remaining: float, avg_fill_price: float
+    ) -> None:
+        self._statuses.append(
+            (order_id, status, filled, remaining, avg_fill_price, dt.datetime.now())
+        )
+        self._notify()
+
+    def record_execution(
+        self, exec_id: str, order_id: int, ticker: str, side: str, shares: float, price: float
+    ) -> None:
+        self._executions.append((exec_id, order_id, ticker, side, shares, price, dt.datetime.now()))
+        self._notify()
+
+    def statuses(self) -> pl.DataFrame:
+        return self._statuses.frame()
+
+    def executions(self) -> pl.DataFrame:
+        return self._executions.frame()
+
+    def fills(self) -> FillsDF:
+        """Latest filled and remaining shares of every tracked order."""
+        latest_statuses = (
+            self._statuses.frame()
+            .group_by("order_id", maintain_order=True)
+            .last()
+            .drop("received_at")
+        )
+
+        fills = (
+            self._orders.frame()
+            .join(latest_statuses, on="order_id", how="left")
+            .with_columns(
+                pl.col("status").fill_null("Submitted"),
+                pl.col("filled").fill_null(0.0),
+                pl.col("remaining").fill_null(pl.col("shares")),
+            )
+            .pipe(encode_tickers)
+        )
+
+        return FillsSchema.validate(fills)
+
+    def is_complete(self) -> bool:
+        fills = self.fills()
+        return fills["status"].is_in(TERMINAL_STATUSES).all()
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """Block until the logs move past the given version or the timeout passes."""
+        with self._updated:
+            self._updated.wait_for(lambda: self._version > version, timeout=timeout)
+            return self._version
+
+    def stream(self, timeout: float, poll_interval: float = 1.0) -> Iterator[FillsDF]:
+        """Yield the fills frame as updates arrive until every order is done or time runs out."""
+        deadline = time.monotonic() + timeout
+        version = -1
+
+        while True:
+            remaining_time = deadline - time.monotonic()
+            version = self.wait_for_update(version, max(0.0, min(poll_interval, remaining_time)))
+            yield self.fills()
+
+            if self.is_complete() or time.monotonic() >= deadline:
+                return
+
+    def persist(self, directory: str) -> list[str]:
+        """Write the event batches collected since the last call as parquet files."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+
+        for name, log in (
+            ("orders", self._orders),
+            ("order_status", self._statuses),
+            ("executions", self._executions),
+        ):
+            for batch in log.take_unpersisted():
+                path = f"{directory}/{name}_{self._session}_{self._batch_number:05d}.parquet"
+                batch.write_parquet(path)
+                paths.append(path)
+                self._batch_number += 1
+
+        return paths
+
+
+class MergedOrderTracker(OrderTracker):
+    """Combined view over the trackers of several connections.
+
+    Events are recorded by the connection trackers, keyed by client ID since order IDs are
+    only unique per connection. Waiting and streaming follow updates from any of them.
+    """
+
+    def __init__(self, trackers: dict[int, OrderTracker]) -> None:
+        super().__init__()
+        self._trackers = trackers
+        for tracker in trackers.values():
+            tracker.add_listener(self._notify)
+
+    def statuses(self) -> pl.DataFrame:
+        return pl.concat([tracker.statuses() for tracker in self._trackers.values()])
+
+    def executions(self) -> pl.DataFrame:
+        return pl.concat([tracker.executions() for tracker in self._trackers.values()])
+
+    def fills(self) -> FillsDF:
+        return FillsSchema.validate(
+            pl.concat([tracker.fills() for tracker in self._trackers.values()])
+        )
+
+    def persist(self, directory: str) -> list[str]:
+        """Write each connection's new event batches under its own client ID directory."""
+        paths = []
+        for client_id, tracker in self._trackers.items():
+            paths.extend(tracker.persist(f"{directory}/client_{client_id}"))
+        return paths
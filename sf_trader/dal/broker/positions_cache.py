@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+import polars as pl
+
+from typing import Any
+
+from sf_trader.dal.models.schema_models import SharesDF, SharesSchema
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+
+# Connectivity lost, restored with data lost, and not connected end the subscription
+SUBSCRIPTION_LOST_CODES = {504, 1100, 1101}
+
+
+class PositionsCache:
+    """Holdings kept current from a single IB position subscription.
+
+    Updates overwrite one slot of a preallocated shares array, so serving positions
+    does not round trip to the broker. The version counter increases on every update.
+    A dropped connection resets the cache, and the next subscribe requests a fresh snapshot.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._subscribed = False
+        self._account: str | None = None
+        self._rows: dict[str, int] = {}
+        self._tickers: list[str] = []
+        self._shares = np.zeros(capacity, dtype=np.float64)
+        self._version = 0
+        self._frame: tuple[int, SharesDF] | None = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def attach(self, app: Any) -> None:
+        """Chain the cache onto an IB app's position callbacks."""
+
+        def chain(name: str, handler) -> None:
+            original = getattr(app, name)
+
+            def chained(*args):
+                result = original(*args)
+                handler(*args)
+                return result
+
+            setattr(app, name, chained)
+
+        chain("position", self._on_position)
+        chain("positionEnd", self._on_position_end)
+        chain("connectionClosed", self._on_connection_closed)
+        chain("error", self._on_error)
+
+    def subscribe(self, app: Any) -> None:
+        """Start the position subscription, once per connection."""
+        if not self._subscribed:
+            self._subscribed = True
+            app.reqPositions()
+
+    def _on_position(self, account, contract, position, avg_cost) -> None:
+        self.update(account, contract.symbol.replace(" ", "."), float(position))
+
+    def _on_position_end(self) -> None:
+        self._ready.set()
+
+    def _on_connection_closed(self) -> None:
+        self.reset()
+
+    def _on_error(self, *args) -> None:
+        # Newer API versions pass an error time before the code
+        error_code = args[2] if len(args) == 5 else args[1]
+        if error_code in SUBSCRIPTION_LOST_CODES:
+            self.reset()
+
+    def reset(self) -> None:
+        """Forget the holdings and the subscription, so they are requested again."""
+        with self._lock:
+            self._subscribed = False
+            self._ready.clear()
+            self._account = None
+            self._rows = {}
+            self._tickers = []
+            self._shares[:] = 0.0
+            self._version += 1
+
+    def update(self, account: str, ticker: str, shares: float) -> None:
+        with self._lock:
+            # Only the first account reported is tracked
+            if self._account is None:
+                self._account = account
+            elif account != self._account:
+                return
+
+            row = self._rows.get(ticker)
+            if row is None:
+                row = len(self._tickers)
+                if row == len(self._shares):
+                    self._shares = np.concatenate([self._shares, np.zeros_like(self._shares)])
+                self._rows[ticker] = row
+                self._tickers.append(ticker)
+
+            self._shares[row] = shares
+            self._version += 1
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def get_positions(self, timeout: float | None = 30) -> SharesDF:
+        """Current holdings, rebuilt only when the version has moved since the last call."""
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Timed out waiting for the initial positions snapshot")
+
+        cached = self._frame
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        with self._lock:
+            version = self._version
+            positions = pl.DataFrame(
+                {
+                    "ticker": self._tickers,
+                    "shares": self._shares[: len(self._tickers)].copy(),
+                },
+                schema={"ticker": pl.String, "shares": pl.Float64},
+            )
+
+        positions = SharesSchema.validate(positions.pipe(encode_tickers))
+        self._frame = (version, positions)
+        return positions
@@ -1,8 +1,20 @@
-from sf_trader.dal.broker.broker_client import BrokerClient
+from sf_trader.dal.broker.broker_client import BrokerClient, SubmittedCallback
+from sf_trader.dal.broker.order_tracker import OrderTracker
 import polars as pl
 import time
 
-from sf_trader.dal.models.schema_models import PricesDF, SharesDF, OrdersDF, PricesSchema, SharesSchema
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    SharesDF,
+    OrdersDF,
+    CancellationsDF,
+    OpenOrdersDF,
+    PricesSchema,
+    SharesSchema,
+    CancellationsSchema,
+    OpenOrdersSchema,
+)
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
 import sf_quant.data as sfd
 import datetime as dt
 
@@ -10,19 +22,23 @@ import datetime as dt
 class TestClient(BrokerClient):
     def __init__(self, data_date: dt.date) -> None:
         self._data_date = data_date
+        self._order_tracker = OrderTracker()
 
     def get_prices(self, tickers: list[str]) -> PricesDF:
         prices = sfd.load_assets_by_date(
             date_=self._data_date, columns=["ticker", "price"], in_universe=True
-        ).sort("ticker", "price")
+        ).pipe(encode_tickers).sort("ticker", "price")
 
         return PricesSchema.validate(prices)
 
     def get_account_value(self) -> float:
         return float(1e6)
 
-    def post_orders(self, orders: OrdersDF) -> None:
-        for order in orders.to_dicts():
+    def post_orders(
+        self, orders: OrdersDF, on_submitted: SubmittedCallback | None = None
+    ) -> None:
+        for index, order in enumerate(orders.to_dicts()):
+            order_id = index + 1
             ticker = order["ticker"]
             price = order["price"]
             shares = order["shares"]
@@ -31,15 +47,34 @@ class TestClient(BrokerClient):
             print(f"✓ {ticker}: {action} {shares} @ {price}")
             time.sleep(0.01)
 
+            # Test orders fill immediately at the data date's price
+            self._order_tracker.record_order(order_id, ticker, action, shares)
+            self._order_tracker.record_status(order_id, "Filled", shares, 0.0, price)
+
+            if on_submitted is not None:
+                on_submitted(index)
+
     def get_positions(self) -> SharesDF:
         shares = pl.DataFrame(
             {
                 "ticker": ["AAPL", "ACAD", "WRBY", "ZG"],
                 "shares": [10000.0, 10000.0, 10000.0, 10000.0],
             }
-        )
+        ).pipe(encode_tickers)
 
         return SharesSchema.validate(shares)
     
-    def cancel_orders(self) -> None:
-        return None
\ No newline at end of file
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
+        return CancellationsSchema.validate(CancellationsSchema.create_empty().pipe(encode_tickers))
+
+    def get_open_orders(self) -> OpenOrdersDF:
+        # Test orders fill as soon as they are posted, so none are ever working
+        return OpenOrdersSchema.validate(OpenOrdersSchema.create_empty().pipe(encode_tickers))
+
+    def get_order_tracker(self) -> OrderTracker:
+        return self._order_tracker
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import polars as pl
+import datetime as dt
+
+INDEX_SCHEMA = {
+    "ticker": pl.String,
+    "barrid": pl.String,
+    "valid_from": pl.Date,
+    "valid_to": pl.Date,
+}
+
+
+class MappingIndexDAO:
+    """Data Access Object for the persisted ticker to barrid index.
+
+    Each row is one unbroken run of trading days on which a ticker mapped to a barrid,
+    so lookups for a date or range are interval joins over a few thousand rows instead
+    of scans of the assets table.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._cached: tuple[int, pl.DataFrame] | None = None
+
+    def read(self) -> pl.DataFrame | None:
+        """The index, re-read only when the file has changed since the last call."""
+        if not os.path.exists(self.index_path):
+            return None
+
+        mtime = os.stat(self.index_path).st_mtime_ns
+        if self._cached is None or self._cached[0] != mtime:
+            self._cached = (mtime, pl.read_parquet(self.index_path))
+        return self._cached[1]
+
+    def _index(self) -> pl.DataFrame:
+        index = self.read()
+        return pl.DataFrame(schema=INDEX_SCHEMA) if index is None else index
+
+    def built_through(self) -> dt.date | None:
+        """Last trading date folded into the index."""
+        return self._index()["valid_to"].max()
+
+    def covers(self, date: dt.date) -> bool:
+        built_through = self.built_through()
+        return built_through is not None and date <= built_through
+
+    @staticmethod
+    def intervals_query(rows: pl.LazyFrame) -> pl.LazyFrame:
+        """Collapse daily (date, ticker, barrid) rows into runs over consecutive trading days."""
+        return (
+            rows.select("date", pl.col("ticker").cast(pl.String), pl.col("barrid").cast(pl.String))
+            .unique()
+            # Trading days are numbered so a run is a pair whose day numbers have no gap
+            .with_columns(pl.col("date").rank("dense").alias("day"))
+            .sort("ticker", "barrid", "date")
+            .with_columns(
+                pl.col("day")
+                .sub(pl.int_range(pl.len()).over("ticker", "barrid"))
+                .alias("run")
+            )
+            .group_by("ticker", "barrid", "run")
+            .agg(pl.col("date").min().alias("valid_from"), pl.col("date").max().alias("valid_to"))
+            .select(list(INDEX_SCHEMA))
+        )
+
+    @staticmethod
+    def merge(index: pl.DataFrame, intervals: pl.DataFrame) -> pl.DataFrame:
+        """Append intervals for later days, joining runs that continue across the boundary."""
+        if index.is_empty():
+            return intervals.sort("ticker", "valid_from")
+        if intervals.is_empty():
+            return index
+
+        built_through = index["valid_to"].max()
+        first_new_date = intervals["valid_from"].min()
+
+        continues = (
+            pl.col("valid_from").eq(first_new_date)
+            & pl.col("valid_to").shift().over("ticker", "barrid").eq(built_through)
+        ).fill_null(False)
+
+        return (
+            pl.concat([index, intervals])
+            .sort("ticker", "barrid", "valid_from")
+            .with_columns(continues.alias("continues"))
+            .with_columns(pl.col("continues").not_().cum_sum().over("ticker", "barrid").alias("run"))
+            .group_by("ticker", "barrid", "run")
+            .agg(pl.col("valid_from").min(), pl.col("valid_to").max())
+            .select(list(INDEX_SCHEMA))
+            .sort("ticker", "valid_from")
+        )
+
+    def write(self, index: pl.DataFrame) -> None:
+        """Replace the index file, renamed into place so readers never see a partial file."""
+        directory = os.path.dirname(self.index_path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        fd, staging_path = tempfile.mkstemp(dir=directory, prefix=".staging-", suffix=".parquet")
+        os.close(fd)
+        index.write_parquet(staging_path)
+        os.replace(staging_path, self.index_path)
+
+    def extend(self, intervals: pl.DataFrame) -> pl.DataFrame:
+        index = self.merge(self._index(), intervals)
+        self.write(index)
+        return index
+
+    def lookup(self, date: dt.date) -> pl.DataFrame:
+        return self._index().filter(
+            pl.col("valid_from").le(date), pl.col("valid_to").ge(date)
+        ).select("ticker", "barrid")
+
+    def lookup_dates(self, dates: list[dt.date] | pl.Series) -> pl.DataFrame:
+        """Mapping for every requested date as (date, ticker, barrid) in one interval join."""
+        dates = pl.DataFrame({"date": dates}, schema={"date": pl.Date}).unique()
+
+        return (
+            dates.join_where(
+                self._index(),
+                pl.col("date").ge(pl.col("valid_from")),
+                pl.col("date").le(pl.col("valid_to")),
+            )
+            .select("date", "ticker", "barrid")
+        )
+
+    def lookup_between(self, start: dt.date, end: dt.date) -> pl.DataFrame:
+        """Intervals overlapping [start, end], clipped to it."""
+        return self._index().filter(
+            pl.col("valid_from").le(end), pl.col("valid_to").ge(start)
+        ).with_columns(
+            pl.col("valid_from").clip(lower_bound=start),
+            pl.col("valid_to").clip(upper_bound=end),
+        )
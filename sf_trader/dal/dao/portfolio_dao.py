@@ -1,56 +1,283 @@
+from sf_trader.config import Config
+from sf_trader.dal.dao.snapshot_dao import SnapshotDAO
+from sf_trader.dal.dao.mapping_index_dao import MappingIndexDAO, INDEX_SCHEMA
+from sf_trader.dal.models.catalog_model import Catalog
 from sf_trader.dal.models.db_model import Database
 from sf_trader.dal.models.table_model import TableName
 from sf_trader.dal.models.schema_models import WeightsDF, PricesDF, WeightsSchema, PricesSchema
+from sf_trader.dal.models.ticker_dictionary import encode_tickers, ticker_series
 
+import os
+import shutil
+import tempfile
+import numpy as np
 import polars as pl
 import datetime as dt
 
+from collections.abc import Callable
+
+BENCHMARK_WEIGHTS_SNAPSHOT = "benchmark_weights"
+TICKER_BARRID_MAPPING_SNAPSHOT = "ticker_barrid_mapping"
+
 
 class PortfolioDAO(Database):
     """Data Access Object for portfolio-related operations."""
 
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self,
+        snapshot_dir: str | None = None,
+        streaming: bool = False,
+        mapping_index_path: str | None = None,
+        cache_years: bool = False,
+        catalog: Catalog | None = None,
+    ):
+        super().__init__(catalog)
+        self.snapshot_dao = SnapshotDAO(snapshot_dir) if snapshot_dir else None
+        self.mapping_index_dao = MappingIndexDAO(mapping_index_path) if mapping_index_path else None
+        self.streaming = streaming
+        # Multi-date work keeps each yearly file in memory after its first date
+        self.cache_years = cache_years
+        self._years: dict[tuple[TableName, int], pl.DataFrame] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> "PortfolioDAO":
+        return cls(
+            snapshot_dir=config.snapshot_dir,
+            streaming=config.streaming,
+            mapping_index_path=config.mapping_index_path,
+        )
+
+    def _collect(self, query: pl.LazyFrame) -> pl.DataFrame:
+        if not self.streaming:
+            return query.collect()
+
+        return query.collect(engine="streaming")
+
+    def _sink_between(
+        self,
+        query_between: Callable[[dt.date, dt.date], pl.LazyFrame],
+        start: dt.date,
+        end: dt.date,
+        path: str,
+    ) -> None:
+        """Stream a date range query to one parquet file, a calendar year at a time.
+
+        A sort over the whole range would hold all of it in memory, so each year is sunk on
+        its own and the sorted parts are then streamed into the file in order. Memory is
+        bounded by one year of the selected columns, whatever the length of the range.
+        """
+        staging_dir = os.path.dirname(path) or "."
+        os.makedirs(staging_dir, exist_ok=True)
+        parts_dir = tempfile.mkdtemp(dir=staging_dir, prefix=".sink-")
+
+        try:
+            parts = []
+            for year in range(start.year, end.year + 1):
+                try:
+                    query = query_between(
+                        max(start, dt.date(year, 1, 1)), min(end, dt.date(year, 12, 31))
+                    )
+                except FileNotFoundError:
+                    # A year without a file has nothing to sink
+                    continue
+
+                part = os.path.join(parts_dir, f"{year}.parquet")
+                query.sink_parquet(part, engine="streaming")
+                parts.append(part)
+
+            if not parts:
+                raise FileNotFoundError(f"No yearly files between {start.year} and {end.year}.")
+
+            pl.scan_parquet(parts).sink_parquet(path, engine="streaming")
+        finally:
+            shutil.rmtree(parts_dir)
+
+    def _has_snapshot(self, name: str, date: dt.date) -> bool:
+        return self.snapshot_dao is not None and self.snapshot_dao.has_table(name, date)
+
+    def _scan_by_date(self, table_name: TableName, date: dt.date) -> pl.LazyFrame:
+        """Scan a table's slice for one date, from the local snapshot when one exists."""
+        if self._has_snapshot(table_name.value, date):
+            return self.snapshot_dao.scan(table_name.value, date)
+
+        if self.cache_years:
+            return self._get_year(table_name, date.year).lazy().filter(pl.col("date").eq(date))
+
+        return (
+            self.get_table(table_name)
+            .scan(year=date.year)
+            .filter(pl.col("date").eq(date))
+        )
+
+    def _get_year(self, table_name: TableName, year: int) -> pl.DataFrame:
+        key = (table_name, year)
+        if key not in self._years:
+            self._years[key] = self._collect(self.get_table(table_name).scan(year=year))
+
+        return self._years[key]
+
+    def release_years(self, before: int) -> None:
+        """Drop cached yearly files older than a year, once dates are past them."""
+        self._years = {key: frame for key, frame in self._years.items() if key[1] >= before}
+
+    def get_dates_between(
+        self, table_name: TableName, start: dt.date, end: dt.date
+    ) -> list[dt.date]:
+        """Dates in [start, end] that a table has rows for."""
+
+        return (
+            self._collect(
+                self.get_table(table_name)
+                .scan_between(start, end)
+                .select("date")
+                .unique()
+                .sort("date")
+            )
+            .get_column("date")
+            .to_list()
+        )
+
+    def get_input_files(self, date: dt.date, table_names: list[TableName]) -> list[str]:
+        """Files a date's reads of the given tables come from, the snapshot when one exists."""
+        files = []
+        for table_name in table_names:
+            if self._has_snapshot(table_name.value, date):
+                files.append(self.snapshot_dao.table_path(table_name.value, date))
+            else:
+                files.extend(self.get_table(table_name).files_between(date.year, date.year))
+
+        return files
+
+    @staticmethod
+    def _benchmark_weights_query(assets: pl.LazyFrame) -> pl.LazyFrame:
+        return (
+            assets.filter(pl.col('in_universe'))
+            .select(
+                "ticker",
+                pl.col("market_cap")
+                .truediv(pl.col("market_cap").sum())
+                .over("date")
+                .alias("weight"),
+            )
+        )
+
+    @staticmethod
+    def _ticker_barrid_mapping_query(assets: pl.LazyFrame) -> pl.LazyFrame:
+        return assets.filter(pl.col('in_universe')).select("ticker", "barrid").unique()
+
+    def _scan_benchmark_weights(self, date: dt.date) -> pl.LazyFrame:
+        if self._has_snapshot(BENCHMARK_WEIGHTS_SNAPSHOT, date):
+            return self.snapshot_dao.scan(BENCHMARK_WEIGHTS_SNAPSHOT, date)
+
+        return self._benchmark_weights_query(self._scan_by_date(TableName.ASSETS, date))
+
+    def _scan_ticker_barrid_mapping(self, date: dt.date) -> pl.LazyFrame:
+        if self._has_snapshot(TICKER_BARRID_MAPPING_SNAPSHOT, date):
+            return self.snapshot_dao.scan(TICKER_BARRID_MAPPING_SNAPSHOT, date)
+
+        return self._ticker_barrid_mapping_query(self._scan_by_date(TableName.ASSETS, date))
 
     def get_optimal_weights_by_date(self, date: dt.date) -> WeightsDF:
         """Read optimal weights for a given date."""
 
-        optimal_weights_table = self.get_table(TableName.OPTIMAL_WEIGHTS)
-        weights = (
-            optimal_weights_table.scan(year=date.year)
-            .filter(pl.col('date').eq(date))
+        weights = self._collect(
+            self._scan_by_date(TableName.OPTIMAL_WEIGHTS, date)
             .select('ticker', 'weight')
+            .pipe(encode_tickers)
             .sort("ticker")
-            .collect()
         )
 
         return WeightsSchema.validate(weights)
 
+    def _optimal_weights_between_query(self, start: dt.date, end: dt.date) -> pl.LazyFrame:
+        return (
+            self.get_table(TableName.OPTIMAL_WEIGHTS)
+            .scan_between(start, end)
+            .select('date', 'ticker', 'weight')
+            .pipe(encode_tickers)
+            .sort("date", "ticker")
+        )
+
+    def get_optimal_weights_between(self, start: dt.date, end: dt.date) -> pl.DataFrame:
+        """Read optimal weights for every date in [start, end]."""
+
+        return self._collect(self._optimal_weights_between_query(start, end))
+
+    def sink_optimal_weights_between(self, start: dt.date, end: dt.date, path: str) -> None:
+        """Stream optimal weights for every date in [start, end] to a parquet file."""
+
+        self._sink_between(self._optimal_weights_between_query, start, end, path)
+
     def get_prices_by_date(self, date: dt.date, tickers: list[str]) -> PricesDF:
         """Read prices for a given date."""
 
-        assets_table = self.get_table(TableName.ASSETS)
-        prices = (
-            assets_table.scan(year=date.year)
-            .filter(pl.col('date').eq(date), pl.col("ticker").is_in(tickers))
+        prices = self._collect(
+            self._scan_by_date(TableName.ASSETS, date)
             .select('ticker', 'price')
+            .pipe(encode_tickers)
+            .filter(pl.col("ticker").is_in(ticker_series(tickers).implode()))
             .sort("ticker")
-            .collect()
         )
 
         return PricesSchema.validate(prices)
 
+    def _prices_between_query(
+        self, start: dt.date, end: dt.date, tickers: list[str] | None = None
+    ) -> pl.LazyFrame:
+        prices = (
+            self.get_table(TableName.ASSETS)
+            .scan_between(start, end)
+            .select('date', 'ticker', 'price')
+            .pipe(encode_tickers)
+        )
+
+        if tickers is not None:
+            prices = prices.filter(pl.col("ticker").is_in(ticker_series(tickers).implode()))
+
+        return prices.sort("date", "ticker")
+
+    def get_prices_between(
+        self, start: dt.date, end: dt.date, tickers: list[str] | None = None
+    ) -> pl.DataFrame:
+        """Read prices for every date in [start, end]."""
+
+        return self._collect(self._prices_between_query(start, end, tickers))
+
+    def sink_prices_between(
+        self, start: dt.date, end: dt.date, path: str, tickers: list[str] | None = None
+    ) -> None:
+        """Stream prices for every date in [start, end] to a parquet file."""
+
+        self._sink_between(
+            lambda start, end: self._prices_between_query(start, end, tickers), start, end, path
+        )
+
+    def get_asset_column_by_date(
+        self, date: dt.date, tickers: list[str], column: str
+    ) -> pl.DataFrame:
+        """Read one assets column, such as return or predicted_beta, for a given date."""
+
+        return self._collect(
+            self._scan_by_date(TableName.ASSETS, date)
+            .select('ticker', column)
+            .pipe(encode_tickers)
+            .filter(pl.col("ticker").is_in(ticker_series(tickers).implode()))
+            .drop_nulls(column)
+            .sort("ticker")
+        )
+
     def get_universe_by_date(self, date: dt.date) -> list[str]:
         """Read universe tickers for a given date."""
 
-        assets_table = self.get_table(TableName.ASSETS)
         tickers = (
-            assets_table.scan(year=date.year)
-            .filter(pl.col("date").eq(date), pl.col('in_universe'))
-            .collect()
+            self._collect(
+                self._scan_by_date(TableName.ASSETS, date)
+                .filter(pl.col('in_universe'))
+                .select("ticker")
+                .unique()
+                .sort("ticker")
+            )
             .get_column("ticker")
-            .unique()
-            .sort()
             .to_list()
         )
 
@@ -59,37 +286,123 @@ class PortfolioDAO(Database):
     def get_benchmark_weights_by_date(self, date: dt.date) -> WeightsDF:
         """Read benchmark weights for a given date."""
 
-        assets_table = self.get_table(TableName.ASSETS)
-        weights = (
-            assets_table.scan(year=date.year)
-            .filter(pl.col("date").eq(date), pl.col('in_universe'))
-            .select(
-                "ticker",
-                pl.col("market_cap")
-                .truediv(pl.col("market_cap").sum())
-                .over("date")
-                .alias("weight"),
-            )
+        weights = self._collect(
+            self._scan_benchmark_weights(date)
+            .pipe(encode_tickers)
             .sort("ticker")
-            .collect()
         )
 
         return WeightsSchema.validate(weights)
 
     def get_ticker_barrid_mapping(self, date: dt.date) -> pl.DataFrame:
-        assets_table = self.get_table(TableName.ASSETS)
-        
-        mapping = (assets_table.scan(
-            year=date.year
+        # The index answers any date it has been built through without a scan
+        if self.mapping_index_dao is not None and self.mapping_index_dao.covers(date):
+            return self.mapping_index_dao.lookup(date).pipe(encode_tickers).sort("ticker")
+
+        mapping = self._collect(
+            self._scan_ticker_barrid_mapping(date)
+            .pipe(encode_tickers)
+            .sort("ticker")
+        )
+
+        return mapping
+
+    def get_ticker_barrid_mapping_by_dates(self, dates: list[dt.date]) -> pl.DataFrame:
+        """Read the mapping for many dates at once from the mapping index."""
+
+        if self.mapping_index_dao is None:
+            raise ValueError("A mapping index path is required for multi-date mapping lookups.")
+        if dates and not self.mapping_index_dao.covers(max(dates)):
+            self.update_mapping_index(end=max(dates))
+
+        return (
+            self.mapping_index_dao.lookup_dates(dates)
+            .pipe(encode_tickers)
+            .sort("date", "ticker")
+        )
+
+    def get_ticker_barrid_mapping_between(self, start: dt.date, end: dt.date) -> pl.DataFrame:
+        """Read the mapping intervals overlapping [start, end] from the mapping index."""
+
+        if self.mapping_index_dao is None:
+            raise ValueError("A mapping index path is required for multi-date mapping lookups.")
+        if not self.mapping_index_dao.covers(end):
+            self.update_mapping_index(end=end)
+
+        return (
+            self.mapping_index_dao.lookup_between(start, end)
+            .pipe(encode_tickers)
+            .sort("ticker", "valid_from")
         )
-        .filter(
-            pl.col("date").eq(date),
-            pl.col('in_universe')
+
+    def update_mapping_index(self, end: dt.date | None = None) -> int:
+        """Fold assets days after the index's last date, through end, into the mapping index.
+
+        The first call builds the index from every assets file. Returns the number of
+        intervals in the index.
+        """
+
+        if self.mapping_index_dao is None:
+            raise ValueError("A mapping index path is required to build the mapping index.")
+
+        built_through = self.mapping_index_dao.built_through()
+        start = dt.date.min if built_through is None else built_through + dt.timedelta(days=1)
+        end = end or dt.date.today()
+        assets = self.get_table(TableName.ASSETS)
+        if start > end or not assets.files_between(start.year, end.year):
+            return self.mapping_index_dao.extend(pl.DataFrame(schema=INDEX_SCHEMA)).height
+
+        rows = assets.scan_between(start, end).filter(pl.col("in_universe"))
+        intervals = self._collect(MappingIndexDAO.intervals_query(rows))
+
+        return self.mapping_index_dao.extend(intervals).height
+
+    def write_snapshot(self, date: dt.date) -> None:
+        """Pull a date's slices from the database into the local snapshot."""
+
+        if self.snapshot_dao is None:
+            raise ValueError("A snapshot directory is required to write snapshots.")
+
+        assets, optimal_weights = pl.collect_all(
+            [
+                self.get_table(table_name).scan(year=date.year).filter(pl.col("date").eq(date))
+                for table_name in (TableName.ASSETS, TableName.OPTIMAL_WEIGHTS)
+            ],
+            engine="streaming" if self.streaming else "auto",
         )
-        .collect()
-        .select(["ticker", "barrid"])
-        .unique()
-        .sort("ticker")
+
+        # Derived frames are computed from the freshly pulled assets slice
+        benchmark_weights, ticker_barrid_mapping = pl.collect_all(
+            [
+                self._benchmark_weights_query(assets.lazy()),
+                self._ticker_barrid_mapping_query(assets.lazy()),
+            ]
         )
 
-        return mapping
\ No newline at end of file
+        tables = {
+            TableName.ASSETS.value: assets,
+            TableName.OPTIMAL_WEIGHTS.value: optimal_weights,
+            BENCHMARK_WEIGHTS_SNAPSHOT: benchmark_weights,
+            TICKER_BARRID_MAPPING_SNAPSHOT: ticker_barrid_mapping,
+        }
+        self.snapshot_dao.write_tables(date, tables)
+
+    def get_snapshot_covariance(self, date: dt.date) -> tuple[list[str], np.ndarray] | None:
+        if self.snapshot_dao is None:
+            return None
+
+        return self.snapshot_dao.read_covariance(date)
+
+    def write_snapshot_covariance(
+        self, date: dt.date, tickers: list[str], covariance_matrix: np.ndarray
+    ) -> None:
+        self.snapshot_dao.write_covariance(date, tickers, covariance_matrix)
+
+    def get_snapshot_covariance_factor(self, date: dt.date) -> np.ndarray | None:
+        if self.snapshot_dao is None:
+            return None
+
+        return self.snapshot_dao.read_covariance_factor(date)
+
+    def write_snapshot_covariance_factor(self, date: dt.date, factor: np.ndarray) -> None:
+        self.snapshot_dao.write_covariance_factor(date, factor)
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from typing import BinaryIO
+import numpy as np
+import polars as pl
+import datetime as dt
+
+
+class SnapshotDAO:
+    """Data Access Object for small local per-date snapshots of database slices."""
+
+    def __init__(self, snapshot_dir: str):
+        self.snapshot_dir = snapshot_dir
+
+    def _date_dir(self, date: dt.date) -> str:
+        return f"{self.snapshot_dir}/{date.isoformat()}"
+
+    def table_path(self, name: str, date: dt.date) -> str:
+        return f"{self._date_dir(date)}/{name}.arrow"
+
+    def has_table(self, name: str, date: dt.date) -> bool:
+        return os.path.exists(self.table_path(name, date))
+
+    def scan(self, name: str, date: dt.date) -> pl.LazyFrame:
+        return pl.scan_ipc(self.table_path(name, date), memory_map=True)
+
+    def write_tables(self, date: dt.date, tables: dict[str, pl.DataFrame]) -> None:
+        """Write date slices into the snapshot, replacing the date's directory atomically."""
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(dir=self.snapshot_dir, prefix=".staging-")
+
+        for name, frame in tables.items():
+            frame.write_ipc(f"{staging_dir}/{name}.arrow")
+
+        date_dir = self._date_dir(date)
+        if os.path.exists(date_dir):
+            shutil.rmtree(date_dir)
+        os.replace(staging_dir, date_dir)
+
+    @staticmethod
+    def _write_atomic(path_: str, write: Callable[[BinaryIO], None]) -> None:
+        """Write through a staging file in the same directory, so readers never see part of it."""
+        fd, staging_path = tempfile.mkstemp(dir=os.path.dirname(path_), prefix=".staging-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(staging_path, path_)
+        except BaseException:
+            os.remove(staging_path)
+            raise
+
+    def write_covariance(
+        self, date: dt.date, tickers: list[str], covariance_matrix: np.ndarray
+    ) -> None:
+        date_dir = self._date_dir(date)
+        self._write_atomic(
+            f"{date_dir}/covariance_tickers.arrow",
+            pl.DataFrame({"ticker": tickers}, schema={"ticker": pl.String}).write_ipc,
+        )
+        self._write_atomic(
+            f"{date_dir}/covariance.npy", lambda f: np.save(f, covariance_matrix)
+        )
+
+    def read_covariance(self, date: dt.date) -> tuple[list[str], np.ndarray] | None:
+        date_dir = self._date_dir(date)
+        if not os.path.exists(f"{date_dir}/covariance.npy"):
+            return None
+
+        tickers = pl.read_ipc(f"{date_dir}/covariance_tickers.arrow")["ticker"].to_list()
+        covariance_matrix = np.load(f"{date_dir}/covariance.npy", mmap_mode="r")
+
+        # A warm interrupted between the two files leaves them out of step
+        if covariance_matrix.shape != (len(tickers), len(tickers)):
+            return None
+
+        return tickers, covariance_matrix
+
+    def write_covariance_factor(self, date: dt.date, factor: np.ndarray) -> None:
+        self._write_atomic(
+            f"{self._date_dir(date)}/covariance_factor.npy", lambda f: np.save(f, factor)
+        )
+
+    def read_covariance_factor(self, date: dt.date) -> np.ndarray | None:
+        path_ = f"{self._date_dir(date)}/covariance_factor.npy"
+        if not os.path.exists(path_):
+            return None
+
+        return np.load(path_, mmap_mode="r")
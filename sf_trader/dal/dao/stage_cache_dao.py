@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+import tempfile
+import polars as pl
+
+from sf_trader.dal.models.ticker_dictionary import encode_tickers, decode_tickers
+
+
+class StageCacheDAO:
+    """Data Access Object for pipeline stage outputs, stored under a hash of their inputs.
+
+    A stage whose inputs hash to a key already on disk can return the stored frame
+    instead of recomputing it. Entries are never invalidated, a new input is a new key.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def file_fingerprint(path_: str) -> str:
+        """Cheap identity of a large input file: its path, size and modification time."""
+        stat = os.stat(path_)
+        return f"{path_}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def frame_digest(frame: pl.DataFrame) -> str:
+        """Digest of a frame's contents, independent of row order and ticker encoding."""
+        frame = frame.pipe(decode_tickers) if "ticker" in frame.columns else frame
+        return hashlib.sha256(frame.sort(frame.columns).write_csv().encode()).hexdigest()
+
+    def key(self, stage: str, inputs: dict) -> str:
+        payload = json.dumps({"stage": stage, **inputs}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, stage: str, key: str) -> str:
+        return f"{self.cache_dir}/{stage}/{key}.parquet"
+
+    def read(self, stage: str, key: str) -> pl.DataFrame | None:
+        path_ = self._path(stage, key)
+        if not os.path.exists(path_):
+            return None
+
+        frame = pl.read_parquet(path_)
+        return frame.pipe(encode_tickers) if "ticker" in frame.columns else frame
+
+    def write(self, stage: str, key: str, frame: pl.DataFrame) -> None:
+        """Store a stage output, renamed into place so readers never see a partial file."""
+        stage_dir = f"{self.cache_dir}/{stage}"
+        os.makedirs(stage_dir, exist_ok=True)
+
+        if "ticker" in frame.columns:
+            frame = frame.pipe(decode_tickers)
+
+        fd, staging_path = tempfile.mkstemp(dir=stage_dir, prefix=".staging-", suffix=".parquet")
+        os.close(fd)
+        frame.write_parquet(staging_path)
+        os.replace(staging_path, self._path(stage, key))
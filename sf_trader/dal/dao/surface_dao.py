@@ -1,8 +1,19 @@
 import polars as pl
 import os
 
+from pathlib import Path
+
 from sf_trader.config import Config
 from sf_trader.dal.models.schema_models import SharesDF, OrdersDF, OrdersSchema, SharesSchema
+from sf_trader.dal.models.ticker_dictionary import encode_tickers, decode_tickers
+
+SUMMARY_FORMATS = {
+    ".json": "json",
+    ".parquet": "parquet",
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+    ".feather": "ipc",
+}
 
 
 class SurfaceDAO:
@@ -22,7 +33,7 @@ class SurfaceDAO:
         if not os.path.exists(path_):
             raise FileNotFoundError(f"Orders file not found at path: {path_}")
 
-        return OrdersSchema.validate(pl.read_csv(path_))
+        return OrdersSchema.validate(pl.read_csv(path_).pipe(encode_tickers))
 
 
     def write_portfolio(self, shares: SharesDF) -> None:
@@ -36,4 +47,64 @@ class SurfaceDAO:
         if not os.path.exists(path_):
                 raise FileNotFoundError(f"Portfolio file not found at path: {path_}")
 
-        return SharesSchema.validate(pl.read_csv(path_))
\ No newline at end of file
+        return SharesSchema.validate(pl.read_csv(path_).pipe(encode_tickers))
+
+
+    def read_restricted_tickers(self) -> pl.DataFrame:
+        """Restricted tickers from the pre-trade config and the optional restricted list file."""
+        limits = self.config.pre_trade_limits
+        restricted = pl.DataFrame(
+            {"ticker": limits.restricted_tickers}, schema={"ticker": pl.String}
+        )
+
+        path_ = limits.restricted_list_path
+        if path_ is not None:
+            if not os.path.exists(path_):
+                raise FileNotFoundError(f"Restricted list file not found at path: {path_}")
+
+            read = pl.read_parquet if path_.endswith(".parquet") else pl.read_csv
+            restricted = pl.concat([restricted, read(path_, columns=["ticker"]).cast(pl.String)])
+
+        return restricted.unique().pipe(encode_tickers)
+
+
+    def write_risk_history(self, history: pl.DataFrame, path_: str) -> None:
+        Path(path_).parent.mkdir(parents=True, exist_ok=True)
+        history.write_parquet(path_)
+
+
+    def write_summary(self, frames: dict[str, pl.DataFrame], path_: str) -> list[str]:
+        """Write named summary frames in the format given by the path's extension.
+
+        JSON holds every frame in one object keyed by name. Parquet and Arrow IPC hold a
+        single table each, so every frame goes to its own `<stem>_<name>` file next to it.
+        """
+        path = Path(path_)
+        format_ = SUMMARY_FORMATS.get(path.suffix.lower())
+        if format_ is None:
+            raise ValueError(
+                f"Unsupported summary format '{path.suffix}', "
+                f"expected one of {sorted(SUMMARY_FORMATS)}"
+            )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        frames = {
+            name: frame.pipe(decode_tickers) if "ticker" in frame.columns else frame
+            for name, frame in frames.items()
+        }
+
+        if format_ == "json":
+            body = ", ".join(f'"{name}": {frame.write_json()}' for name, frame in frames.items())
+            path.write_text(f"{{{body}}}")
+            return [str(path)]
+
+        paths = []
+        for name, frame in frames.items():
+            frame_path = path.with_name(f"{path.stem}_{name}{path.suffix}")
+            if format_ == "parquet":
+                frame.write_parquet(frame_path)
+            else:
+                frame.write_ipc(frame_path)
+            paths.append(str(frame_path))
+
+        return paths
@@ -0,0 +1,95 @@
+import glob
+import os
+import threading
+import dotenv
+import polars as pl
+
+from .table_model import Table, TableName
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+class Catalog:
+    """Process wide cache of table handles and parquet metadata, invalidated on mtime changes."""
+
+    def __init__(self) -> None:
+        dotenv.load_dotenv(override=True)
+        self.base_path = os.getenv("DATABASE_PATH")
+        self._connected = False
+        self._lock = threading.Lock()
+        self._tables: dict[TableName, Table] = {}
+        self._files: dict[str, tuple[float, list[str]]] = {}
+        self._schemas: dict[str, tuple[float, pl.Schema]] = {}
+        self._row_counts: dict[str, tuple[float, int]] = {}
+
+    def is_connected(self) -> bool:
+        if not self._connected:
+            self._connected = self.base_path is not None and os.path.exists(self.base_path)
+        return self._connected
+
+    def get_table_path(self, table_name: TableName) -> str:
+        if not self.is_connected():
+            raise ConnectionError(f"Database connection failed: Base path: '{self.base_path}' is not set or does not exist.")
+        return f"{self.base_path}/{table_name.value}"
+
+    def table_exists(self, table_name: TableName) -> bool:
+        return table_name in self._tables or os.path.exists(self.get_table_path(table_name))
+
+    def get_table(self, table_name: TableName) -> Table:
+        table = self._tables.get(table_name)
+        if table is not None:
+            return table
+
+        if not self.table_exists(table_name):
+            raise FileNotFoundError(f"Table '{table_name.value}' does not exist in the database.")
+
+        with self._lock:
+            table = self._tables.setdefault(
+                table_name,
+                Table(name=table_name.value, base_path=self.get_table_path(table_name), catalog=self),
+            )
+        return table
+
+    def list_files(self, table_path: str, name: str) -> list[str]:
+        """Sorted yearly files of a table, re-listed only when the table directory changes."""
+        mtime = os.stat(table_path).st_mtime
+        cached = self._files.get(table_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        files = sorted(glob.glob(f"{table_path}/{name}_*.parquet"))
+        with self._lock:
+            self._files[table_path] = (mtime, files)
+        return files
+
+    def get_schema(self, file_path: str) -> pl.Schema:
+        mtime = os.stat(file_path).st_mtime
+        cached = self._schemas.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        schema = pl.read_parquet_schema(file_path)
+        with self._lock:
+            self._schemas[file_path] = (mtime, pl.Schema(schema))
+        return self._schemas[file_path][1]
+
+    def get_row_count(self, file_path: str) -> int:
+        mtime = os.stat(file_path).st_mtime
+        cached = self._row_counts.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # Answered from the parquet footer without reading any row groups
+        row_count = pl.scan_parquet(file_path).select(pl.len()).collect().item()
+        with self._lock:
+            self._row_counts[file_path] = (mtime, row_count)
+        return row_count
+
+
+def get_catalog() -> Catalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog()
+    return _catalog
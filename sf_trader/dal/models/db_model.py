@@ -1,32 +1,21 @@
-import os
-import dotenv
-
+from .catalog_model import Catalog, get_catalog
 from .table_model import Table, TableName
 
 
 class Database:
-    def __init__(self):
-        dotenv.load_dotenv(override=True)
-        self.base_path = os.getenv("DATABASE_PATH")
+    def __init__(self, catalog: Catalog | None = None):
+        self.catalog = catalog or get_catalog()
+        self.base_path = self.catalog.base_path
 
 
     def is_connected(self) -> bool:
-        return self.base_path is not None and os.path.exists(self.base_path)
-
-    def __run_connection_test(self) -> bool:
-        if not self.is_connected():
-            raise ConnectionError(f"Database connection failed: Base path: '{self.base_path}' is not set or does not exist.")
-        return True
+        return self.catalog.is_connected()
 
     def get_table_path(self, table_name: TableName) -> str:
-        self.__run_connection_test()
-        return f"{self.base_path}/{table_name.value}"
+        return self.catalog.get_table_path(table_name)
 
     def table_exists(self, table_name: TableName) -> bool:
-        table_path = self.get_table_path(table_name)
-        return os.path.exists(table_path)
+        return self.catalog.table_exists(table_name)
 
     def get_table(self, table_name: TableName) -> Table:
-        if not self.table_exists(table_name):
-            raise FileNotFoundError(f"Table '{table_name.value}' does not exist in the database.")
-        return Table(name=table_name.value, base_path=self.get_table_path(table_name))
\ No newline at end of file
+        return self.catalog.get_table(table_name)
\ No newline at end of file
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class IncrementalRisk:
+    """Total and active risk kept current under sparse changes to position dollars.
+
+    Holds Σx for the dollar vector x, so changing k tickers costs O(nk) rank-k updates
+    instead of recomputing the O(n²) quadratic forms. Weights are x / account value, so
+    account value changes are O(1).
+    """
+
+    def __init__(
+        self,
+        covariance_matrix: np.ndarray,
+        benchmark: np.ndarray,
+        dollars: np.ndarray,
+        account_value: float,
+    ) -> None:
+        self.covariance_matrix = covariance_matrix
+        self.benchmark = np.asarray(benchmark, dtype=np.float64)
+        self.dollars = np.nan_to_num(np.asarray(dollars, dtype=np.float64))
+        self.account_value = account_value
+        self._sigma_benchmark = covariance_matrix @ self.benchmark
+        self._benchmark_variance = float(self.benchmark @ self._sigma_benchmark)
+        self.resync()
+
+    def resync(self) -> None:
+        """Recompute every running sum from scratch, discarding accumulated rounding error."""
+        self._sigma_dollars = self.covariance_matrix @ self.dollars
+        self._dollars_variance = float(self.dollars @ self._sigma_dollars)
+        self._benchmark_cross = float(self.benchmark @ self._sigma_dollars)
+        self._gross_dollars = float(np.abs(self.dollars).sum())
+        self._net_dollars = float(self.dollars.sum())
+        self._num_long = int(np.count_nonzero(self.dollars > 0))
+        self._num_short = int(np.count_nonzero(self.dollars < 0))
+        self._changes_since_resync = 0
+
+    def update(self, index: np.ndarray, dollars: np.ndarray) -> int:
+        """Set new dollars for the tickers at index. Returns the number that changed."""
+        dollars = np.nan_to_num(np.asarray(dollars, dtype=np.float64))
+        old = self.dollars[index]
+        changed = dollars != old
+        index, old, dollars = index[changed], old[changed], dollars[changed]
+        if index.size == 0:
+            return 0
+
+        delta = dollars - old
+        columns = self.covariance_matrix[:, index]
+
+        # (x + d)'Σ(x + d) = x'Σx + 2 d'(Σx) + d'Σd, using Σx before it moves
+        self._dollars_variance += float(
+            2 * delta @ self._sigma_dollars[index] + delta @ columns[index] @ delta
+        )
+        self._benchmark_cross += float(delta @ self._sigma_benchmark[index])
+        self._sigma_dollars += columns @ delta
+
+        self._gross_dollars += float(np.abs(dollars).sum() - np.abs(old).sum())
+        self._net_dollars += float(delta.sum())
+        self._num_long += int(np.count_nonzero(dollars > 0) - np.count_nonzero(old > 0))
+        self._num_short += int(np.count_nonzero(dollars < 0) - np.count_nonzero(old < 0))
+        self.dollars[index] = dollars
+
+        # Resync once the updates have cost as much as a full recompute
+        self._changes_since_resync += index.size
+        if self._changes_since_resync >= len(self.dollars):
+            self.resync()
+
+        return index.size
+
+    @property
+    def total_risk(self) -> float:
+        return float(np.sqrt(max(self._dollars_variance, 0.0))) / self.account_value
+
+    @property
+    def active_risk(self) -> float:
+        # (x/v - b)'Σ(x/v - b) = x'Σx/v² - 2 b'Σx/v + b'Σb
+        value = self.account_value
+        variance = (
+            self._dollars_variance / value**2
+            - 2 * self._benchmark_cross / value
+            + self._benchmark_variance
+        )
+        return float(np.sqrt(max(variance, 0.0)))
+
+    @property
+    def gross_exposure(self) -> float:
+        return self._gross_dollars / self.account_value
+
+    @property
+    def net_exposure(self) -> float:
+        return self._net_dollars / self.account_value
+
+    @property
+    def num_long(self) -> int:
+        return self._num_long
+
+    @property
+    def num_short(self) -> int:
+        return self._num_short
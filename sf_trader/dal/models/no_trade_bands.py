@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class NoTradeBands:
+    # Skip trades smaller than this fraction of the target position
+    pct_target_weight: float | None = None
+    # Skip trades worth less than this many dollars
+    min_notional: float | None = None
+    # Skip trades of fewer shares than this
+    min_shares: float | None = None
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from sf_trader.dal.models.schema_models import SharesDF, PricesDF, WeightsDF
+
+
+def align_to_tickers(
+    tickers: np.ndarray,
+    frame: pl.DataFrame,
+    column: str,
+    fill: float = np.nan,
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Scatter a ticker keyed column onto a sorted ticker index without a join."""
+    aligned = np.full(len(tickers), fill, dtype=dtype)
+
+    if len(tickers) == 0 or frame.height == 0:
+        return aligned
+
+    keys = frame["ticker"].to_numpy().astype(str)
+    positions = np.minimum(np.searchsorted(tickers, keys), len(tickers) - 1)
+    found = tickers[positions] == keys
+    aligned[positions[found]] = frame[column].to_numpy()[found]
+
+    return aligned
+
+
+@dataclass(frozen=True)
+class PortfolioState:
+    """Per-ticker portfolio quantities aligned to one sorted ticker index."""
+
+    tickers: np.ndarray
+    shares: np.ndarray
+    prices: np.ndarray
+    benchmark: np.ndarray
+    in_benchmark: np.ndarray
+    account_value: float
+
+    @classmethod
+    def from_frames(
+        cls,
+        shares: SharesDF,
+        prices: PricesDF,
+        account_value: float = np.nan,
+        benchmark: WeightsDF | None = None,
+    ) -> "PortfolioState":
+        ticker_frames = [shares["ticker"].to_numpy().astype(str)]
+        if benchmark is not None:
+            ticker_frames.append(benchmark["ticker"].to_numpy().astype(str))
+
+        tickers = np.unique(np.concatenate(ticker_frames))
+
+        if benchmark is None:
+            benchmark_weights = np.zeros(len(tickers))
+            in_benchmark = np.zeros(len(tickers), dtype=bool)
+        else:
+            benchmark_weights = align_to_tickers(tickers, benchmark, "weight", fill=0.0)
+            in_benchmark = align_to_tickers(
+                tickers,
+                benchmark.with_columns(pl.lit(True).alias("present")),
+                "present",
+                fill=False,
+                dtype=bool,
+            )
+
+        return cls(
+            tickers=tickers,
+            shares=align_to_tickers(tickers, shares, "shares", fill=0.0),
+            prices=align_to_tickers(tickers, prices, "price"),
+            benchmark=benchmark_weights,
+            in_benchmark=in_benchmark,
+            account_value=account_value,
+        )
+
+    @property
+    def dollars(self) -> np.ndarray:
+        return self.shares * self.prices
+
+    @property
+    def dollars_allocated(self) -> float:
+        return float(np.nansum(self.dollars))
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.dollars / self.account_value
+
+    @property
+    def active_weights(self) -> np.ndarray:
+        return np.nan_to_num(self.weights) - self.benchmark
+
+    @property
+    def universe(self) -> list[str]:
+        return self.tickers[self.in_benchmark].tolist()
+
+    def to_frame(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "ticker": self.tickers,
+                "shares": self.shares,
+                "price": self.prices,
+                "dollars": self.dollars,
+                "weight": self.weights,
+                "weight_bmk": self.benchmark,
+                "weight_act": self.active_weights,
+            },
+            nan_to_null=True,
+        )
@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PreTradeLimits:
+    max_order_notional: float | None = None
+    max_order_pct_account: float | None = None
+    max_gross_turnover_pct: float | None = None
+    max_price_deviation_pct: float | None = None
+    restricted_tickers: list[str] = field(default_factory=list)
+    restricted_list_path: str | None = None
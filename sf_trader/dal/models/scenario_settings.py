@@ -0,0 +1,22 @@
+import datetime as dt
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StressScenario:
+    name: str
+    # Replays the assets' returns on a historical date
+    date: dt.date | None = None
+    # Moves every asset by its predicted beta times this market return
+    market_shock: float | None = None
+
+
+@dataclass
+class ScenarioSettings:
+    simulations: int = 50_000
+    chunk_size: int = 2048
+    horizon_days: int = 1
+    confidence_levels: list[float] = field(default_factory=lambda: [0.95, 0.99])
+    seed: int | None = None
+    stress_scenarios: list[StressScenario] = field(default_factory=list)
@@ -1,45 +1,118 @@
 import dataframely as dy
+import polars as pl
+from polars.datatypes import DataTypeClass
 from typing import TypeAlias
 
 
+class Ticker(dy.String):
+    """Ticker column accepting plain strings or dictionary-encoded tickers."""
+
+    def validate_dtype(self, dtype: pl.DataType | DataTypeClass) -> bool:
+        return dtype == pl.String or isinstance(dtype, (pl.Categorical, pl.Enum))
+
+
 class AssetsSchema(dy.Schema):
     date = dy.Date(nullable=False)
     barrid = dy.String(nullable=False)
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     return_ = dy.Float64(nullable=False, alias="return")
     predicted_beta = dy.Float64(nullable=True)
     specific_risk = dy.Float64(nullable=True)
 
 class PricesSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     price = dy.Float64(nullable=False)
 
 class DollarsSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     dollars = dy.Float64(nullable=False)
 
 class SharesSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     shares = dy.Float64(nullable=False)
 
 class WeightsSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     weight = dy.Float64(nullable=False)
 
 class AlphasSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     alpha = dy.Float64(nullable=False)
 
 class BetasSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     predicted_beta = dy.Float64(nullable=False)
 
 class OrdersSchema(dy.Schema):
-    ticker = dy.String(nullable=False)
+    ticker = Ticker(nullable=False)
     price = dy.Float64(nullable=False)
     shares = dy.Float64(nullable=False)
     action = dy.String(nullable=False)
 
+class ContractsSchema(dy.Schema):
+    ticker = Ticker(nullable=False)
+    ib_symbol = dy.String(nullable=False)
+    con_id = dy.Int64(nullable=False)
+    primary_exchange = dy.String(nullable=False)
+
+class CancellationsSchema(dy.Schema):
+    order_id = dy.Int64(nullable=False)
+    ticker = Ticker(nullable=False)
+    action = dy.String(nullable=False)
+    shares = dy.Float64(nullable=False)
+    status = dy.String(nullable=False)
+    latency_ms = dy.Float64(nullable=True)
+    error = dy.String(nullable=True)
+
+class OpenOrdersSchema(dy.Schema):
+    order_id = dy.Int64(nullable=False)
+    ticker = Ticker(nullable=False)
+    action = dy.String(nullable=False)
+    shares = dy.Float64(nullable=False)
+    remaining = dy.Float64(nullable=False)
+
+class SubmissionsSchema(dy.Schema):
+    ticker = Ticker(nullable=False)
+    action = dy.String(nullable=False)
+    shares = dy.Float64(nullable=False)
+    client_id = dy.Int64(nullable=False)
+    status = dy.String(nullable=False)
+    error = dy.String(nullable=True)
+
+class ViolationsSchema(dy.Schema):
+    # Book level violations have no ticker
+    ticker = Ticker(nullable=True)
+    check = dy.String(nullable=False)
+    value = dy.Float64(nullable=True)
+    limit = dy.Float64(nullable=True)
+
+class FillsSchema(dy.Schema):
+    order_id = dy.Int64(nullable=False)
+    ticker = Ticker(nullable=False)
+    action = dy.String(nullable=False)
+    shares = dy.Float64(nullable=False)
+    status = dy.String(nullable=False)
+    filled = dy.Float64(nullable=False)
+    remaining = dy.Float64(nullable=False)
+    avg_fill_price = dy.Float64(nullable=True)
+
+class RiskHistorySchema(dy.Schema):
+    date = dy.Date(nullable=False)
+    gross_exposure = dy.Float64(nullable=False)
+    net_exposure = dy.Float64(nullable=False)
+    num_long = dy.Int64(nullable=False)
+    num_short = dy.Int64(nullable=False)
+    num_positions = dy.Int64(nullable=False)
+    active_risk = dy.Float64(nullable=False)
+    total_risk = dy.Float64(nullable=False)
+
+class BandRemovalsSchema(dy.Schema):
+    band = dy.String(nullable=False)
+    orders = dy.Int64(nullable=False)
+    shares = dy.Float64(nullable=False)
+    turnover = dy.Float64(nullable=False)
+
+
 
 AssetsDF: TypeAlias = dy.DataFrame[AssetsSchema]
 PricesDF: TypeAlias = dy.DataFrame[PricesSchema]
@@ -48,4 +121,12 @@ SharesDF: TypeAlias = dy.DataFrame[SharesSchema]
 WeightsDF: TypeAlias = dy.DataFrame[WeightsSchema]
 AlphasDF: TypeAlias = dy.DataFrame[AlphasSchema]
 BetasDF: TypeAlias = dy.DataFrame[BetasSchema]
-OrdersDF: TypeAlias = dy.DataFrame[OrdersSchema]
\ No newline at end of file
+OrdersDF: TypeAlias = dy.DataFrame[OrdersSchema]
+ContractsDF: TypeAlias = dy.DataFrame[ContractsSchema]
+CancellationsDF: TypeAlias = dy.DataFrame[CancellationsSchema]
+OpenOrdersDF: TypeAlias = dy.DataFrame[OpenOrdersSchema]
+SubmissionsDF: TypeAlias = dy.DataFrame[SubmissionsSchema]
+FillsDF: TypeAlias = dy.DataFrame[FillsSchema]
+ViolationsDF: TypeAlias = dy.DataFrame[ViolationsSchema]
+RiskHistoryDF: TypeAlias = dy.DataFrame[RiskHistorySchema]
+BandRemovalsDF: TypeAlias = dy.DataFrame[BandRemovalsSchema]
\ No newline at end of file
@@ -1,6 +1,12 @@
+import os
 import polars as pl
+import datetime as dt
 
 from enum import StrEnum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .catalog_model import Catalog
 
 
 class TableName(StrEnum):
@@ -12,9 +18,10 @@ class TableName(StrEnum):
 
 
 class Table:
-    def __init__(self, name: str, base_path: str) -> None:
+    def __init__(self, name: str, base_path: str, catalog: "Catalog | None" = None) -> None:
         self._name = name
         self._base_path = base_path
+        self._catalog = catalog
 
 
     def _file_path(self, year: int | None = None) -> str:
@@ -32,9 +39,59 @@ class Table:
         return pl.read_parquet(self._file_path(year))
 
 
+    def scan_between(self, start: dt.date, end: dt.date) -> pl.LazyFrame:
+        """Scan only the yearly files overlapping [start, end], filtered to that date range."""
+        files = self.files_between(start.year, end.year)
+        if not files:
+            raise FileNotFoundError(
+                f"Table '{self._name}' has no files between {start.year} and {end.year}."
+            )
+
+        return pl.scan_parquet(files).filter(pl.col("date").is_between(start, end))
+
+
+    def _file_year(self, file_path: str) -> int | None:
+        year = os.path.basename(file_path).removeprefix(f"{self._name}_").removesuffix(".parquet")
+        return int(year) if year.isdigit() else None
+
+
+    def files_between(self, start_year: int, end_year: int) -> list[str]:
+        return [
+            file
+            for file in self.files()
+            if (year := self._file_year(file)) is not None and start_year <= year <= end_year
+        ]
+
+
+    @property
+    def catalog(self) -> "Catalog":
+        if self._catalog is None:
+            from .catalog_model import get_catalog
+            self._catalog = get_catalog()
+        return self._catalog
+
+
+    def files(self) -> list[str]:
+        return self.catalog.list_files(self._base_path, self._name)
+
+
+    def schema(self) -> pl.Schema:
+        # Yearly files share one schema, so the latest file's footer is enough
+        files = self.files()
+        if not files:
+            raise FileNotFoundError(f"Table '{self._name}' has no files at '{self._base_path}'.")
+        return self.catalog.get_schema(files[-1])
+
+
+    def row_count(self, year: int | None = None) -> int:
+        if year is None:
+            return sum(self.catalog.get_row_count(file) for file in self.files())
+        return self.catalog.get_row_count(self._file_path(year))
+
+
     def columns(self) -> pl.DataFrame:
         pl.Config.set_tbl_rows(-1)
-        schema = self.scan().collect_schema()
+        schema = self.schema()
         df_str = str(
             pl.DataFrame(
                 {
@@ -0,0 +1,25 @@
+import polars as pl
+
+from typing import TypeVar
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Project wide ticker dictionary. Every frame encoded against it shares one set of
+# categories, so joins and filters on ticker run on the physical integer codes.
+TICKER_CATEGORIES = pl.Categories("ticker", namespace="sf_trader")
+TICKER_DTYPE = pl.Categorical(TICKER_CATEGORIES)
+
+
+def encode_tickers(frame: FrameT, column: str = "ticker") -> FrameT:
+    """Encode a ticker column against the ticker dictionary."""
+    return frame.with_columns(pl.col(column).cast(TICKER_DTYPE))
+
+
+def decode_tickers(frame: FrameT, column: str = "ticker") -> FrameT:
+    """Decode a ticker column back to plain strings for display or export."""
+    return frame.with_columns(pl.col(column).cast(pl.String))
+
+
+def ticker_series(tickers: list[str], name: str = "ticker") -> pl.Series:
+    """Build an encoded ticker series for integer code joins and filters."""
+    return pl.Series(name, tickers, dtype=pl.String).cast(TICKER_DTYPE)
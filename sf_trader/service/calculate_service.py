@@ -1,15 +1,15 @@
 import polars as pl
 import numpy as np
+import datetime as dt
 import sf_quant.data as sfd
 
 from sf_trader.config import Config
 from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
 
-from sf_trader.dal.models.schema_models import (
-    SharesDF, PricesDF, DollarsDF, DollarsSchema, WeightsDF, WeightsSchema
-)
-
 from sf_trader.dal.models.portfolio_metrics import PortfolioMetrics
+from sf_trader.dal.models.portfolio_state import PortfolioState, align_to_tickers
+from sf_trader.dal.models.scenario_risk import ScenarioRisk, factor_covariance
+from sf_trader.dal.models.scenario_settings import StressScenario
 
 
 class CalculateService:
@@ -19,49 +19,13 @@ class CalculateService:
         portfolio_dao: PortfolioDAO | None = None,
     ):
         self.config = config
-        self.portfolio_dao = portfolio_dao or PortfolioDAO()
-
-
-    @staticmethod
-    def get_dollars(shares: SharesDF, prices: PricesDF) -> DollarsDF:
-        dollars = (
-            shares.join(prices, on="ticker", how="left")
-            .with_columns(pl.col("shares").mul("price").alias("dollars"))
-            .select("ticker", "dollars")
-        )
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
 
-        return DollarsSchema.validate(dollars)
 
     @staticmethod
-    def get_weights_from_dollars(
-        dollars: DollarsDF, account_value: float
-    ) -> WeightsDF:
-        weights = dollars.with_columns(
-            (pl.col("dollars") / pl.lit(account_value)).alias("weight")
-        ).sort("ticker")
-
-        return WeightsSchema.validate(weights)
-
-    @staticmethod
-    def decompose_weights(
-        benchmark: WeightsDF, weights: WeightsDF
-    ) -> tuple[np.ndarray]:
-        decomposed_weights = (
-            benchmark.select("ticker", pl.col("weight").alias("weight_bmk"))
-            .join(
-                weights,
-                on="ticker",
-                how="left",
-            )
-            .with_columns(
-                pl.col("weight").fill_null(0),
-            )
-            .with_columns(pl.col("weight").sub(pl.col("weight_bmk")).alias("weight_act"))
-            .sort("ticker")
-        )
-
-        total_weights = decomposed_weights["weight"].to_numpy()
-        active_weights = decomposed_weights["weight_act"].to_numpy()
+    def decompose_weights(state: PortfolioState) -> tuple[np.ndarray]:
+        total_weights = np.nan_to_num(state.weights)[state.in_benchmark]
+        active_weights = state.active_weights[state.in_benchmark]
 
         return total_weights, active_weights
 
@@ -97,49 +61,49 @@ class CalculateService:
             dollars_allocated=dollars_allocated,
         )
 
-    @staticmethod
+    @classmethod
     def get_top_long_positions(
-        shares: SharesDF,
-        prices: PricesDF,
-        dollars: DollarsDF,
-        weights: WeightsDF,
-        benchmark: WeightsDF,
-        account_value: float,
-        top_n: int = 10,
+        cls, state: PortfolioState, top_n: int | None = 10
     ) -> pl.DataFrame:
-        # Join all data together
-        positions = (
-            shares.join(prices, on="ticker", how="left")
-            .join(dollars, on="ticker", how="left")
-            .join(weights, on="ticker", how="left")
-            .join(
-                benchmark.select("ticker", pl.col("weight").alias("weight_bmk")),
-                on="ticker",
-                how="left",
-            )
-            .with_columns(
-                pl.col("weight_bmk").fill_null(0),
-            )
-            .with_columns(pl.col("weight").sub(pl.col("weight_bmk")).alias("weight_act"))
-            .with_columns(
-                pl.when(pl.col("weight_bmk") != 0)
-                .then((pl.col("weight_act") / pl.col("weight_bmk")) * 100)
-                .otherwise(None)
-                .alias("pct_chg_bmk")
-            )
-            .filter(pl.col("dollars") > 0)  # Only long positions
-            .sort("dollars", descending=True)
-            .head(top_n)
-            .select(
-                "ticker",
-                "shares",
-                "price",
-                "dollars",
-                "weight",
-                "weight_bmk",
-                "weight_act",
-                "pct_chg_bmk",
-            )
+        dollars = state.dollars
+        long_index = np.flatnonzero(dollars > 0)  # Only long positions
+        top_index = long_index[np.argsort(-dollars[long_index], kind="stable")[:top_n]]
+
+        return cls._positions_frame(state, top_index)
+
+    @classmethod
+    def get_positions_view(cls, state: PortfolioState) -> pl.DataFrame:
+        """Every held position, largest dollar value first."""
+        dollars = np.nan_to_num(state.dollars)
+        held_index = np.flatnonzero(state.shares != 0)
+        index = held_index[np.argsort(-dollars[held_index], kind="stable")]
+
+        return cls._positions_frame(state, index)
+
+    @staticmethod
+    def _positions_frame(state: PortfolioState, index: np.ndarray) -> pl.DataFrame:
+        dollars = state.dollars
+        benchmark = state.benchmark[index]
+        weight_act = state.weights[index] - benchmark
+        pct_chg_bmk = np.divide(
+            weight_act * 100,
+            benchmark,
+            out=np.full(len(index), np.nan),
+            where=benchmark != 0,
+        )
+
+        positions = pl.DataFrame(
+            {
+                "ticker": state.tickers[index],
+                "shares": state.shares[index],
+                "price": state.prices[index],
+                "dollars": dollars[index],
+                "weight": state.weights[index],
+                "weight_bmk": benchmark,
+                "weight_act": weight_act,
+                "pct_chg_bmk": pct_chg_bmk,
+            },
+            nan_to_null=True,
         )
 
         return positions
@@ -147,32 +111,164 @@ class CalculateService:
 
     @staticmethod
     def compute_risk(weights: np.ndarray, covariance_matrix: np.ndarray) -> float:
-        return np.sqrt(weights @ covariance_matrix @ weights.T)
-    
+        # Match the matrix dtype so float32 storage is never upcast into a copy
+        weights = weights.astype(covariance_matrix.dtype, copy=False)
+        return float(np.sqrt(weights @ covariance_matrix @ weights.T))
+
+
+    @staticmethod
+    def _permute_covariance_matrix(
+        covariance_matrix: pl.DataFrame, positions: np.ndarray, dtype: np.dtype
+    ) -> np.ndarray:
+        """Gather a barrid ordered covariance frame into ticker order one column at a time."""
+        values = covariance_matrix.drop("barrid")
+        n = len(positions)
+
+        assembled = np.empty((n, n), dtype=dtype)
+        for j, position in enumerate(positions):
+            assembled[:, j] = values.to_series(int(position)).to_numpy()[positions]
+
+        return assembled
+
+
+    @staticmethod
+    def _select_snapshot_covariance(
+        snapshot_tickers: list[str],
+        covariance_matrix: np.ndarray,
+        tickers: list[str],
+        dtype: np.dtype,
+    ) -> np.ndarray:
+        keep = np.isin(np.asarray(snapshot_tickers), np.asarray(tickers))
+        if keep.all():
+            return covariance_matrix.astype(dtype, copy=False)
 
-    def get_covariance_matrix(self, tickers: list[str]) -> np.ndarray:
+        index = np.flatnonzero(keep)
+        return covariance_matrix[np.ix_(index, index)].astype(dtype, copy=False)
+
+
+    def build_covariance_matrix(
+        self, tickers: list[str], dtype: np.dtype | str | None = None
+    ) -> tuple[list[str], np.ndarray]:
+        """Build the ticker ordered covariance matrix from the risk model. Returns the matrix's tickers too."""
+        dtype = np.dtype(dtype or self.config.covariance_dtype)
+
+        mapping = self.portfolio_dao.get_ticker_barrid_mapping(date=self.config.data_date)
         ids = (
-            self.portfolio_dao.get_ticker_barrid_mapping(date=self.config.data_date)
-            .join(pl.DataFrame({"ticker": tickers}), on="ticker", how="inner")
+            mapping.join(
+                pl.DataFrame({"ticker": tickers}, schema={"ticker": mapping.schema["ticker"]}),
+                on="ticker",
+                how="inner",
+            )
             .sort("ticker")
         )
-        tickers_ = ids["ticker"].to_list()
-        barrids = ids["barrid"].to_list()
-        sorted_barrids = sorted(barrids)
-        mapping = {barrid: ticker for barrid, ticker in zip(barrids, tickers_)}
-
-        covariance_matrix = (
-            sfd.construct_covariance_matrix(date_=self.config.data_date, barrids=sorted_barrids)
-            .with_columns(pl.col("barrid").replace(mapping))
-            .rename(mapping | {"barrid": "ticker"})
-            .sort("ticker")
+
+        return (
+            ids["ticker"].cast(pl.String).to_list(),
+            self.construct_covariance_matrix(self.config.data_date, ids["barrid"], dtype),
+        )
+
+    @classmethod
+    def construct_covariance_matrix(
+        cls, date: dt.date, barrids: pl.Series, dtype: np.dtype
+    ) -> np.ndarray:
+        """Covariance from the risk model for barrids given in ticker order, in that order."""
+        # sfd returns rows and columns in sorted barrid order, so positions maps
+        # each ticker (in ticker order) to its row in the barrid sorted matrix
+        sorted_index = barrids.arg_sort().to_numpy()
+        positions = np.empty_like(sorted_index)
+        positions[sorted_index] = np.arange(len(sorted_index))
+
+        covariance_matrix = sfd.construct_covariance_matrix(
+            date_=date, barrids=barrids.sort().to_list()
         )
 
-        # Sort columns to match row order
-        sorted_tickers = covariance_matrix["ticker"].to_list()
-        covariance_matrix = covariance_matrix.select(["ticker"] + sorted_tickers)
+        return cls._permute_covariance_matrix(covariance_matrix, positions, dtype)
+
+
+    def get_covariance_matrix(
+        self, tickers: list[str], dtype: np.dtype | str | None = None
+    ) -> np.ndarray:
+        dtype = np.dtype(dtype or self.config.covariance_dtype)
+
+        # Prefer the warmed snapshot covariance for the data date
+        snapshot = self.portfolio_dao.get_snapshot_covariance(date=self.config.data_date)
+        if snapshot is not None:
+            return self._select_snapshot_covariance(*snapshot, tickers=tickers, dtype=dtype)
+
+        _, covariance_matrix = self.build_covariance_matrix(tickers=tickers, dtype=dtype)
+
+        return covariance_matrix
+
+
+    def get_covariance_factor(
+        self, tickers: list[str], covariance_matrix: np.ndarray
+    ) -> np.ndarray:
+        """Rows of the covariance factor for the tickers, factored once per warmed snapshot."""
+        snapshot = self.portfolio_dao.get_snapshot_covariance(date=self.config.data_date)
+        if snapshot is None:
+            return factor_covariance(covariance_matrix)
+
+        snapshot_tickers, snapshot_covariance = snapshot
+        factor = self.portfolio_dao.get_snapshot_covariance_factor(date=self.config.data_date)
+        # A factor left from another covariance is rebuilt rather than trusted
+        if factor is None or factor.shape != snapshot_covariance.shape:
+            factor = factor_covariance(snapshot_covariance)
+            self.portfolio_dao.write_snapshot_covariance_factor(
+                date=self.config.data_date, factor=factor
+            )
 
-        return covariance_matrix.drop("ticker").to_numpy()
+        # Factor rows of a ticker subset still reproduce that subset's covariance
+        keep = np.isin(np.asarray(snapshot_tickers), np.asarray(tickers))
+        return factor if keep.all() else factor[keep]
 
-        
 
+    def get_stress_returns(self, scenario: StressScenario, tickers: list[str]) -> np.ndarray:
+        """Per-ticker returns of a stress scenario, aligned to the sorted tickers."""
+        ticker_index = np.asarray(tickers)
+
+        if scenario.date is not None:
+            returns = self.portfolio_dao.get_asset_column_by_date(
+                date=scenario.date, tickers=tickers, column="return"
+            )
+            # Assets returns are in percent
+            return align_to_tickers(ticker_index, returns, "return", fill=0.0) / 100
+
+        betas = self.portfolio_dao.get_asset_column_by_date(
+            date=self.config.data_date, tickers=tickers, column="predicted_beta"
+        )
+        betas = align_to_tickers(ticker_index, betas, "predicted_beta", fill=1.0)
+        return betas * scenario.market_shock
+
+
+    def get_scenario_risk(
+        self,
+        tickers: list[str],
+        total_weights: np.ndarray,
+        active_weights: np.ndarray,
+        covariance_matrix: np.ndarray,
+    ) -> pl.DataFrame:
+        """Monte Carlo VaR and expected shortfall plus stress scenario P&L.
+
+        Values are fractions of account value and losses are negative, so the VaR and ES
+        rows are the P&L at and beyond the loss quantile.
+        """
+        settings = self.config.scenario_settings
+        exposures = np.column_stack([total_weights, active_weights])
+
+        factor = self.get_covariance_factor(tickers, covariance_matrix)
+        pnl = ScenarioRisk(factor, settings.chunk_size, settings.seed).simulate(
+            exposures, settings.simulations, settings.horizon_days
+        )
+
+        rows = []
+        for confidence in settings.confidence_levels:
+            var, expected_shortfall = ScenarioRisk.value_at_risk(pnl, confidence)
+            rows.append((f"VaR {confidence * 100:g}%", *(-var)))
+            rows.append((f"ES {confidence * 100:g}%", *(-expected_shortfall)))
+
+        for scenario in settings.stress_scenarios:
+            rows.append((scenario.name, *(self.get_stress_returns(scenario, tickers) @ exposures)))
+
+        return pl.DataFrame(
+            rows, schema=["scenario", "total_pnl", "active_pnl"], orient="row"
+        )
@@ -1,10 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
 from sf_trader.config import Config
 
 from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
 from sf_trader.dal.dao.surface_dao import SurfaceDAO
-from sf_trader.dal.models.schema_models import PricesDF, SharesDF, OrdersDF, OrdersSchema
+from sf_trader.dal.dao.stage_cache_dao import StageCacheDAO
+from sf_trader.dal.models.schema_models import (
+    PricesDF,
+    SharesDF,
+    OrdersDF,
+    CancellationsDF,
+    FillsDF,
+    ViolationsDF,
+    BandRemovalsDF,
+    OpenOrdersDF,
+    OrdersSchema,
+    ViolationsSchema,
+    BandRemovalsSchema,
+)
+from sf_trader.dal.broker.order_journal import OrderJournal
+from sf_trader.dal.broker.order_tracker import TERMINAL_STATUSES
+from sf_trader.dal.models.table_model import TableName
 
 import polars as pl
+from rich import print
 
 
 class OrderService:
@@ -13,21 +33,78 @@ class OrderService:
         config: Config,
         portfolio_dao: PortfolioDAO | None = None,
         surface_dao: SurfaceDAO | None = None,
+        stage_cache_dao: StageCacheDAO | None = None,
+        order_journal: OrderJournal | None = None,
     ):
-        self.portfolio_dao = portfolio_dao or PortfolioDAO()
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
         self.surface_dao = surface_dao or SurfaceDAO(config)
+        self.stage_cache_dao = stage_cache_dao or (
+            StageCacheDAO(config.stage_cache_dir) if config.stage_cache_dir else None
+        )
+        self.order_journal = order_journal or (
+            OrderJournal(config.order_journal_path) if config.order_journal_path else None
+        )
         self.config = config
         self.broker = config.broker
 
 
-    def get_write_orders(self) -> OrdersDF:
-        """Reads optimal shares and computes orders, then writes orders to surface"""
+    def _orders_cache_key(
+        self,
+        current_shares: SharesDF,
+        optimal_shares: SharesDF,
+        open_orders: OpenOrdersDF | None,
+    ) -> str:
+        date = self.config.data_date
+        bands = self.config.no_trade_bands
+        input_files = self.portfolio_dao.get_input_files(date, [TableName.ASSETS])
+
+        # Order IDs don't change the deltas, only what is still working
+        working = None
+        if open_orders is not None:
+            working = StageCacheDAO.frame_digest(open_orders.select("ticker", "action", "remaining"))
+
+        return self.stage_cache_dao.key(
+            "orders",
+            {
+                "data_date": date,
+                "ignore_tickers": sorted(self.config.ignore_tickers),
+                "no_trade_bands": bands and asdict(bands),
+                "portfolio": StageCacheDAO.frame_digest(optimal_shares),
+                "positions": StageCacheDAO.frame_digest(current_shares),
+                "open_orders": working,
+                "input_files": [StageCacheDAO.file_fingerprint(file) for file in input_files],
+            },
+        )
+
+    def get_write_orders(self, force: bool = False) -> OrdersDF:
+        """Reads optimal shares and computes orders, then writes orders to surface
+
+        Shares still working in open orders count toward the current position, so only the
+        residual is ordered. With a stage cache configured, orders already computed from the
+        same portfolio, positions, open orders and prices are written straight from the
+        cache unless force is set.
+        """
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Get current shares and open orders while reading the surface
+            current_shares_future = executor.submit(self.broker.get_positions)
+            open_orders_future = executor.submit(self.broker.get_open_orders)
+
+            # Get optimal shares from surface
+            optimal_shares = self.surface_dao.read_portfolio()
 
-        # Get optimal shares from surface
-        optimal_shares = self.surface_dao.read_portfolio()
+            current_shares = current_shares_future.result()
+            open_orders = open_orders_future.result()
 
-        # Get current shares
-        current_shares = self.broker.get_positions()
+        cache_key = None
+        if self.stage_cache_dao is not None:
+            cache_key = self._orders_cache_key(current_shares, optimal_shares, open_orders)
+            cached = None if force else self.stage_cache_dao.read("orders", cache_key)
+            if cached is not None:
+                print("Inputs unchanged, using the cached orders")
+                orders = OrdersSchema.validate(cached)
+                self.surface_dao.write_orders(orders)
+                return orders
 
         # Compute ticker list
         tickers = list(
@@ -40,32 +117,289 @@ class OrderService:
 
         # Get order deltas
         orders = self.get_order_deltas(
-            current_shares=current_shares, optimal_shares=optimal_shares, prices=prices
+            current_shares=current_shares,
+            optimal_shares=optimal_shares,
+            prices=prices,
+            open_orders=open_orders,
         )
 
+        # Report what the no-trade bands held back
+        if self.config.no_trade_bands is not None:
+            removals = self.get_band_removals(
+                current_shares=current_shares,
+                optimal_shares=optimal_shares,
+                prices=prices,
+                open_orders=open_orders,
+            )
+            for band in removals.iter_rows(named=True):
+                print(
+                    f"{band['band']} band removed {band['orders']} order(s), "
+                    f"${band['turnover']:,.0f} of turnover"
+                )
+
+        if cache_key is not None:
+            self.stage_cache_dao.write("orders", cache_key, orders)
+
         # Write orders to surface
         self.surface_dao.write_orders(OrdersSchema.validate(orders))
 
         return orders
 
 
-    def post_orders(self) -> None:
+    def post_orders(self, wait: float = 0, resume: bool = False) -> None:
+        """Posts the surface orders, journaling each run's intents and the broker's acks.
+
+        With resume set, the orders come from the journal instead: the last run's orders
+        the broker never acked, netted against the broker's book like any other run.
+        """
         # Connect to broker
         broker = self.broker
+        journal = self.order_journal
+
+        if resume:
+            if journal is None:
+                raise ValueError("Resuming needs 'order-journal-path' in the config")
+
+            # Get the orders the last run on this data date never got acked
+            orders = journal.resume(self.config.data_date)
+            if orders.is_empty():
+                print("Every journaled order was acked, nothing to resume")
+                return
+            print(f"Resuming {orders.height} unacked order(s) from run {journal.run}")
+        else:
+            # Get orders from surface
+            orders = self.surface_dao.read_orders()
+
+        # Only post what fills and working orders haven't already covered, so reruns are safe.
+        # An order may have reached the broker without its ack being journaled, so resumed
+        # orders are netted too, keeping their rows so acks still map to the journal.
+        residual_orders = self._net_residual_orders(orders.with_row_index("row"))
+        if residual_orders.height < orders.height:
+            print(
+                f"{orders.height - residual_orders.height} order(s) already filled or working, "
+                f"{residual_orders.height} left to post"
+            )
+        if residual_orders.is_empty():
+            return
+        if resume:
+            journal.retain(residual_orders["row"].to_list())
+        orders = OrdersSchema.validate(residual_orders)
+
+        # Block the whole submission on any pre-trade violation
+        if self.config.pre_trade_limits is not None:
+            violations = self.run_pre_trade_checks(orders)
+            if not violations.is_empty():
+                print(f"✗ {violations.height} pre-trade violation(s), no orders were posted")
+                print(violations)
+                return
+
+        # Execute trades, with every intent durable before the first order is sent
+        if journal is None:
+            broker.post_orders(orders=orders)
+        else:
+            if not resume:
+                journal.begin(orders, self.config.data_date)
+            try:
+                broker.post_orders(orders=orders, on_submitted=journal.ack)
+            finally:
+                # Acks still buffered reach the journal even when posting is interrupted
+                journal.close()
+
+        # Follow fills as they arrive
+        if wait > 0:
+            self.track_fills(timeout=wait)
+
+    def get_residual_orders(self, orders: OrdersDF) -> OrdersDF:
+        """Caps each order at what the portfolio still needs after positions and open orders.
+
+        Orders left over from an earlier run shrink by whatever has filled or is working
+        since, and drop out once the position is covered.
+        """
+        return OrdersSchema.validate(self._net_residual_orders(orders))
+
+    def _net_residual_orders(self, orders: pl.DataFrame) -> pl.DataFrame:
+        """The residual orders, keeping any extra columns of the orders they came from."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Fetch positions and every working order in bulk while reading the surface
+            current_shares_future = executor.submit(self.broker.get_positions)
+            open_orders_future = executor.submit(self.broker.get_open_orders)
+
+            optimal_shares = self.surface_dao.read_portfolio()
+
+            current_shares = current_shares_future.result()
+            open_orders = open_orders_future.result()
+
+        residual = self._order_deltas_query(
+            orders.select("ticker", "price").unique("ticker", maintain_order=True),
+            current_shares,
+            optimal_shares,
+            open_orders,
+        ).select("ticker", "action", pl.col("shares").alias("residual_shares"))
+
+        # Several orders for a ticker and side share its residual in their original order
+        covered_before = pl.col("shares").cum_sum().over("ticker", "action") - pl.col("shares")
+
+        return (
+            orders.lazy()
+            .join(residual, on=["ticker", "action"], how="inner", maintain_order="left")
+            .with_columns(
+                (pl.col("residual_shares") - covered_before)
+                .clip(0.0, pl.col("shares"))
+                .alias("shares")
+            )
+            .filter(pl.col("shares").gt(0))
+            .drop("residual_shares")
+            .collect()
+        )
+
+    def run_pre_trade_checks(self, orders: OrdersDF) -> ViolationsDF:
+        """Fetch reference data and check orders against the configured pre-trade limits."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            account_value_future = executor.submit(self.broker.get_account_value)
+
+            reference_prices = self.portfolio_dao.get_prices_by_date(
+                date=self.config.data_date, tickers=orders["ticker"].cast(pl.String).to_list()
+            )
+            restricted_tickers = self.surface_dao.read_restricted_tickers()
+
+            account_value = account_value_future.result()
+
+        return self.check_orders(orders, reference_prices, account_value, restricted_tickers)
+
+    def check_orders(
+        self,
+        orders: OrdersDF,
+        reference_prices: PricesDF,
+        account_value: float,
+        restricted_tickers: pl.DataFrame,
+    ) -> ViolationsDF:
+        """Check every order against the pre-trade limits in one pass over the order frame."""
+        limits = self.config.pre_trade_limits
+        ticker_dtype = orders.schema["ticker"]
+
+        notional = pl.col("price").mul(pl.col("shares"))
+        pct_account = notional.truediv(account_value)
+        price_deviation = pl.col("price").truediv(pl.col("reference_price")).sub(1).abs()
+
+        # (check, violated, value, limit), a check is skipped when its limit is not set
+        checks = [
+            ("restricted", pl.col("restricted"), pl.lit(None), None),
+            (
+                "invalid_price",
+                pl.col("price").le(0) | pl.col("price").is_nan(),
+                pl.col("price"),
+                None,
+            ),
+        ]
+        if limits.max_order_notional is not None:
+            checks.append(
+                (
+                    "max_order_notional",
+                    notional.gt(limits.max_order_notional),
+                    notional,
+                    limits.max_order_notional,
+                )
+            )
+        if limits.max_order_pct_account is not None:
+            checks.append(
+                (
+                    "max_order_pct_account",
+                    pct_account.gt(limits.max_order_pct_account),
+                    pct_account,
+                    limits.max_order_pct_account,
+                )
+            )
+        if limits.max_price_deviation_pct is not None:
+            checks.append(
+                ("missing_reference_price", pl.col("reference_price").is_null(), pl.lit(None), None)
+            )
+            checks.append(
+                (
+                    "max_price_deviation_pct",
+                    price_deviation.gt(limits.max_price_deviation_pct),
+                    price_deviation,
+                    limits.max_price_deviation_pct,
+                )
+            )
+
+        checked_orders = (
+            orders.lazy()
+            .join(
+                reference_prices.lazy()
+                .rename({"price": "reference_price"})
+                .with_columns(pl.col("ticker").cast(ticker_dtype)),
+                on="ticker",
+                how="left",
+            )
+            .join(
+                restricted_tickers.lazy().with_columns(
+                    pl.col("ticker").cast(ticker_dtype), pl.lit(True).alias("restricted")
+                ),
+                on="ticker",
+                how="left",
+            )
+            .with_columns(pl.col("restricted").fill_null(False))
+        )
+
+        # Every check filters the same joined plan, which is computed once and shared
+        violations = [
+            checked_orders.filter(violated.fill_null(False)).select(
+                "ticker",
+                pl.lit(check).alias("check"),
+                value.cast(pl.Float64).alias("value"),
+                pl.lit(limit, dtype=pl.Float64).alias("limit"),
+            )
+            for check, violated, value, limit in checks
+        ]
 
-        # Get orders from surface
-        orders = self.surface_dao.read_orders()
+        if limits.max_gross_turnover_pct is not None:
+            gross_turnover = notional.sum().truediv(account_value)
+            violations.append(
+                orders.lazy()
+                .select(
+                    pl.lit(None, dtype=ticker_dtype).alias("ticker"),
+                    pl.lit("max_gross_turnover_pct").alias("check"),
+                    gross_turnover.alias("value"),
+                    pl.lit(limits.max_gross_turnover_pct, dtype=pl.Float64).alias("limit"),
+                )
+                .filter(pl.col("value").gt(limits.max_gross_turnover_pct))
+            )
 
-        # Execute trades
-        broker.post_orders(orders=orders)
+        return ViolationsSchema.validate(pl.concat(violations).collect())
 
+    def track_fills(self, timeout: float) -> FillsDF | None:
+        """Follow order status events until every order is done or the timeout passes."""
+        tracker = self.broker.get_order_tracker()
+        if tracker is None:
+            print("Broker does not report order status")
+            return None
+
+        fills = None
+        for fills in tracker.stream(timeout=timeout):
+            if self.config.order_events_dir:
+                tracker.persist(self.config.order_events_dir)
+
+            filled = fills["filled"].sum()
+            remaining = fills["remaining"].sum()
+            done = fills["status"].is_in(TERMINAL_STATUSES).sum()
+            print(
+                f"{done}/{fills.height} orders done, {filled:,.0f} shares filled, {remaining:,.0f} remaining"
+            )
 
-    def cancel_orders(self) -> None:
+        return fills
+
+
+    def cancel_orders(
+        self,
+        tickers: list[str] | None = None,
+        action: str | None = None,
+        global_cancel: bool = False,
+    ) -> CancellationsDF:
         # Connect to broker
         broker = self.broker
 
-        # Cancel all open orders
-        broker.cancel_orders()
+        # Cancel open orders, all of them when no filter is given
+        return broker.cancel_orders(tickers=tickers, action=action, global_cancel=global_cancel)
 
 
     def get_order_deltas(
@@ -73,20 +407,127 @@ class OrderService:
         prices: PricesDF,
         current_shares: SharesDF,
         optimal_shares: SharesDF,
+        open_orders: OpenOrdersDF | None = None,
     ) -> OrdersDF:
+        orders = (
+            self._order_deltas_query(prices, current_shares, optimal_shares, open_orders)
+            # Remove orders inside a no-trade band
+            .filter(pl.col("band").is_null())
+            .select("ticker", "price", "shares", "action")
+            .collect()
+        )
+
+        return OrdersSchema.validate(orders)
+
+    def get_band_removals(
+        self,
+        prices: PricesDF,
+        current_shares: SharesDF,
+        optimal_shares: SharesDF,
+        open_orders: OpenOrdersDF | None = None,
+    ) -> BandRemovalsDF:
+        """Orders, shares and dollar turnover each no-trade band removed from the deltas."""
+        removals = (
+            self._order_deltas_query(prices, current_shares, optimal_shares, open_orders)
+            .filter(pl.col("band").is_not_null())
+            .group_by("band")
+            .agg(
+                pl.len().cast(pl.Int64).alias("orders"),
+                pl.col("shares").sum(),
+                pl.col("shares").mul(pl.col("price")).sum().alias("turnover"),
+            )
+            .sort("band")
+            .collect()
+        )
+
+        return BandRemovalsSchema.validate(removals)
+
+    def _band_expression(self) -> pl.Expr:
+        """The first no-trade band an order falls in, or null when it is traded.
+
+        Orders that close a position are never banded, so exited names don't linger.
+        """
+        bands = self.config.no_trade_bands
+        band = pl.lit(None, dtype=pl.String)
+        if bands is None:
+            return band
+
+        notional = pl.col("shares").mul(pl.col("price"))
+        target = pl.col("optimal_shares").abs()
+
+        # (band, inside), an order removed by several bands is counted under the first
+        checks = []
+        if bands.min_shares is not None:
+            checks.append(("min-shares", pl.col("shares").lt(bands.min_shares)))
+        if bands.min_notional is not None:
+            checks.append(("min-notional", notional.lt(bands.min_notional)))
+        if bands.pct_target_weight is not None:
+            checks.append(
+                ("pct-target-weight", pl.col("shares").lt(target.mul(bands.pct_target_weight)))
+            )
+
+        for name, inside in reversed(checks):
+            band = pl.when(inside).then(pl.lit(name)).otherwise(band)
+
+        return pl.when(pl.col("optimal_shares").ne(0)).then(band)
+
+    @staticmethod
+    def get_pending_shares(open_orders: OpenOrdersDF | None) -> pl.LazyFrame:
+        """Signed shares still working per ticker, buys positive and sells negative."""
+        if open_orders is None:
+            return pl.LazyFrame(schema={"ticker": pl.String, "pending_shares": pl.Float64})
+
+        signed = (
+            pl.when(pl.col("action").eq("BUY"))
+            .then(pl.col("remaining"))
+            .otherwise(pl.col("remaining").neg())
+        )
+
+        return open_orders.lazy().group_by("ticker").agg(signed.sum().alias("pending_shares"))
+
+    def _order_deltas_query(
+        self,
+        prices: PricesDF,
+        current_shares: SharesDF,
+        optimal_shares: SharesDF,
+        open_orders: OpenOrdersDF | None = None,
+    ) -> pl.LazyFrame:
+        ticker_dtype = prices.schema["ticker"]
+
         # Prep shares dataframes for join
-        current_shares = current_shares.rename({"shares": "current_shares"})
-        optimal_shares = optimal_shares.rename({"shares": "optimal_shares"})
+        current_shares = current_shares.lazy().rename({"shares": "current_shares"})
+        optimal_shares = optimal_shares.lazy().rename({"shares": "optimal_shares"})
+        pending_shares = self.get_pending_shares(open_orders)
 
-        orders = (
-            prices
+        return (
+            prices.lazy()
             # Joins
-            .join(current_shares, on="ticker", how="left")
-            .join(optimal_shares, on="ticker", how="left")
+            .join(
+                current_shares.with_columns(pl.col("ticker").cast(ticker_dtype)),
+                on="ticker",
+                how="left",
+            )
+            .join(
+                optimal_shares.with_columns(pl.col("ticker").cast(ticker_dtype)),
+                on="ticker",
+                how="left",
+            )
+            .join(
+                pending_shares.with_columns(pl.col("ticker").cast(ticker_dtype)),
+                on="ticker",
+                how="left",
+            )
             # Fill nulls with 0
-            .with_columns(pl.col("current_shares", "optimal_shares").fill_null(0))
-            # Compute share differential
-            .with_columns(pl.col("optimal_shares").sub("current_shares").alias("shares"))
+            .with_columns(
+                pl.col("current_shares", "optimal_shares", "pending_shares").fill_null(0)
+            )
+            # Compute share differential, net of shares already working
+            .with_columns(
+                pl.col("optimal_shares")
+                .sub("current_shares")
+                .sub("pending_shares")
+                .alias("shares")
+            )
             # Compute order side
             .with_columns(
                 pl.when(pl.col("shares").gt(0))
@@ -98,8 +539,8 @@ class OrderService:
             )
             # Absolute value the shares
             .with_columns(pl.col("shares").abs())
-            # Select
-            .select("ticker", "price", "shares", "action")
+            # Tag orders inside a no-trade band
+            .with_columns(self._band_expression().alias("band"))
             # Filter
             .filter(
                 pl.col("ticker")
@@ -112,5 +553,3 @@ class OrderService:
             # Sort
             .sort("ticker")
         )
-
-        return OrdersSchema.validate(orders)
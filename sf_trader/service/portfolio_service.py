@@ -1,10 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from sf_trader.config import Config
 
 from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
 from sf_trader.dal.dao.surface_dao import SurfaceDAO
+from sf_trader.dal.dao.stage_cache_dao import StageCacheDAO
+from sf_trader.dal.models.table_model import TableName
 from sf_trader.dal.models.schema_models import SharesDF, SharesSchema, WeightsDF, PricesDF
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+from sf_trader.dal.models.portfolio_state import align_to_tickers
+from sf_trader.dal.models.reoptimizer import Reoptimizer, ReoptimizeResult
+from sf_trader.service.calculate_service import CalculateService
 
+import numpy as np
 import polars as pl
+from rich import print
 
 
 class PortfolioService:
@@ -13,9 +23,17 @@ class PortfolioService:
         config: Config,
         portfolio_dao: PortfolioDAO | None = None,
         surface_dao: SurfaceDAO | None = None,
+        stage_cache_dao: StageCacheDAO | None = None,
+        calculate_service: CalculateService | None = None,
     ):
-        self.portfolio_dao = portfolio_dao or PortfolioDAO()
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
         self.surface_dao = surface_dao or SurfaceDAO(config)
+        self.stage_cache_dao = stage_cache_dao or (
+            StageCacheDAO(config.stage_cache_dir) if config.stage_cache_dir else None
+        )
+        self.calculate_service = calculate_service or CalculateService(
+            config, portfolio_dao=self.portfolio_dao
+        )
         self.config = config
         self.broker = config.broker
 
@@ -36,24 +54,136 @@ class PortfolioService:
 
         return SharesSchema.validate(optimal_shares)
 
-    def get_write_portfolio(self) -> None:
-        """Gets the portfolio and writes it to the surface."""
+    def _portfolio_cache_key(self, account_value: float) -> str:
+        date = self.config.data_date
+        input_files = self.portfolio_dao.get_input_files(
+            date, [TableName.ASSETS, TableName.OPTIMAL_WEIGHTS]
+        )
 
-        # Get universe
-        universe = self.portfolio_dao.get_universe_by_date(date=self.config.data_date)
+        return self.stage_cache_dao.key(
+            "portfolio",
+            {
+                "data_date": date,
+                "account_value": account_value,
+                "input_files": [StageCacheDAO.file_fingerprint(file) for file in input_files],
+            },
+        )
+
+    def get_write_portfolio(self, force: bool = False) -> None:
+        """Gets the portfolio and writes it to the surface.
+
+        With a stage cache configured, a portfolio already computed from the same inputs is
+        written straight from the cache unless force is set.
+        """
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Get account value and optimal weights concurrently (independent of the universe)
+            account_value_future = executor.submit(self.broker.get_account_value)
+            optimal_weights_future = executor.submit(
+                self.portfolio_dao.get_optimal_weights_by_date, date=self.config.data_date
+            )
 
-        # Get account value
-        account_value = self.broker.get_account_value()
+            # The key waits on the account value while the optimal weights are read
+            cache_key = None
+            if self.stage_cache_dao is not None:
+                cache_key = self._portfolio_cache_key(account_value_future.result())
+                cached = None if force else self.stage_cache_dao.read("portfolio", cache_key)
+                if cached is not None:
+                    print("Inputs unchanged, using the cached portfolio")
+                    self.surface_dao.write_portfolio(SharesSchema.validate(cached))
+                    return
 
-        # Get prices
-        prices = self.portfolio_dao.get_prices_by_date(date=self.config.data_date, tickers=universe)
+            # Get universe
+            universe = self.portfolio_dao.get_universe_by_date(date=self.config.data_date)
 
-        # Get optimal weights
-        optimal_weights = self.portfolio_dao.get_optimal_weights_by_date(date=self.config.data_date)
+            # Get prices
+            prices = self.portfolio_dao.get_prices_by_date(date=self.config.data_date, tickers=universe)
+
+            account_value = account_value_future.result()
+            optimal_weights = optimal_weights_future.result()
 
         # Get optimal shares
         optimal_shares = self.get_optimal_shares(
             weights=optimal_weights, prices=prices, account_value=account_value
         )
 
-        self.surface_dao.write_portfolio(SharesSchema.validate(optimal_shares))
\ No newline at end of file
+        if cache_key is not None:
+            self.stage_cache_dao.write("portfolio", cache_key, optimal_shares)
+
+        self.surface_dao.write_portfolio(SharesSchema.validate(optimal_shares))
+
+    def get_write_reoptimized_portfolio(
+        self, turnover_penalty: float, live_prices: bool = False
+    ) -> ReoptimizeResult:
+        """Re-solves the upstream weights against current holdings and writes the portfolio to the surface.
+
+        Only names in the benchmark universe that are targeted or held take part, so the
+        problem stays on the cached covariance.
+        """
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Get broker state and optimal weights concurrently
+            account_value_future = executor.submit(self.broker.get_account_value)
+            positions_future = executor.submit(self.broker.get_positions)
+            optimal_weights_future = executor.submit(
+                self.portfolio_dao.get_optimal_weights_by_date, date=self.config.data_date
+            )
+
+            benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=self.config.data_date)
+            positions = positions_future.result()
+            optimal_weights = optimal_weights_future.result()
+
+            tickers = sorted(
+                set(benchmark["ticker"].cast(pl.String).to_list())
+                & (
+                    set(optimal_weights["ticker"].cast(pl.String).to_list())
+                    | set(positions["ticker"].cast(pl.String).to_list())
+                )
+            )
+            covariance_future = executor.submit(
+                self.calculate_service.get_covariance_matrix, tickers=tickers
+            )
+            prices_future = executor.submit(
+                self.portfolio_dao.get_prices_by_date, date=self.config.data_date, tickers=tickers
+            )
+
+            # Quote while the covariance loads
+            quoted_prices = self.broker.get_prices(tickers) if live_prices else None
+
+            account_value = account_value_future.result()
+            covariance_matrix = covariance_future.result()
+            prices = prices_future.result()
+
+        universe = np.asarray(tickers)
+        price = align_to_tickers(universe, prices, "price")
+        if quoted_prices is not None:
+            quoted = align_to_tickers(universe, quoted_prices, "price")
+            price = np.where(np.isnan(quoted), price, quoted)
+
+        current = np.nan_to_num(
+            align_to_tickers(universe, positions, "shares", fill=0.0) * price / account_value
+        )
+        target = align_to_tickers(universe, optimal_weights, "weight", fill=0.0)
+
+        result = Reoptimizer(covariance_matrix, turnover_penalty).solve(target, current)
+
+        optimal_shares = (
+            pl.DataFrame(
+                {
+                    "ticker": tickers,
+                    "shares": np.floor(account_value * result.weights / price),
+                },
+                nan_to_null=True,
+            )
+            .filter(pl.col("shares").ne(0))
+            .pipe(encode_tickers)
+        )
+
+        self.surface_dao.write_portfolio(SharesSchema.validate(optimal_shares))
+
+        print(
+            f"Re-optimized {len(tickers)} names in {result.iterations} iterations: "
+            f"tracking error {result.tracking_error:.2%}, turnover {result.turnover:.2%}"
+        )
+
+        return result
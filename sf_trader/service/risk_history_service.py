@@ -0,0 +1,188 @@
+import datetime as dt
+import multiprocessing
+import os
+import numpy as np
+import polars as pl
+
+from concurrent.futures import ProcessPoolExecutor
+
+from sf_trader.config import Config
+
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.dao.surface_dao import SurfaceDAO
+from sf_trader.dal.models.schema_models import RiskHistoryDF, RiskHistorySchema
+from sf_trader.dal.models.table_model import TableName
+from sf_trader.dal.models.ticker_dictionary import decode_tickers, encode_tickers
+from sf_trader.service.calculate_service import CalculateService
+
+from rich import print
+
+HOLDINGS_SOURCES = ("optimal-weights", "portfolio")
+
+# Set in each worker process by _init_worker
+_worker: "RiskHistoryWorker | None" = None
+
+
+class RiskHistoryWorker:
+    """Computes one date's risk in a worker process, reusing the yearly file of the current year."""
+
+    def __init__(
+        self,
+        covariance_dtype: str,
+        mapping_index_path: str | None,
+        shares: pl.DataFrame | None,
+    ) -> None:
+        self.portfolio_dao = PortfolioDAO(mapping_index_path=mapping_index_path, cache_years=True)
+        self.covariance_dtype = np.dtype(covariance_dtype)
+        self.shares = None if shares is None else shares.pipe(encode_tickers)
+
+    def get_weights(self, date: dt.date) -> pl.DataFrame:
+        """The date's optimal weights, or the portfolio surface replayed at the date's prices."""
+        if self.shares is None:
+            return self.portfolio_dao.get_optimal_weights_by_date(date=date)
+
+        prices = self.portfolio_dao.get_prices_by_date(
+            date=date, tickers=self.shares["ticker"].cast(pl.String).to_list()
+        )
+        dollars = pl.col("shares").mul(pl.col("price"))
+
+        # The replayed book is valued on its own, so weights sum to one every day
+        return self.shares.join(prices, on="ticker", how="inner").select(
+            "ticker", dollars.truediv(dollars.sum()).alias("weight")
+        )
+
+    def compute(self, date: dt.date) -> dict:
+        # Dates arrive in order, so earlier years are not read again
+        self.portfolio_dao.release_years(before=date.year)
+
+        benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=date)
+        weights = self.get_weights(date)
+        mapping = self.portfolio_dao.get_ticker_barrid_mapping(date=date)
+
+        # Risk is measured over the benchmark universe, as in the portfolio summary
+        frame = (
+            benchmark.rename({"weight": "weight_bmk"})
+            .join(weights, on="ticker", how="left")
+            .join(mapping, on="ticker", how="inner")
+            .with_columns(pl.col("weight").fill_null(0.0))
+            .sort("ticker")
+        )
+        covariance_matrix = CalculateService.construct_covariance_matrix(
+            date, frame["barrid"], self.covariance_dtype
+        )
+
+        return {
+            "date": date,
+            **compute_risk_metrics(
+                frame["weight"].to_numpy(), frame["weight_bmk"].to_numpy(), covariance_matrix
+            ),
+        }
+
+
+def compute_risk_metrics(
+    weights: np.ndarray, benchmark: np.ndarray, covariance_matrix: np.ndarray
+) -> dict:
+    num_long = int(np.sum(weights > 0))
+    num_short = int(np.sum(weights < 0))
+
+    return {
+        "gross_exposure": float(np.sum(np.abs(weights))),
+        "net_exposure": float(np.sum(weights)),
+        "num_long": num_long,
+        "num_short": num_short,
+        "num_positions": num_long + num_short,
+        "active_risk": CalculateService.compute_risk(weights - benchmark, covariance_matrix),
+        "total_risk": CalculateService.compute_risk(weights, covariance_matrix),
+    }
+
+
+def split_dates(dates: list[dt.date], chunks: int) -> list[list[dt.date]]:
+    """Split sorted dates into contiguous chunks, so each chunk touches few yearly files."""
+    return [
+        chunk.tolist()
+        for chunk in np.array_split(np.array(dates, dtype=object), chunks)
+        if len(chunk)
+    ]
+
+
+def _init_worker(
+    covariance_dtype: str, mapping_index_path: str | None, shares: pl.DataFrame | None
+) -> None:
+    global _worker
+    _worker = RiskHistoryWorker(covariance_dtype, mapping_index_path, shares)
+
+
+def _compute_dates(dates: list[dt.date]) -> list[dict]:
+    return [_worker.compute(date) for date in dates]
+
+
+class RiskHistoryService:
+    def __init__(
+        self,
+        config: Config,
+        portfolio_dao: PortfolioDAO | None = None,
+        surface_dao: SurfaceDAO | None = None,
+    ):
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
+        self.surface_dao = surface_dao or SurfaceDAO(config)
+        self.config = config
+
+
+    def get_risk_history(
+        self,
+        start: dt.date,
+        end: dt.date,
+        source: str = "optimal-weights",
+        workers: int | None = None,
+    ) -> RiskHistoryDF:
+        """Daily risk, exposures and position counts for [start, end] on a pool of processes."""
+        if source not in HOLDINGS_SOURCES:
+            raise ValueError(
+                f"Unknown holdings source '{source}', expected one of {HOLDINGS_SOURCES}"
+            )
+
+        if source == "optimal-weights":
+            dates = self.portfolio_dao.get_dates_between(TableName.OPTIMAL_WEIGHTS, start, end)
+            shares = None
+        else:
+            dates = self.portfolio_dao.get_dates_between(TableName.ASSETS, start, end)
+            shares = self.surface_dao.read_portfolio().pipe(decode_tickers)
+
+        if not dates:
+            return RiskHistorySchema.create_empty()
+
+        # Workers only read the mapping index, so it is brought up to date here first
+        if self.portfolio_dao.mapping_index_dao is not None:
+            self.portfolio_dao.update_mapping_index(end=dates[-1])
+
+        workers = min(workers or os.cpu_count() or 1, len(dates))
+
+        # Spawned rather than forked, polars' thread pool does not survive a fork
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.config.covariance_dtype, self.config.mapping_index_path, shares),
+        ) as executor:
+            # One contiguous run of dates per worker, so each loads as few years as it can
+            rows = [
+                row
+                for chunk in executor.map(_compute_dates, split_dates(dates, workers))
+                for row in chunk
+            ]
+
+        return RiskHistorySchema.validate(pl.DataFrame(rows).sort("date"))
+
+
+    def write_risk_history(
+        self,
+        start: dt.date,
+        end: dt.date,
+        output: str,
+        source: str = "optimal-weights",
+        workers: int | None = None,
+    ) -> None:
+        history = self.get_risk_history(start=start, end=end, source=source, workers=workers)
+        self.surface_dao.write_risk_history(history, output)
+
+        print(f"Wrote {history.height} day(s) of risk history to {output}")
@@ -0,0 +1,50 @@
+import polars as pl
+
+from sf_trader.config import Config
+
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.models.scenario_risk import factor_covariance
+from sf_trader.service.calculate_service import CalculateService
+
+
+class SnapshotService:
+    def __init__(
+        self,
+        config: Config,
+        portfolio_dao: PortfolioDAO | None = None,
+        calculate_service: CalculateService | None = None,
+    ):
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
+        self.calculate_service = calculate_service or CalculateService(
+            config, portfolio_dao=self.portfolio_dao
+        )
+        self.config = config
+
+
+    def warm(self) -> None:
+        """Pulls the data date's slices and covariance into the local snapshot."""
+
+        # Write date slices (replaces any existing snapshot for the date)
+        self.portfolio_dao.write_snapshot(date=self.config.data_date)
+
+        # Fold any new assets days into the ticker to barrid mapping index
+        if self.portfolio_dao.mapping_index_dao is not None:
+            self.portfolio_dao.update_mapping_index(end=self.config.data_date)
+
+        # Get universe from the new snapshot
+        benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=self.config.data_date)
+        universe = benchmark["ticker"].cast(pl.String).sort().to_list()
+
+        # Build and write the ticker ordered covariance matrix
+        tickers, covariance_matrix = self.calculate_service.build_covariance_matrix(
+            tickers=universe
+        )
+        self.portfolio_dao.write_snapshot_covariance(
+            date=self.config.data_date, tickers=tickers, covariance_matrix=covariance_matrix
+        )
+
+        # Factor the covariance once for the scenario risk engine
+        if self.config.scenario_settings is not None:
+            self.portfolio_dao.write_snapshot_covariance_factor(
+                date=self.config.data_date, factor=factor_covariance(covariance_matrix)
+            )
@@ -1,12 +1,18 @@
+import numpy as np
 import polars as pl
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from sf_trader.config import Config
 from rich.console import Console
 
 from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.dao.surface_dao import SurfaceDAO
 from sf_trader.service.ui_service import UIService
 from sf_trader.service.calculate_service import CalculateService
+from sf_trader.service.order_service import OrderService
+from sf_trader.dal.models.portfolio_state import PortfolioState, align_to_tickers
 from sf_trader.dal.models.schema_models import (
-    SharesDF, OrdersDF, PricesDF, SharesSchema, 
+    SharesDF, OrdersDF, SharesSchema,
 )
 
 
@@ -16,82 +22,120 @@ class SummaryService:
         config: Config,
         portfolio_dao: PortfolioDAO | None = None,
         calculate_service: CalculateService | None = None,
+        surface_dao: SurfaceDAO | None = None,
+        order_service: OrderService | None = None,
     ):
-        self.portfolio_dao = portfolio_dao or PortfolioDAO()
-        self.calculate_service = calculate_service or CalculateService(config)
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
+        self.surface_dao = surface_dao or SurfaceDAO(config)
+        self.calculate_service = calculate_service or CalculateService(
+            config, portfolio_dao=self.portfolio_dao
+        )
+        self.order_service = order_service or OrderService(
+            config, portfolio_dao=self.portfolio_dao, surface_dao=self.surface_dao
+        )
         self.ui_service = UIService()
         self.config = config
         self.broker = config.broker
 
 
-    def get_portfolio_summary(self, shares: SharesDF) -> None:
-        # Get account value
-        account_value = self.broker.get_account_value()
+    @staticmethod
+    def _top_title(title: str, top_n: int | None) -> str:
+        return title if top_n is None else f"Top {top_n} {title}"
 
-        # Get tickers
-        tickers = shares["ticker"].to_list()
 
-        # Get prices
-        prices = self.portfolio_dao.get_prices_by_date(date=self.config.data_date, tickers=tickers)
+    def get_portfolio_summary(
+        self, shares: SharesDF, output: str | None = None, top_n: int | None = 10
+    ) -> None:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Get account value and prices concurrently
+            account_value_future = executor.submit(self.broker.get_account_value)
+            prices_future = executor.submit(
+                self.portfolio_dao.get_prices_by_date,
+                date=self.config.data_date,
+                tickers=shares["ticker"].to_list(),
+            )
 
-        # Get dollars
-        dollars = self.calculate_service.get_dollars(shares=shares, prices=prices)
-        dollars_allocated = dollars["dollars"].sum()
+            # Get benchmark weights
+            benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=self.config.data_date)
 
-        # Calculate portfolio weights from dollars
-        weights = self.calculate_service.get_weights_from_dollars(
-            dollars=dollars, account_value=account_value
-        )
-
-        # Get benchmark weights
-        benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=self.config.data_date)
+            # Get covariance matrix (only depends on the benchmark universe)
+            covariance_future = executor.submit(
+                self.calculate_service.get_covariance_matrix,
+                tickers=benchmark["ticker"].cast(pl.String).sort().to_list(),
+            )
 
-        # Get universe
-        universe = benchmark["ticker"].sort().to_list()
+            # Align shares, prices and benchmark weights to one ticker index
+            state = PortfolioState.from_frames(
+                shares=shares,
+                prices=prices_future.result(),
+                account_value=account_value_future.result(),
+                benchmark=benchmark,
+            )
 
-        # Get covariance matrix
-        covariance_matrix = self.calculate_service.get_covariance_matrix(tickers=universe)
+            covariance_matrix = covariance_future.result()
 
         # Decompose weights
-        total_weights, active_weights = self.calculate_service.decompose_weights(
-            benchmark=benchmark, weights=weights
-        )
+        total_weights, active_weights = self.calculate_service.decompose_weights(state)
 
         # Generate portfolio metrics table
         portfolio_metrics = self.calculate_service.get_portfolio_metrics(
             total_weights=total_weights,
             active_weights=active_weights,
             covariance_matrix=covariance_matrix,
-            account_value=account_value,
-            dollars_allocated=dollars_allocated,
+            account_value=state.account_value,
+            dollars_allocated=state.dollars_allocated,
         )
+
+        # Get Monte Carlo VaR and stress scenario P&L
+        scenario_risk = None
+        if self.config.scenario_settings is not None:
+            scenario_risk = self.calculate_service.get_scenario_risk(
+                tickers=state.universe,
+                total_weights=total_weights,
+                active_weights=active_weights,
+                covariance_matrix=covariance_matrix,
+            )
+
+        # Write the metrics and the full book for other tools
+        if output is not None:
+            frames = {
+                "metrics": pl.DataFrame([asdict(portfolio_metrics)]),
+                "positions": self.calculate_service.get_positions_view(state),
+            }
+            if scenario_risk is not None:
+                frames["scenarios"] = scenario_risk
+            self.surface_dao.write_summary(frames, output)
+            return
+
         portfolio_metrics_table = self.ui_service.generate_portfolio_metrics_table(
             portfolio_metrics
         )
 
         # Generate top long positions table
-        top_long_positions = self.calculate_service.get_top_long_positions(
-            shares=shares,
-            prices=prices,
-            dollars=dollars,
-            weights=weights,
-            benchmark=benchmark,
-            account_value=account_value,
-        )
+        top_long_positions = self.calculate_service.get_top_long_positions(state, top_n=top_n)
         top_long_positions_table = self.ui_service.generate_positions_table(
-            positions=top_long_positions, title="Top 10 Long Positions"
+            positions=top_long_positions, title=self._top_title("Long Positions", top_n)
         )
 
         # Render UI
         console = Console()
         console.print()
         console.print(portfolio_metrics_table)
+        if scenario_risk is not None:
+            console.print()
+            console.print(
+                self.ui_service.generate_scenario_risk_table(scenario_risk, state.account_value)
+            )
         console.print()
         console.print(top_long_positions_table)
 
 
     def get_orders_summary(
-        self, shares: SharesDF, orders: OrdersDF
+        self,
+        shares: SharesDF,
+        orders: OrdersDF,
+        output: str | None = None,
+        top_n: int | None = 10,
     ) -> None:
         """
         Generate and display orders summary tables.
@@ -99,47 +143,83 @@ class SummaryService:
         Args:
             shares: DataFrame with ticker and optimal shares columns
             orders: DataFrame with ticker, price, shares, action columns
-            config: Configuration object
+            output: Path to write the full orders view to instead of printing tables
+            top_n: Number of rows per table, or None for every row
         """
-        current_shares = self.broker.get_positions()
-
-        #connect to Database
-        port_dao = PortfolioDAO()
-
-        # Compute ticker list from both current and optimal portfolios
-        tickers = list(set(current_shares["ticker"].to_list() + shares["ticker"].to_list()))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Get current shares and open orders while reading prices for the optimal portfolio
+            current_shares_future = executor.submit(self.broker.get_positions)
+            open_orders_future = executor.submit(self.broker.get_open_orders)
+            prices = self.portfolio_dao.get_prices_by_date(
+                date=self.config.data_date, tickers=shares["ticker"].to_list()
+            )
+            current_shares = current_shares_future.result()
+            open_orders = open_orders_future.result()
 
-        # Get prices for all tickers
-        prices = port_dao.get_prices_by_date(date=self.config.data_date, tickers=tickers)
+        # Get prices for held tickers outside the optimal portfolio
+        missing_tickers = list(
+            set(current_shares["ticker"].to_list()) - set(shares["ticker"].to_list())
+        )
+        if missing_tickers:
+            prices = pl.concat(
+                [
+                    prices,
+                    self.portfolio_dao.get_prices_by_date(
+                        date=self.config.data_date, tickers=missing_tickers
+                    ),
+                ]
+            ).sort("ticker")
 
         # Create combined shares dataframe with both current and optimal shares
         combined_shares = self.get_combined_shares(
             current_shares=current_shares, optimal_shares=shares
         )
 
-        # Get top 10 long positions from current shares
-        top_long_orders = self.get_top_long_orders(
-            shares=combined_shares, prices=prices, orders=orders, top_n=10
-        )
+        # Align current shares, prices and orders to one ticker index
+        state = PortfolioState.from_frames(shares=combined_shares, prices=prices)
+        orders_view = self.get_orders_view(state=state, orders=orders)
+
+        # Get the orders and turnover each no-trade band held back
+        band_removals = None
+        if self.config.no_trade_bands is not None:
+            band_removals = self.order_service.get_band_removals(
+                prices=prices,
+                current_shares=current_shares,
+                optimal_shares=shares,
+                open_orders=open_orders,
+            )
+
+        # Write the full orders view for other tools
+        if output is not None:
+            frames = {"orders": orders_view.sort("dollars", descending=True)}
+            if band_removals is not None:
+                frames["band_removals"] = band_removals
+            self.surface_dao.write_summary(frames, output)
+            return
+
+        # Get top long positions from current shares
+        top_long_orders = self.get_top_long_orders(orders_view=orders_view, top_n=top_n)
 
         top_long_orders_table = self.ui_service.generate_orders_table(
-            orders=top_long_orders, title="Top 10 Long Position Orders"
+            orders=top_long_orders, title=self._top_title("Long Position Orders", top_n)
         )
 
-        # Get top 10 active BUY orders by dollar value
+        # Get top active BUY orders by dollar value
         top_active_buy_orders = self.get_top_active_orders(
-            shares=combined_shares, orders=orders, prices=prices, action="BUY", top_n=10
+            orders_view=orders_view, action="BUY", top_n=top_n
         )
         top_active_buy_orders_table = self.ui_service.generate_orders_table(
-            orders=top_active_buy_orders, title="Top 10 Active BUY Orders by Dollar Value"
+            orders=top_active_buy_orders,
+            title=self._top_title("Active BUY Orders by Dollar Value", top_n),
         )
 
-        # Get top 10 active SELL orders by dollar value
+        # Get top active SELL orders by dollar value
         top_active_sell_orders = self.get_top_active_orders(
-            shares=combined_shares, orders=orders, prices=prices, action="SELL", top_n=10
+            orders_view=orders_view, action="SELL", top_n=top_n
         )
         top_active_sell_orders_table = self.ui_service.generate_orders_table(
-            orders=top_active_sell_orders, title="Top 10 Active SELL Orders by Dollar Value"
+            orders=top_active_sell_orders,
+            title=self._top_title("Active SELL Orders by Dollar Value", top_n),
         )
 
         # Render UI
@@ -151,36 +231,36 @@ class SummaryService:
         console.print()
         console.print(top_active_sell_orders_table)
 
+        if band_removals is not None:
+            console.print()
+            console.print(self.ui_service.generate_band_removals_table(band_removals))
+
 
     @staticmethod
-    def get_top_long_orders(
-        shares: SharesDF,
-        prices: PricesDF,
-        orders: OrdersDF,
-        top_n: int = 10,
-    ) -> pl.DataFrame:
+    def get_orders_view(state: PortfolioState, orders: OrdersDF) -> pl.DataFrame:
+        to_trade = align_to_tickers(state.tickers, orders, "shares", fill=0.0)
+        action = align_to_tickers(state.tickers, orders, "action", fill="HOLD", dtype=object)
+        prices = np.where(np.isnan(state.prices), 9999.0, state.prices)
+
+        return pl.DataFrame(
+            {
+                "ticker": state.tickers,
+                "shares": state.shares,
+                "price": prices,
+                "dollars": state.shares * prices,
+                "to_trade": to_trade,
+                "action": action,
+            },
+            schema_overrides={"action": pl.String},
+        )
+
+
+    @staticmethod
+    def get_top_long_orders(orders_view: pl.DataFrame, top_n: int | None = 10) -> pl.DataFrame:
         long_positions = (
-            shares.join(prices, on="ticker", how="left")
-            .join(
-                orders.select("ticker", pl.col("shares").alias("to_trade"), "action"),
-                on="ticker",
-                how="left",
-            )
-            .with_columns(
-                pl.col("action").fill_null("HOLD"),
-                pl.col("to_trade").fill_null(0),
-                pl.when(pl.col("price").is_null())
-                .then(pl.lit(9999))
-                .otherwise(pl.col("price"))
-                .alias("price"),
-            )
-            .with_columns(
-                (pl.col("shares") * pl.col("price")).alias("dollars"),
-            )
-            .filter(pl.col("shares") > 0)  # Only long positions
+            orders_view.filter(pl.col("shares") > 0)  # Only long positions
             .sort("dollars", descending=True)
-            .head(top_n)
-            .select("ticker", "shares", "price", "dollars", "to_trade", "action")
+            .head(top_n if top_n is not None else orders_view.height)
         )
 
         return long_positions
@@ -188,36 +268,16 @@ class SummaryService:
 
     @staticmethod
     def get_top_active_orders(
-        shares: SharesDF,
-        orders: OrdersDF,
-        prices: PricesDF,
+        orders_view: pl.DataFrame,
         action: str,
-        top_n: int = 10,
+        top_n: int | None = 10,
     ) -> pl.DataFrame:
         active_orders = (
-            shares.join(prices, on="ticker", how="left")
-            .join(
-                orders.select("ticker", pl.col("shares").alias("to_trade"), "action"),
-                on="ticker",
-                how="left",
-            )
-            .with_columns(
-                pl.col("action").fill_null("HOLD"),
-                pl.col("to_trade").fill_null(0),
-                pl.when(pl.col("price").is_null())
-                .then(pl.lit(9999))
-                .otherwise(pl.col("price"))
-                .alias("price"),
-            )
-            .with_columns(
-                (pl.col("shares") * pl.col("price")).alias("dollars"),
-            )
-            .filter(
+            orders_view.filter(
                 pl.col("action").eq(action),  # Filter by specific action (BUY or SELL)
             )
             .sort("dollars", descending=True)
-            .head(top_n)
-            .select("ticker", "shares", "price", "dollars", "to_trade", "action")
+            .head(top_n if top_n is not None else orders_view.height)
         )
 
         return active_orders
@@ -235,7 +295,9 @@ class SummaryService:
         )
 
         # Create a dataframe with all tickers
-        all_tickers_df = pl.DataFrame({"ticker": all_tickers})
+        all_tickers_df = pl.DataFrame(
+            {"ticker": all_tickers}, schema={"ticker": current_shares.schema["ticker"]}
+        )
 
         # Join with current shares to get actual holdings
         combined = all_tickers_df.join(
@@ -29,8 +29,65 @@ class UIService:
         return table
 
     @staticmethod
+    def format_number(
+        expr: pl.Expr, decimals: int = 0, prefix: str = "", suffix: str = "", scale: float = 1.0
+    ) -> pl.Expr:
+        """Format a numeric column with thousands separators in one vectorized expression."""
+        scaled = expr.fill_nan(None).mul(scale * 10**decimals).round().cast(pl.Int64)
+        whole = (
+            scaled.abs()
+            .floordiv(10**decimals)
+            .cast(pl.String)
+            # Group digits from the right by reversing around the replace
+            .str.reverse()
+            .str.replace_all(r"(\d{3})", "$1,")
+            .str.strip_suffix(",")
+            .str.reverse()
+        )
+
+        parts = [pl.when(scaled < 0).then(pl.lit("-")).otherwise(pl.lit("")), pl.lit(prefix), whole]
+        if decimals:
+            parts += [
+                pl.lit("."),
+                scaled.abs().mod(10**decimals).cast(pl.String).str.zfill(decimals),
+            ]
+        parts.append(pl.lit(suffix))
+
+        return pl.concat_str(parts).fill_null("N/A").alias(expr.meta.output_name())
+
+    def format_positions(self, positions: pl.DataFrame) -> pl.DataFrame:
+        return positions.select(
+            pl.col("ticker").cast(pl.String),
+            self.format_number(pl.col("shares")),
+            self.format_number(pl.col("price"), decimals=2, prefix="$"),
+            self.format_number(pl.col("dollars"), prefix="$"),
+            self.format_number(pl.col("weight"), decimals=2, suffix="%", scale=100),
+            self.format_number(pl.col("weight_bmk"), decimals=2, suffix="%", scale=100),
+            self.format_number(pl.col("weight_act"), decimals=2, suffix="%", scale=100),
+            self.format_number(pl.col("pct_chg_bmk"), decimals=1, suffix="%"),
+        )
+
+    def format_orders(self, orders: pl.DataFrame) -> pl.DataFrame:
+        # Color code the action
+        color = (
+            pl.when(pl.col("action") == "BUY")
+            .then(pl.lit("green"))
+            .when(pl.col("action") == "SELL")
+            .then(pl.lit("red"))
+            .otherwise(pl.lit("yellow"))
+        )
+
+        return orders.select(
+            pl.col("ticker").cast(pl.String),
+            self.format_number(pl.col("shares")),
+            self.format_number(pl.col("price"), decimals=2, prefix="$"),
+            self.format_number(pl.col("dollars"), prefix="$"),
+            self.format_number(pl.col("to_trade")),
+            pl.format("[{}]{}[/{}]", color, pl.col("action"), color).alias("action"),
+        )
+
     def generate_positions_table(
-        positions: pl.DataFrame, title: str = "Top Long Positions"
+        self, positions: pl.DataFrame, title: str = "Top Long Positions"
     ) -> Table:
         table = Table(title=f"[bold cyan]{title}[/bold cyan]", padding=(0, 2))
 
@@ -45,25 +102,12 @@ class UIService:
         table.add_column("% Chg Bmk", style="blue", justify="right")
 
         # Add rows
-        for row in positions.iter_rows(named=True):
-            pct_chg = (
-                f"{row['pct_chg_bmk']:.1f}%" if row["pct_chg_bmk"] is not None else "N/A"
-            )
-            table.add_row(
-                row["ticker"],
-                f"{row['shares']:,.0f}",
-                f"${row['price']:.2f}",
-                f"${row['dollars']:,.0f}",
-                f"{row['weight']:.2%}",
-                f"{row['weight_bmk']:.2%}",
-                f"{row['weight_act']:.2%}",
-                pct_chg,
-            )
+        for row in self.format_positions(positions).iter_rows():
+            table.add_row(*row)
 
         return table
 
-    @staticmethod
-    def generate_orders_table(orders: pl.DataFrame, title: str = "Orders") -> Table:
+    def generate_orders_table(self, orders: pl.DataFrame, title: str = "Orders") -> Table:
         table = Table(title=f"[bold cyan]{title}[/bold cyan]", padding=(0, 2))
 
         # Add columns
@@ -74,24 +118,60 @@ class UIService:
         table.add_column("To Trade", style="green", justify="right")
         table.add_column("Action", style="yellow", justify="right")
 
-        # Add rows with conditional styling for action
-        for row in orders.iter_rows(named=True):
-            action = row["action"]
-            # Color code the action
-            if action == "BUY":
-                action_styled = f"[green]{action}[/green]"
-            elif action == "SELL":
-                action_styled = f"[red]{action}[/red]"
-            else:
-                action_styled = f"[yellow]{action}[/yellow]"
-
-            table.add_row(
-                row["ticker"],
-                f"{row['shares']:,.0f}",
-                f"${row['price']:.2f}",
-                f"${row['dollars']:,.0f}",
-                f"{row['to_trade']:,.0f}",
-                action_styled,
-            )
+        # Add rows
+        for row in self.format_orders(orders).iter_rows():
+            table.add_row(*row)
+
+        return table
+
+    def format_scenario_risk(self, scenarios: pl.DataFrame, account_value: float) -> pl.DataFrame:
+        return scenarios.select(
+            "scenario",
+            self.format_number(pl.col("total_pnl"), decimals=2, suffix="%", scale=100),
+            self.format_number(pl.col("total_pnl"), prefix="$", scale=account_value).alias(
+                "total_dollars"
+            ),
+            self.format_number(pl.col("active_pnl"), decimals=2, suffix="%", scale=100),
+        )
+
+    def generate_scenario_risk_table(
+        self, scenarios: pl.DataFrame, account_value: float, title: str = "Scenario Risk"
+    ) -> Table:
+        table = Table(title=f"[bold cyan]{title}[/bold cyan]", padding=(0, 2))
+
+        # Add columns
+        table.add_column("Scenario", style="cyan", justify="left")
+        table.add_column("Total P&L", style="bold white", justify="right")
+        table.add_column("Total Dollars", style="white", justify="right")
+        table.add_column("Active P&L", style="magenta", justify="right")
+
+        # Add rows
+        for row in self.format_scenario_risk(scenarios, account_value).iter_rows():
+            table.add_row(*row)
+
+        return table
+
+    def format_band_removals(self, removals: pl.DataFrame) -> pl.DataFrame:
+        return removals.select(
+            "band",
+            self.format_number(pl.col("orders")),
+            self.format_number(pl.col("shares")),
+            self.format_number(pl.col("turnover"), prefix="$"),
+        )
+
+    def generate_band_removals_table(
+        self, removals: pl.DataFrame, title: str = "Orders Removed by No-Trade Bands"
+    ) -> Table:
+        table = Table(title=f"[bold cyan]{title}[/bold cyan]", padding=(0, 2))
+
+        # Add columns
+        table.add_column("Band", style="cyan", justify="left")
+        table.add_column("Orders", style="bold white", justify="right")
+        table.add_column("Shares", style="white", justify="right")
+        table.add_column("Turnover", style="yellow", justify="right")
+
+        # Add rows
+        for row in self.format_band_removals(removals).iter_rows():
+            table.add_row(*row)
 
         return table
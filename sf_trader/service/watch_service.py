@@ -0,0 +1,151 @@
+import time
+import numpy as np
+import polars as pl
+
+from rich.console import Group
+from rich.live import Live
+from rich.text import Text
+
+from sf_trader.config import Config
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.models.incremental_risk import IncrementalRisk
+from sf_trader.dal.models.portfolio_metrics import PortfolioMetrics
+from sf_trader.dal.models.portfolio_state import PortfolioState, align_to_tickers
+from sf_trader.service.calculate_service import CalculateService
+from sf_trader.service.ui_service import UIService
+
+
+class WatchService:
+    """Live portfolio metrics with the covariance and dollar vectors kept in memory."""
+
+    def __init__(
+        self,
+        config: Config,
+        portfolio_dao: PortfolioDAO | None = None,
+        calculate_service: CalculateService | None = None,
+    ):
+        self.portfolio_dao = portfolio_dao or PortfolioDAO.from_config(config)
+        self.calculate_service = calculate_service or CalculateService(
+            config, portfolio_dao=self.portfolio_dao
+        )
+        self.ui_service = UIService()
+        self.config = config
+        self.broker = config.broker
+
+        self.tickers: np.ndarray | None = None
+        self.shares: np.ndarray | None = None
+        self.prices: np.ndarray | None = None
+        self.risk: IncrementalRisk | None = None
+        self._benchmark_index: np.ndarray | None = None
+        self._positions_version: int | None = None
+
+
+    def start(self) -> None:
+        """Load the benchmark universe, covariance and current holdings once."""
+        benchmark = self.portfolio_dao.get_benchmark_weights_by_date(date=self.config.data_date)
+        positions = self.broker.get_positions()
+        account_value = self.broker.get_account_value()
+
+        tickers = list(
+            set(benchmark["ticker"].cast(pl.String).to_list())
+            | set(positions["ticker"].cast(pl.String).to_list())
+        )
+        prices = self.portfolio_dao.get_prices_by_date(date=self.config.data_date, tickers=tickers)
+
+        state = PortfolioState.from_frames(
+            shares=positions, prices=prices, account_value=account_value, benchmark=benchmark
+        )
+        covariance_matrix = self.calculate_service.get_covariance_matrix(tickers=state.universe)
+
+        self.tickers = state.tickers
+        self.shares = state.shares.copy()
+        self.prices = state.prices.copy()
+        self._benchmark_index = np.flatnonzero(state.in_benchmark)
+        self._positions_version = self._get_positions_version()
+        self.risk = IncrementalRisk(
+            covariance_matrix=covariance_matrix,
+            benchmark=state.benchmark[self._benchmark_index],
+            dollars=state.dollars[self._benchmark_index],
+            account_value=account_value,
+        )
+
+
+    def _get_positions_version(self) -> int | None:
+        positions_cache = self.broker.get_positions_cache()
+        return None if positions_cache is None else positions_cache.version
+
+
+    def refresh(self, live_prices: bool = False) -> int:
+        """Apply position and price changes since the last refresh. Returns the tickers changed."""
+        shares = self.shares
+        prices = self.prices
+
+        # Positions only need re-reading when the cache has seen an update
+        version = self._get_positions_version()
+        if version is None or version != self._positions_version:
+            self._positions_version = version
+            positions = self.broker.get_positions()
+            shares = align_to_tickers(self.tickers, positions, "shares", fill=0.0)
+            self.risk.account_value = self.broker.get_account_value()
+
+        if live_prices:
+            quoted = self.broker.get_prices(self.tickers[shares != 0].tolist())
+            quoted_prices = align_to_tickers(self.tickers, quoted, "price")
+            prices = np.where(np.isnan(quoted_prices), self.prices, quoted_prices)
+
+        # Only tickers whose shares or price moved reach the risk update
+        same_price = (prices == self.prices) | (np.isnan(prices) & np.isnan(self.prices))
+        changed = np.flatnonzero((shares != self.shares) | ~same_price)
+        self.shares, self.prices = shares, prices
+
+        changed_in_benchmark = np.intersect1d(changed, self._benchmark_index, assume_unique=True)
+        risk_index = np.searchsorted(self._benchmark_index, changed_in_benchmark)
+        self.risk.update(risk_index, shares[changed_in_benchmark] * prices[changed_in_benchmark])
+
+        return changed.size
+
+
+    def get_metrics(self) -> PortfolioMetrics:
+        risk = self.risk
+        dollars_allocated = float(np.nansum(self.shares * self.prices))
+
+        return PortfolioMetrics(
+            gross_exposure=risk.gross_exposure,
+            net_exposure=risk.net_exposure,
+            num_long=risk.num_long,
+            num_short=risk.num_short,
+            num_positions=risk.num_long + risk.num_short,
+            active_risk=risk.active_risk,
+            total_risk=risk.total_risk,
+            utilization=dollars_allocated / risk.account_value,
+            account_value=risk.account_value,
+            dollars_allocated=dollars_allocated,
+        )
+
+
+    def _render(self, changed: int, refresh_time: float) -> Group:
+        return Group(
+            self.ui_service.generate_portfolio_metrics_table(self.get_metrics()),
+            Text(
+                f"{changed} ticker(s) changed, refreshed in {refresh_time * 1000:.2f} ms "
+                f"at {time.strftime('%H:%M:%S')} (Ctrl+C to stop)",
+                style="dim",
+            ),
+        )
+
+
+    def watch(self, refresh_interval: float = 1.0, live_prices: bool = False) -> None:
+        self.start()
+
+        # A broker that can't quote fails here, before the live display starts
+        self.refresh(live_prices=live_prices)
+
+        with Live(self._render(0, 0.0), refresh_per_second=1 / refresh_interval) as live:
+            try:
+                while True:
+                    time.sleep(refresh_interval)
+                    start = time.perf_counter()
+                    changed = self.refresh(live_prices=live_prices)
+                    live.update(self._render(changed, time.perf_counter() - start))
+            except KeyboardInterrupt:
+                pass
@@ -1,3 +1,5 @@
+import datetime as dt
+import os
 from types import SimpleNamespace
 from unittest.mock import create_autospec
 
@@ -6,6 +8,8 @@ import pytest
 
 from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
 from sf_trader.dal.dao.surface_dao import SurfaceDAO
+from sf_trader.dal.models.catalog_model import Catalog
+from sf_trader.dal.models.table_model import TableName
 
 
 class FakeBroker:
@@ -20,12 +24,21 @@ class FakeBroker:
             }
         )
 
-    def post_orders(self, orders: pl.DataFrame) -> None:
+    def post_orders(self, orders: pl.DataFrame, on_submitted=None) -> None:
         pass
 
-    def cancel_orders(self) -> None:
+    def cancel_orders(self, tickers=None, action=None, global_cancel=False):
         pass
 
+    def get_open_orders(self):
+        return None
+
+    def get_prices(self, tickers: list[str]) -> pl.DataFrame:
+        return pl.DataFrame({"ticker": [], "price": []})
+
+    def get_positions_cache(self):
+        return None
+
 
 @pytest.fixture
 def broker():
@@ -41,11 +54,17 @@ def fake_config(broker):
             "shares": [],
         }
     )
+    broker.get_open_orders.return_value = None
 
     return SimpleNamespace(
-        data_date="2026-03-25",
+        data_date=dt.date(2026, 3, 25),
         broker=broker,
         ignore_tickers=[],
+        pre_trade_limits=None,
+        no_trade_bands=None,
+        stage_cache_dir=None,
+        order_journal_path=None,
+        scenario_settings=None,
     )
 
 
@@ -56,4 +75,30 @@ def portfolio_dao():
 
 @pytest.fixture
 def surface_dao():
-    return create_autospec(SurfaceDAO, instance=True, spec_set=True)
\ No newline at end of file
+    return create_autospec(SurfaceDAO, instance=True, spec_set=True)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog()
+    catalog.base_path = str(tmp_path / "database")
+    os.makedirs(catalog.base_path)
+    return catalog
+
+
+@pytest.fixture
+def write_table(catalog):
+    """Writes a frame into a table's yearly files, one per year of its dates."""
+
+    def write(table_name: TableName, frame: pl.DataFrame) -> list[str]:
+        table_path = f"{catalog.base_path}/{table_name.value}"
+        os.makedirs(table_path, exist_ok=True)
+
+        paths = []
+        for (year,), rows in frame.group_by(pl.col("date").dt.year(), maintain_order=True):
+            path = f"{table_path}/{table_name.value}_{year}.parquet"
+            rows.write_parquet(path)
+            paths.append(path)
+        return paths
+
+    return write
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import polars as pl
+
+from sf_trader.dal.broker.IB_gateway_async_client import AsyncIBGatewayClient
+
+
+CALLBACKS = [
+    "nextValidId",
+    "accountSummary",
+    "accountSummaryEnd",
+    "position",
+    "positionEnd",
+    "tickPrice",
+    "tickSnapshotEnd",
+    "openOrder",
+    "openOrderEnd",
+    "orderStatus",
+    "error",
+]
+
+
+class FakeApp:
+    """Answers requests from a separate thread, like the IB reader thread."""
+
+    def __init__(
+        self,
+        open_orders: list[tuple[int, str, str, float]],
+        rejected: set[int],
+        filled: dict[int, float] | None = None,
+    ) -> None:
+        for name in CALLBACKS:
+            setattr(self, name, lambda *args: None)
+
+        self.open_orders = open_orders
+        self.rejected = rejected
+        self.filled = filled or {}
+        self.cancelled = []
+        self.global_cancels = 0
+        self.all_open_orders_requests = 0
+        self.market_data_types = []
+        self.quotes = {}
+
+    def _later(self, callback) -> None:
+        threading.Timer(0.001, callback).start()
+
+    def reqOpenOrders(self) -> None:
+        def respond():
+            for order_id, symbol, action, shares in self.open_orders:
+                self.openOrder(
+                    order_id,
+                    SimpleNamespace(symbol=symbol),
+                    SimpleNamespace(
+                        action=action,
+                        totalQuantity=shares,
+                        filledQuantity=self.filled.get(order_id, UNSET_QUANTITY),
+                    ),
+                    None,
+                )
+            self.openOrderEnd()
+
+        self._later(respond)
+
+    def reqMarketDataType(self, market_data_type) -> None:
+        self.market_data_types.append(market_data_type)
+
+    def reqMktData(self, req_id, contract, generic_ticks, snapshot, regulatory, options) -> None:
+        def respond():
+            if contract.symbol in self.quotes:
+                self.tickPrice(req_id, 68, self.quotes[contract.symbol], None)
+            self.tickSnapshotEnd(req_id)
+
+        self._later(respond)
+
+    def reqAllOpenOrders(self) -> None:
+        self.all_open_orders_requests += 1
+        self.reqOpenOrders()
+
+    def _confirm(self, order_id: int) -> None:
+        if order_id in self.rejected:
+            self.error(order_id, 10148, "OrderId that needs to be cancelled can not be cancelled", "")
+        else:
+            self.orderStatus(order_id, "Cancelled")
+
+    def cancelOrder(self, order_id, order_cancel) -> None:
+        self.cancelled.append(order_id)
+        self._later(lambda: self._confirm(order_id))
+
+    def reqGlobalCancel(self, order_cancel) -> None:
+        self.global_cancels += 1
+        for order_id, *_ in self.open_orders:
+            self._later(lambda order_id=order_id: self._confirm(order_id))
+
+
+# IB leaves filledQuantity at a sentinel until the order trades
+UNSET_QUANTITY = 2**127 - 1
+
+OPEN_ORDERS = [
+    (1, "AAPL", "BUY", 10.0),
+    (2, "BRK B", "SELL", 5.0),
+    (3, "MSFT", "BUY", 7.0),
+]
+
+
+class TestAsyncIBGatewayClient:
+    def test_get_prices_requests_the_configured_market_data_type(self):
+        app = FakeApp([], rejected=set())
+        app.quotes = {"AAPL": 200.0, "BRK B": 400.0}
+        client = AsyncIBGatewayClient(
+            app, timeout=2, max_messages_per_second=1000, market_data_type=1
+        )
+
+        prices = asyncio.run(client.get_prices(["AAPL", "BRK.B"]))
+
+        assert app.market_data_types == [1]
+        assert prices.cast({"ticker": pl.String}).sort("ticker").rows() == [
+            ("AAPL", 200.0),
+            ("BRK.B", 400.0),
+        ]
+
+    def test_cancel_all_pipelines_this_clients_orders(self):
+        app = FakeApp(OPEN_ORDERS, rejected={3})
+        client = AsyncIBGatewayClient(app, timeout=2, max_messages_per_second=1000)
+
+        cancellations = asyncio.run(client.cancel_orders())
+
+        # Other clients' and manual orders are left alone
+        assert app.global_cancels == 0
+        assert app.all_open_orders_requests == 0
+        assert app.cancelled == [1, 2, 3]
+        assert cancellations.sort("order_id")["status"].to_list() == [
+            "Cancelled",
+            "Cancelled",
+            "Failed",
+        ]
+        assert cancellations.filter(status="Failed")["latency_ms"].is_null().all()
+        assert cancellations.filter(status="Cancelled")["latency_ms"].is_not_null().all()
+
+    def test_global_cancel_is_opt_in_and_sent_once(self):
+        app = FakeApp(OPEN_ORDERS, rejected={3})
+        client = AsyncIBGatewayClient(app, timeout=2, max_messages_per_second=1000)
+
+        cancellations = asyncio.run(client.cancel_orders(global_cancel=True))
+
+        assert app.global_cancels == 1
+        assert app.all_open_orders_requests == 1
+        assert app.cancelled == []
+        assert cancellations.sort("order_id")["status"].to_list() == [
+            "Cancelled",
+            "Cancelled",
+            "Failed",
+        ]
+        assert cancellations.filter(status="Failed")["latency_ms"].is_null().all()
+        assert cancellations.filter(status="Cancelled")["latency_ms"].is_not_null().all()
+
+    def test_cancel_filters_by_ticker_and_action(self):
+        app = FakeApp(OPEN_ORDERS, rejected=set())
+        client = AsyncIBGatewayClient(app, timeout=2, max_messages_per_second=1000)
+
+        cancellations = asyncio.run(client.cancel_orders(tickers=["BRK.B", "MSFT"], action="SELL"))
+
+        assert app.global_cancels == 0
+        assert app.cancelled == [2]
+        assert cancellations.cast({"ticker": str})["ticker"].to_list() == ["BRK.B"]
+        assert cancellations["status"].to_list() == ["Cancelled"]
+
+    def test_get_open_orders_requests_every_client_and_nets_fills(self):
+        app = FakeApp(OPEN_ORDERS, rejected=set(), filled={1: 4.0})
+        client = AsyncIBGatewayClient(app, timeout=2, max_messages_per_second=1000)
+
+        open_orders = asyncio.run(client.get_open_orders())
+
+        assert app.all_open_orders_requests == 1
+        assert open_orders.cast({"ticker": str}).sort("order_id").select(
+            "ticker", "shares", "remaining"
+        ).rows() == [
+            ("AAPL", 10.0, 6.0),
+            ("BRK.B", 5.0, 5.0),
+            ("MSFT", 7.0, 7.0),
+        ]
@@ -0,0 +1,120 @@
+from unittest.mock import create_autospec
+
+import polars as pl
+import pytest
+
+from sf_trader.dal.broker import IB_gateway_sharded_client
+from sf_trader.dal.broker.contract_cache import ContractCache
+from sf_trader.dal.broker.IB_gateway_client import IBGatewayClient
+from sf_trader.dal.broker.IB_gateway_sharded_client import ShardedIBGatewayClient
+
+
+class FakeWrapper:
+    """The parts of TWSSyncWrapper a gateway client uses."""
+
+    def connect_and_start(self, host, port, client_id) -> bool:
+        return True
+
+    def place_order_sync(self, contract, order):
+        pass
+
+    def error(self, *args) -> None:
+        pass
+
+    def openOrder(self, order_id, contract, order, order_state) -> None:
+        pass
+
+    def orderStatus(self, order_id, status, filled, remaining, avg_fill_price, *args) -> None:
+        pass
+
+    def execDetails(self, req_id, contract, execution) -> None:
+        pass
+
+    def position(self, account, contract, position, avg_cost) -> None:
+        pass
+
+    def positionEnd(self) -> None:
+        pass
+
+    def connectionClosed(self) -> None:
+        pass
+
+
+@pytest.fixture
+def wrapper():
+    return create_autospec(FakeWrapper, instance=True)
+
+
+@pytest.fixture
+def contract_cache():
+    return create_autospec(ContractCache, instance=True, spec_set=True)
+
+
+class TestShardedIBGatewayClient:
+    def test_shard_orders_keeps_each_ticker_on_one_connection(self, monkeypatch):
+        # Every shard gets its own wrapper and skips connecting
+        monkeypatch.setattr(
+            IB_gateway_sharded_client,
+            "IBGatewayClient",
+            lambda **kwargs: IBGatewayClient(
+                app=create_autospec(FakeWrapper, instance=True), connect=False, **kwargs
+            ),
+        )
+        client = ShardedIBGatewayClient(connections=3)
+
+        assert [shard.client_id for shard in client._clients] == [8675309, 8675310, 8675311]
+
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "AAPL", "NVDA", "MSFT", "BRK.B"],
+                "price": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "shares": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "action": ["BUY", "BUY", "SELL", "BUY", "SELL", "BUY"],
+            }
+        )
+
+        shards = client.shard_orders(orders)
+
+        assert set(shards) <= {0, 1, 2}
+        assert sum(frame.height for frame in shards.values()) == orders.height
+        for frame in shards.values():
+            for ticker in frame["ticker"].unique():
+                assert frame.filter(pl.col("ticker") == ticker).height == orders.filter(
+                    pl.col("ticker") == ticker
+                ).height
+            assert frame["price"].is_sorted()
+
+    def test_submit_orders_reports_one_row_per_order(self, wrapper, contract_cache, monkeypatch):
+        monkeypatch.setattr("sf_trader.dal.broker.IB_gateway_client.time.sleep", lambda _: None)
+
+        def prepare_orders(app, orders):
+            # MSFT can not be resolved
+            return orders.filter(pl.col("ticker") != "MSFT").with_columns(
+                pl.lit(1).alias("con_id")
+            )
+
+        contract_cache.prepare_orders.side_effect = prepare_orders
+        shard = IBGatewayClient(
+            app=wrapper, client_id=7, connect=False, contract_cache=contract_cache
+        )
+
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "AAPL", "MSFT"],
+                "price": [1.0, 1.0, 2.0],
+                "shares": [5.0, 3.0, 1.0],
+                "action": ["BUY", "SELL", "BUY"],
+            }
+        )
+
+        submitted = []
+        submissions = shard.submit_orders(orders, on_submitted=submitted.append)
+
+        assert submissions.height == 3
+        assert submissions["status"].to_list() == ["Submitted", "Submitted", "Skipped"]
+        assert submissions["action"].to_list() == ["BUY", "SELL", "BUY"]
+        assert submissions["shares"].to_list() == [5.0, 3.0, 1.0]
+        assert submissions["client_id"].unique().to_list() == [7]
+        assert submitted == [0, 1]
+        assert wrapper.place_order_sync.call_count == 2
+        wrapper.connect_and_start.assert_not_called()
@@ -0,0 +1,84 @@
+import asyncio
+import datetime as dt
+
+import polars as pl
+
+from sf_trader.dal.broker.async_broker_client import AsyncBrokerAdapter, SyncBrokerAdapter
+from sf_trader.dal.broker.async_test_client import AsyncTestClient
+from sf_trader.dal.broker.broker_client import BrokerClient
+
+
+class FakeBroker(BrokerClient):
+    def __init__(self) -> None:
+        self.calls = []
+
+    def get_prices(self, tickers):
+        self.calls.append("get_prices")
+        return pl.DataFrame({"ticker": tickers, "price": [1.0] * len(tickers)})
+
+    def get_account_value(self):
+        self.calls.append("get_account_value")
+        return 1e6
+
+    def post_orders(self, orders, on_submitted=None):
+        self.calls.append("post_orders")
+
+    def get_positions(self):
+        self.calls.append("get_positions")
+        return pl.DataFrame({"ticker": ["AAPL"], "shares": [10.0]})
+
+    def cancel_orders(self, tickers=None, action=None, global_cancel=False):
+        self.calls.append("cancel_orders")
+
+
+class TestAsyncBrokerClient:
+    def test_async_adapter_gathers_sync_calls(self):
+        broker = FakeBroker()
+        adapter = AsyncBrokerAdapter(broker)
+
+        async def run():
+            return await asyncio.gather(
+                adapter.get_prices(["AAPL", "MSFT"]),
+                adapter.get_account_value(),
+                adapter.get_positions(),
+            )
+
+        prices, account_value, positions = asyncio.run(run())
+
+        assert prices["ticker"].to_list() == ["AAPL", "MSFT"]
+        assert account_value == 1e6
+        assert positions.height == 1
+        assert sorted(broker.calls) == ["get_account_value", "get_positions", "get_prices"]
+
+    def test_sync_adapter_round_trips_async_adapter(self):
+        broker = FakeBroker()
+        client = SyncBrokerAdapter(AsyncBrokerAdapter(broker))
+
+        try:
+            assert client.get_account_value() == 1e6
+            client.cancel_orders()
+        finally:
+            client.close()
+
+        assert broker.calls == ["get_account_value", "cancel_orders"]
+
+    def test_async_test_client_tracks_posted_orders(self):
+        client = AsyncTestClient(dt.date(2026, 3, 25))
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+                "shares": [2.0, 4.0],
+                "action": ["BUY", "SELL"],
+            }
+        )
+
+        submitted = []
+        asyncio.run(client.post_orders(orders, on_submitted=submitted.append))
+
+        assert submitted == [0, 1]
+        fills = client.get_order_tracker().fills()
+        assert fills.cast({"ticker": pl.String}).select("ticker", "status", "filled").rows() == [
+            ("AAPL", "Filled", 2.0),
+            ("MSFT", "Filled", 4.0),
+        ]
@@ -0,0 +1,125 @@
+import datetime as dt
+
+import numpy as np
+import polars as pl
+import pytest
+
+from sf_trader.dal.models.portfolio_state import PortfolioState
+from sf_trader.dal.models.scenario_settings import ScenarioSettings, StressScenario
+from sf_trader.service.calculate_service import CalculateService
+
+
+class TestCalculateService:
+    def test_permute_covariance_matrix_reorders_barrids_to_tickers(self):
+        # Tickers A, B, C map to barrids Z, X, Y; sfd returns X, Y, Z order
+        covariance_matrix = pl.DataFrame(
+            {
+                "barrid": ["X", "Y", "Z"],
+                "X": [1.0, 0.1, 0.2],
+                "Y": [0.1, 2.0, 0.3],
+                "Z": [0.2, 0.3, 3.0],
+            }
+        )
+        positions = np.array([2, 0, 1])
+
+        result = CalculateService._permute_covariance_matrix(
+            covariance_matrix, positions, np.dtype("float32")
+        )
+
+        expected = np.array(
+            [
+                [3.0, 0.2, 0.3],
+                [0.2, 1.0, 0.1],
+                [0.3, 0.1, 2.0],
+            ],
+            dtype=np.float32,
+        )
+
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected)
+
+    def test_decompose_weights_aligns_portfolio_to_benchmark(self):
+        shares = pl.DataFrame(
+            {
+                "ticker": ["MSFT", "AAPL", "TSLA"],
+                "shares": [10.0, 5.0, 2.0],
+            }
+        )
+
+        prices = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "TSLA"],
+                "price": [200.0, 100.0, 50.0],
+            }
+        )
+
+        benchmark = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "weight": [0.5, 0.3, 0.2],
+            }
+        )
+
+        state = PortfolioState.from_frames(
+            shares=shares, prices=prices, account_value=2000.0, benchmark=benchmark
+        )
+
+        total_weights, active_weights = CalculateService.decompose_weights(state)
+
+        assert state.universe == ["AAPL", "GOOG", "MSFT"]
+        assert state.dollars_allocated == 2100.0
+        np.testing.assert_allclose(total_weights, [0.5, 0.0, 0.5])
+        np.testing.assert_allclose(active_weights, [0.0, -0.3, 0.3])
+
+    def test_get_scenario_risk_reports_var_and_stress_pnl(self, fake_config, portfolio_dao):
+        fake_config.scenario_settings = ScenarioSettings(
+            simulations=10_000,
+            chunk_size=2_500,
+            confidence_levels=[0.95],
+            seed=0,
+            stress_scenarios=[
+                StressScenario(name="crash", date=dt.date(2020, 3, 16)),
+                StressScenario(name="market-down-10", market_shock=-0.1),
+            ],
+        )
+        portfolio_dao.get_snapshot_covariance.return_value = None
+        portfolio_dao.get_asset_column_by_date.side_effect = [
+            pl.DataFrame({"ticker": ["A", "B"], "return": [-10.0, -20.0]}),
+            pl.DataFrame({"ticker": ["A"], "predicted_beta": [2.0]}),
+        ]
+
+        service = CalculateService(config=fake_config, portfolio_dao=portfolio_dao)
+        scenarios = service.get_scenario_risk(
+            tickers=["A", "B"],
+            total_weights=np.array([0.5, 0.5]),
+            active_weights=np.array([0.1, -0.1]),
+            covariance_matrix=np.array([[0.04, 0.01], [0.01, 0.09]]),
+        )
+
+        assert scenarios["scenario"].to_list() == ["VaR 95%", "ES 95%", "crash", "market-down-10"]
+        var, expected_shortfall = scenarios["total_pnl"][:2]
+        assert expected_shortfall < var < 0
+
+        # Percent returns are converted, and a missing beta counts as the market
+        assert scenarios.row(2) == pytest.approx(("crash", -0.15, 0.01))
+        assert scenarios.row(3) == pytest.approx(("market-down-10", -0.15, -0.01))
+
+    def test_get_covariance_factor_rebuilds_a_mismatched_snapshot_factor(
+        self, fake_config, portfolio_dao
+    ):
+        covariance_matrix = np.array([[0.04, 0.01, 0.0], [0.01, 0.09, 0.0], [0.0, 0.0, 0.01]])
+        portfolio_dao.get_snapshot_covariance.return_value = (
+            ["AAPL", "GOOG", "MSFT"],
+            covariance_matrix,
+        )
+        # Left over from a two ticker covariance
+        portfolio_dao.get_snapshot_covariance_factor.return_value = np.eye(2)
+
+        service = CalculateService(config=fake_config, portfolio_dao=portfolio_dao)
+
+        subset = covariance_matrix[np.ix_([0, 2], [0, 2])]
+        factor = service.get_covariance_factor(["AAPL", "MSFT"], subset)
+
+        np.testing.assert_allclose(factor @ factor.T, subset)
+        written = portfolio_dao.write_snapshot_covariance_factor.call_args.kwargs["factor"]
+        assert written.shape == (3, 3)
@@ -0,0 +1,81 @@
+import datetime as dt
+import os
+
+import polars as pl
+
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.models import catalog_model
+from sf_trader.dal.models.table_model import TableName
+
+
+def make_prices(year: int, rows: int = 2) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "date": [dt.date(year, 6, 1)] * rows,
+            "ticker": [f"T{i}" for i in range(rows)],
+            "price": [1.0] * rows,
+        }
+    )
+
+
+def touch_later(path: str) -> None:
+    # Same second rewrites can keep the mtime on coarse filesystems
+    mtime = os.stat(path).st_mtime + 10
+    os.utime(path, (mtime, mtime))
+
+
+class TestCatalog:
+    def test_metadata_is_served_from_the_cache(self, catalog, write_table, monkeypatch):
+        write_table(TableName.PRICES, pl.concat([make_prices(2024), make_prices(2025, 3)]))
+        table = catalog.get_table(TableName.PRICES)
+
+        assert table.files()[-1].endswith("prices_2025.parquet")
+        assert table.schema().names() == ["date", "ticker", "price"]
+        assert table.row_count() == 5
+
+        calls = []
+        for name in ("read_parquet_schema", "scan_parquet"):
+            original = getattr(pl, name)
+            monkeypatch.setattr(
+                pl,
+                name,
+                lambda *args, _original=original, **kwargs: calls.append(args)
+                or _original(*args, **kwargs),
+            )
+        monkeypatch.setattr(
+            catalog_model.glob, "glob", lambda *args, **kwargs: calls.append(args) or []
+        )
+
+        assert len(table.files()) == 2
+        assert table.schema().names() == ["date", "ticker", "price"]
+        assert table.row_count() == 5
+        assert calls == []
+
+    def test_rewritten_files_are_read_again(self, catalog, write_table):
+        write_table(TableName.PRICES, make_prices(2024))
+        table = catalog.get_table(TableName.PRICES)
+
+        assert len(table.files()) == 1
+        assert table.schema().names() == ["date", "ticker", "price"]
+        assert table.row_count(2024) == 2
+
+        # The yearly file is rewritten with more rows and a new column, and a year is added
+        rewritten = make_prices(2024, 4).with_columns(pl.lit(100.0).alias("volume"))
+        (path,) = write_table(TableName.PRICES, rewritten)
+        write_table(TableName.PRICES, make_prices(2023))
+        touch_later(path)
+        touch_later(os.path.dirname(path))
+
+        assert len(table.files()) == 2
+        assert table.schema().names() == ["date", "ticker", "price", "volume"]
+        assert table.row_count(2024) == 4
+        assert table.row_count() == 6
+
+    def test_dao_instances_share_one_catalog(self, catalog, write_table, monkeypatch):
+        monkeypatch.setattr(catalog_model, "_catalog", catalog)
+        write_table(TableName.PRICES, make_prices(2024))
+
+        first, second = PortfolioDAO(), PortfolioDAO()
+
+        assert first.catalog is second.catalog is catalog
+        assert first.get_table(TableName.PRICES) is second.get_table(TableName.PRICES)
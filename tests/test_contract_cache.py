@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import polars as pl
+import pytest
+
+from sf_trader.dal.broker.contract_cache import ContractCache
+
+
+class FakeApp:
+    def __init__(self, known: dict[str, tuple[int, str]], failures: int = 0) -> None:
+        self.known = known
+        self.failures = failures
+        self.requested = []
+
+    def get_contract_details(self, contract, timeout=None):
+        self.requested.append(contract.symbol)
+
+        if self.failures:
+            self.failures -= 1
+            raise TimeoutError("Timed out waiting for contract details")
+
+        if contract.symbol not in self.known:
+            raise RuntimeError("No security definition has been found for the request")
+
+        con_id, primary_exchange = self.known[contract.symbol]
+        return [
+            SimpleNamespace(
+                contract=SimpleNamespace(conId=con_id, primaryExchange=primary_exchange)
+            )
+        ]
+
+
+class TestContractCache:
+    def test_prepare_orders_resolves_and_rejects_unknown_tickers(self, tmp_path):
+        app = FakeApp({"AAPL": (265598, "NASDAQ"), "BRK B": (72063691, "NYSE")})
+        cache = ContractCache(str(tmp_path / "contracts.parquet"))
+
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "BRK.B", "BADX"],
+                "price": [200.0, 400.0, 1.0],
+                "shares": [2.0, 1.0, 5.0],
+                "action": ["BUY", "SELL", "BUY"],
+            }
+        )
+
+        result = cache.prepare_orders(app, orders)
+
+        assert result["ticker"].to_list() == ["AAPL", "BRK.B"]
+        assert result["ib_symbol"].to_list() == ["AAPL", "BRK B"]
+        assert result["con_id"].to_list() == [265598, 72063691]
+        assert sorted(app.requested) == ["AAPL", "BADX", "BRK B"]
+
+    def test_resolve_reads_persisted_contracts_without_requests(self, tmp_path):
+        path = str(tmp_path / "contracts.parquet")
+        ContractCache(path).resolve(FakeApp({"AAPL": (265598, "NASDAQ")}), ["AAPL"])
+
+        app = FakeApp({})
+        unresolved = ContractCache(path).resolve(app, ["AAPL"])
+
+        assert unresolved == []
+        assert app.requested == []
+
+    def test_transient_errors_are_retried(self, tmp_path):
+        app = FakeApp({"AAPL": (265598, "NASDAQ")}, failures=2)
+        cache = ContractCache(str(tmp_path / "contracts.parquet"), retries=2)
+
+        assert cache.resolve(app, ["AAPL"]) == []
+        assert app.requested == ["AAPL"] * 3
+        assert cache.contracts["con_id"].to_list() == [265598]
+
+    def test_errors_other_than_no_security_definition_are_raised(self, tmp_path):
+        app = FakeApp({"AAPL": (265598, "NASDAQ")}, failures=3)
+        cache = ContractCache(str(tmp_path / "contracts.parquet"), retries=2)
+
+        # A ticker that timed out must not be rejected as if it didn't exist
+        with pytest.raises(TimeoutError):
+            cache.resolve(app, ["AAPL"])
+
+        assert cache.contracts.is_empty()
@@ -0,0 +1,48 @@
+import numpy as np
+
+from sf_trader.dal.models.incremental_risk import IncrementalRisk
+from sf_trader.service.calculate_service import CalculateService
+
+
+def random_covariance(rng: np.random.Generator, n: int) -> np.ndarray:
+    factors = rng.normal(size=(n, n))
+    return factors @ factors.T / n * 0.04
+
+
+class TestIncrementalRisk:
+    def test_rank_k_updates_match_full_recompute(self):
+        rng = np.random.default_rng(0)
+        n = 50
+        covariance_matrix = random_covariance(rng, n)
+        benchmark = rng.dirichlet(np.ones(n))
+        dollars = rng.normal(size=n) * 1e4
+        account_value = 1e6
+
+        risk = IncrementalRisk(covariance_matrix, benchmark, dollars, account_value)
+
+        for _ in range(10):
+            index = np.sort(rng.choice(n, size=3, replace=False))
+            dollars[index] = rng.normal(size=3) * 1e4
+            risk.update(index, dollars[index])
+
+        weights = dollars / account_value
+        assert np.isclose(
+            risk.total_risk, CalculateService.compute_risk(weights, covariance_matrix)
+        )
+        assert np.isclose(
+            risk.active_risk,
+            CalculateService.compute_risk(weights - benchmark, covariance_matrix),
+        )
+        assert np.isclose(risk.gross_exposure, np.abs(weights).sum())
+        assert np.isclose(risk.net_exposure, weights.sum())
+        assert risk.num_long == np.count_nonzero(weights > 0)
+        assert risk.num_short == np.count_nonzero(weights < 0)
+
+    def test_unchanged_tickers_are_skipped(self):
+        rng = np.random.default_rng(1)
+        covariance_matrix = random_covariance(rng, 5)
+        dollars = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+
+        risk = IncrementalRisk(covariance_matrix, np.zeros(5), dollars, 100.0)
+
+        assert risk.update(np.array([0, 1]), np.array([1.0, 7.0])) == 1
@@ -0,0 +1,70 @@
+import datetime as dt
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from sf_trader.dal.dao.mapping_index_dao import MappingIndexDAO
+
+D1, D2, D3, D4 = (dt.date(2026, 3, day) for day in (2, 3, 4, 5))
+
+
+def daily_rows() -> pl.DataFrame:
+    # AAA keeps barrid X throughout, BBB moves from Y to Z, CCC leaves and comes back
+    return pl.DataFrame(
+        {
+            "date": [D1, D2, D3, D4, D1, D2, D3, D4, D1, D3, D4],
+            "ticker": ["AAA"] * 4 + ["BBB"] * 4 + ["CCC"] * 3,
+            "barrid": ["X"] * 4 + ["Y", "Y", "Z", "Z"] + ["W"] * 3,
+        }
+    )
+
+
+class TestMappingIndexDAO:
+    def test_intervals_query_collapses_runs_of_trading_days(self):
+        index = (
+            MappingIndexDAO.intervals_query(daily_rows().lazy())
+            .collect()
+            .sort("ticker", "valid_from")
+        )
+
+        expected = pl.DataFrame(
+            {
+                "ticker": ["AAA", "BBB", "BBB", "CCC", "CCC"],
+                "barrid": ["X", "Y", "Z", "W", "W"],
+                "valid_from": [D1, D1, D3, D1, D3],
+                "valid_to": [D4, D2, D4, D1, D4],
+            }
+        )
+
+        assert_frame_equal(index, expected)
+
+    def test_extend_matches_a_full_build(self, tmp_path):
+        rows = daily_rows()
+        dao = MappingIndexDAO(str(tmp_path / "index.parquet"))
+
+        # Fold in the days one at a time, as daily warms would
+        for date in (D1, D2, D3, D4):
+            day = rows.filter(pl.col("date").eq(date)).lazy()
+            dao.extend(MappingIndexDAO.intervals_query(day).collect())
+
+        full = MappingIndexDAO.intervals_query(rows.lazy()).collect().sort("ticker", "valid_from")
+
+        assert dao.built_through() == D4
+        assert_frame_equal(dao.read(), full)
+
+    def test_lookups_are_interval_joins(self, tmp_path):
+        dao = MappingIndexDAO(str(tmp_path / "index.parquet"))
+        dao.extend(MappingIndexDAO.intervals_query(daily_rows().lazy()).collect())
+
+        assert dao.lookup(D2).sort("ticker").to_dict(as_series=False) == {
+            "ticker": ["AAA", "BBB"],
+            "barrid": ["X", "Y"],
+        }
+
+        by_date = dao.lookup_dates([D2, D3]).sort("date", "ticker")
+        assert by_date.filter(pl.col("date").eq(D3))["barrid"].to_list() == ["X", "Z", "W"]
+        assert by_date.height == 5
+
+        between = dao.lookup_between(D2, D3).sort("ticker", "valid_from")
+        assert between["valid_from"].to_list() == [D2, D2, D3, D3]
+        assert between["valid_to"].to_list() == [D3, D2, D3, D3]
@@ -0,0 +1,166 @@
+import datetime as dt
+import os
+import time
+
+import polars as pl
+import pytest
+
+from sf_trader.dal.broker.order_journal import ACK, INTENT, RECORD_SIZE, OrderJournal
+
+
+DATA_DATE = dt.date(2026, 10, 16)
+
+
+def make_orders() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "ticker": ["AAPL", "BRK.B", "MSFT"],
+            "price": [200.0, 400.0, 100.0],
+            "shares": [10.0, 5.0, 7.0],
+            "action": ["BUY", "SELL", "BUY"],
+        }
+    )
+
+
+class TestOrderJournal:
+    def test_resume_returns_orders_never_acked(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path, batch_size=2)
+        assert journal.begin(make_orders(), DATA_DATE) == 1
+        journal.ack(2)
+        journal.close()
+
+        # A fresh process only has the file to go on
+        resumed = OrderJournal(path)
+        unacked = resumed.resume(DATA_DATE)
+
+        assert resumed.run == 1
+        assert unacked.cast({"ticker": pl.String}).rows() == [
+            ("AAPL", 200.0, 10.0, "BUY"),
+            ("BRK.B", 400.0, 5.0, "SELL"),
+        ]
+
+        # Acks from the resumed submission land on the same run
+        resumed.ack(0)
+        resumed.ack(1)
+        resumed.close()
+
+        assert OrderJournal(path).resume(DATA_DATE).is_empty()
+        assert os.path.getsize(path) == 6 * RECORD_SIZE
+
+    def test_acks_match_orders_by_row_when_tickers_repeat(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "AAPL", "MSFT"],
+                "price": [200.0, 200.0, 100.0],
+                "shares": [5.0, 3.0, 1.0],
+                "action": ["BUY", "SELL", "BUY"],
+            }
+        )
+
+        journal = OrderJournal(path)
+        journal.begin(orders, DATA_DATE)
+        journal.ack(1)
+        journal.close()
+
+        resumed = OrderJournal(path)
+        assert resumed.resume(DATA_DATE).cast({"ticker": pl.String}).rows() == [
+            ("AAPL", 200.0, 5.0, "BUY"),
+            ("MSFT", 100.0, 1.0, "BUY"),
+        ]
+
+        # Rows of the resumed frame map back to their seq in the run
+        resumed.ack(1)
+        resumed.close()
+
+        assert OrderJournal(path).resume(DATA_DATE).cast({"ticker": pl.String}).rows() == [
+            ("AAPL", 200.0, 5.0, "BUY"),
+        ]
+
+        journal = OrderJournal(path)
+        journal.resume(DATA_DATE)
+        journal.ack(0)
+        journal.close()
+
+        assert OrderJournal(path).resume(DATA_DATE).is_empty()
+
+    def test_acks_are_buffered_until_the_group_fills(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path, batch_size=2, flush_interval=60)
+        journal.begin(make_orders(), DATA_DATE)
+        journal.ack(0)
+
+        assert journal.read()["kind"].to_list() == [INTENT] * 3
+
+        journal.ack(1)
+
+        assert journal.read()["kind"].to_list() == [INTENT] * 3 + [ACK] * 2
+
+    def test_buffered_acks_flush_once_the_interval_passes(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path, batch_size=64, flush_interval=0.05)
+        journal.begin(make_orders(), DATA_DATE)
+        journal.ack(0)
+
+        # No further ack arrives, the timer alone makes it durable
+        deadline = time.monotonic() + 5
+        while journal.read()["kind"].to_list() != [INTENT] * 3 + [ACK]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        journal.close()
+
+    def test_resume_refuses_a_run_for_another_data_date(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path)
+        journal.begin(make_orders(), DATA_DATE)
+        journal.close()
+
+        assert OrderJournal(path).read()["date"].unique().to_list() == [DATA_DATE]
+
+        with pytest.raises(ValueError, match="2026-10-16"):
+            OrderJournal(path).resume(dt.date(2026, 10, 19))
+
+    def test_retained_rows_map_acks_to_their_seq(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path)
+        journal.begin(make_orders(), DATA_DATE)
+        journal.close()
+
+        # Only the last two orders are still needed and posted
+        resumed = OrderJournal(path)
+        resumed.resume(DATA_DATE)
+        resumed.retain([1, 2])
+        resumed.ack(1)
+        resumed.close()
+
+        assert OrderJournal(path).resume(DATA_DATE).cast({"ticker": pl.String}).rows() == [
+            ("AAPL", 200.0, 10.0, "BUY"),
+            ("BRK.B", 400.0, 5.0, "SELL"),
+        ]
+
+    def test_torn_tail_is_ignored_and_cut_before_appending(self, tmp_path):
+        path = str(tmp_path / "journal.bin")
+
+        journal = OrderJournal(path)
+        journal.begin(make_orders(), DATA_DATE)
+        journal.close()
+
+        # A crash mid write leaves part of a record behind
+        with open(path, "ab") as f:
+            f.write(b"\x02\x00\x01")
+
+        assert OrderJournal(path).resume(DATA_DATE).height == 3
+
+        journal = OrderJournal(path)
+        assert journal.begin(make_orders().head(1), DATA_DATE) == 2
+        journal.close()
+
+        assert os.path.getsize(path) == 4 * RECORD_SIZE
+        assert OrderJournal(path).read()["run"].to_list() == [1, 1, 1, 2]
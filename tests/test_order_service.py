@@ -1,6 +1,14 @@
+import datetime as dt
+
 import polars as pl
+import pytest
 from polars.testing import assert_frame_equal
 
+from sf_trader.dal.broker.order_journal import OrderJournal
+from sf_trader.dal.dao.stage_cache_dao import StageCacheDAO
+from sf_trader.dal.models.no_trade_bands import NoTradeBands
+from sf_trader.dal.models.pre_trade_limits import PreTradeLimits
+from sf_trader.dal.models.ticker_dictionary import TICKER_DTYPE, decode_tickers, encode_tickers
 from sf_trader.service.order_service import OrderService
 
 
@@ -157,6 +165,167 @@ class TestOrderService:
 
         assert_frame_equal(result, expected)
 
+    def test_get_order_deltas_joins_on_encoded_tickers(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.ignore_tickers = ["TSLA"]
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        prices = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "TSLA"],
+                "price": [200.0, 100.0, 300.0],
+            }
+        ).pipe(encode_tickers)
+
+        current_shares = pl.DataFrame(
+            {
+                "ticker": ["MSFT", "AAPL"],
+                "shares": [5.0, 1.0],
+            }
+        ).pipe(encode_tickers)
+
+        optimal_shares = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "TSLA"],
+                "shares": [3.0, 4.0, 1.0],
+            }
+        ).pipe(encode_tickers)
+
+        result = service.get_order_deltas(
+            prices=prices,
+            current_shares=current_shares,
+            optimal_shares=optimal_shares,
+        )
+
+        expected = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+                "shares": [2.0, 1.0],
+                "action": ["BUY", "SELL"],
+            }
+        )
+
+        assert result.schema["ticker"] == TICKER_DTYPE
+        assert_frame_equal(decode_tickers(result), expected)
+
+    def test_get_order_deltas_applies_no_trade_bands(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.no_trade_bands = NoTradeBands(
+            pct_target_weight=0.05, min_notional=500.0, min_shares=5.0
+        )
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        prices = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT", "NVDA", "ZG"],
+                "price": [200.0, 100.0, 10.0, 100.0, 10.0],
+            }
+        )
+        current_shares = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "NVDA", "ZG"],
+                "shares": [100.0, 100.0, 1000.0, 2.0],
+            }
+        )
+        optimal_shares = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT", "NVDA"],
+                "shares": [102.0, 200.0, 30.0, 1020.0],
+            }
+        )
+
+        orders = service.get_order_deltas(
+            prices=prices, current_shares=current_shares, optimal_shares=optimal_shares
+        )
+
+        # ZG is a small trade but closes the position, so no band holds it back
+        assert orders.select("ticker", "shares", "action").rows() == [
+            ("GOOG", 100.0, "BUY"),
+            ("ZG", 2.0, "SELL"),
+        ]
+
+        removals = service.get_band_removals(
+            prices=prices, current_shares=current_shares, optimal_shares=optimal_shares
+        )
+
+        assert removals.rows() == [
+            ("min-notional", 1, 30.0, 300.0),
+            ("min-shares", 1, 2.0, 400.0),
+            ("pct-target-weight", 1, 20.0, 2000.0),
+        ]
+
+    def test_get_order_deltas_nets_open_orders(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        prices = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "NVDA"],
+                "price": [200.0, 100.0, 50.0],
+            }
+        ).pipe(encode_tickers)
+        current_shares = pl.DataFrame(
+            {
+                "ticker": ["MSFT", "NVDA"],
+                "shares": [5.0, 10.0],
+            }
+        ).pipe(encode_tickers)
+        optimal_shares = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "NVDA"],
+                "shares": [10.0, 12.0],
+            }
+        ).pipe(encode_tickers)
+        open_orders = pl.DataFrame(
+            {
+                "order_id": [1, 2, 3, 4],
+                "ticker": ["AAPL", "AAPL", "MSFT", "NVDA"],
+                "action": ["BUY", "BUY", "SELL", "BUY"],
+                "shares": [3.0, 5.0, 5.0, 4.0],
+                "remaining": [3.0, 1.0, 5.0, 4.0],
+            }
+        ).pipe(encode_tickers)
+
+        orders = service.get_order_deltas(
+            prices=prices,
+            current_shares=current_shares,
+            optimal_shares=optimal_shares,
+            open_orders=open_orders,
+        )
+
+        # AAPL has 4 working, MSFT's exit is working, NVDA's working buy overshoots by 2
+        assert orders.pipe(decode_tickers).select("ticker", "shares", "action").rows() == [
+            ("AAPL", 6.0, "BUY"),
+            ("NVDA", 2.0, "SELL"),
+        ]
+
     def test_get_write_orders_reads_computes_writes_and_returns_orders(
         self,
         fake_config,
@@ -197,7 +366,7 @@ class TestOrderService:
         portfolio_dao.get_prices_by_date.assert_called_once()
 
         called_kwargs = portfolio_dao.get_prices_by_date.call_args.kwargs
-        assert called_kwargs["date"] == "2026-03-25"
+        assert called_kwargs["date"] == dt.date(2026, 3, 25)
         assert set(called_kwargs["tickers"]) == {"AAPL", "MSFT"}
 
         surface_dao.write_orders.assert_called_once()
@@ -232,6 +401,12 @@ class TestOrderService:
         )
 
         surface_dao.read_orders.return_value = orders
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL"],
+                "shares": [2.0],
+            }
+        )
 
         service = OrderService(
             config=fake_config,
@@ -242,7 +417,242 @@ class TestOrderService:
         service.post_orders()
 
         surface_dao.read_orders.assert_called_once()
-        fake_config.broker.post_orders.assert_called_once_with(orders=orders)
+        fake_config.broker.post_orders.assert_called_once()
+        assert_frame_equal(fake_config.broker.post_orders.call_args.kwargs["orders"], orders)
+
+    def test_post_orders_only_posts_what_fills_and_open_orders_leave(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        surface_dao.read_orders.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "price": [200.0, 100.0, 400.0],
+                "shares": [10.0, 8.0, 5.0],
+                "action": ["BUY", "BUY", "SELL"],
+            }
+        ).pipe(encode_tickers)
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG"],
+                "shares": [10.0, 8.0],
+            }
+        ).pipe(encode_tickers)
+
+        # An earlier run filled 4 AAPL and 3 GOOG is still working
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [4.0, 5.0],
+            }
+        ).pipe(encode_tickers)
+        fake_config.broker.get_open_orders.return_value = pl.DataFrame(
+            {
+                "order_id": [1, 2],
+                "ticker": ["AAPL", "GOOG"],
+                "action": ["BUY", "BUY"],
+                "shares": [10.0, 8.0],
+                "remaining": [6.0, 3.0],
+            }
+        ).pipe(encode_tickers)
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        service.post_orders()
+
+        posted = fake_config.broker.post_orders.call_args.kwargs["orders"]
+        assert posted.pipe(decode_tickers).select("ticker", "shares", "action").rows() == [
+            ("GOOG", 5.0, "BUY"),
+            ("MSFT", 5.0, "SELL"),
+        ]
+
+    def test_get_residual_orders_splits_residual_across_repeated_orders(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "AAPL", "AAPL"],
+                "price": [200.0, 100.0, 200.0, 200.0],
+                "shares": [6.0, 3.0, 6.0, 6.0],
+                "action": ["BUY", "BUY", "BUY", "BUY"],
+            }
+        ).pipe(encode_tickers)
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [10.0, 3.0],
+            }
+        ).pipe(encode_tickers)
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL"],
+                "shares": [2.0],
+            }
+        ).pipe(encode_tickers)
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        result = service.get_residual_orders(orders)
+
+        # 8 AAPL are still needed: the first order keeps 6, the second gets 2, the third none
+        assert result.pipe(decode_tickers).select("ticker", "shares", "action").rows() == [
+            ("AAPL", 6.0, "BUY"),
+            ("MSFT", 3.0, "BUY"),
+            ("AAPL", 2.0, "BUY"),
+        ]
+
+    def test_post_orders_resume_posts_only_unacked_orders(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+        tmp_path,
+    ):
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+                "shares": [2.0, 4.0],
+                "action": ["BUY", "SELL"],
+            }
+        ).pipe(encode_tickers)
+        surface_dao.read_orders.return_value = orders
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"], "shares": [2.0]}
+        ).pipe(encode_tickers)
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {"ticker": ["MSFT"], "shares": [4.0]}
+        ).pipe(encode_tickers)
+
+        # The connection drops after the first order is accepted
+        def disconnect_after_first(orders, on_submitted=None):
+            on_submitted(0)
+            raise ConnectionError("Lost connection to TWS")
+
+        fake_config.broker.post_orders.side_effect = disconnect_after_first
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            order_journal=OrderJournal(str(tmp_path / "journal.bin")),
+        )
+
+        with pytest.raises(ConnectionError):
+            service.post_orders()
+
+        fake_config.broker.post_orders.side_effect = None
+        fake_config.broker.get_positions.reset_mock()
+
+        service.post_orders(resume=True)
+
+        # Unacked orders are still netted against the broker's book
+        fake_config.broker.get_positions.assert_called_once_with()
+        posted = fake_config.broker.post_orders.call_args.kwargs["orders"]
+        assert posted.pipe(decode_tickers).select("ticker", "shares", "action").rows() == [
+            ("MSFT", 4.0, "SELL"),
+        ]
+
+    def test_post_orders_blocked_by_pre_trade_violations(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.pre_trade_limits = PreTradeLimits(restricted_tickers=["AAPL"])
+        fake_config.broker.get_account_value.return_value = 1e6
+        surface_dao.read_orders.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL"],
+                "price": [200.0],
+                "shares": [2.0],
+                "action": ["BUY"],
+            }
+        ).pipe(encode_tickers)
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"], "shares": [2.0]}
+        ).pipe(encode_tickers)
+        surface_dao.read_restricted_tickers.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"]}
+        ).pipe(encode_tickers)
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"], "price": [200.0]}
+        ).pipe(encode_tickers)
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        service.post_orders()
+
+        fake_config.broker.post_orders.assert_not_called()
+
+    def test_check_orders_reports_each_violation(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.pre_trade_limits = PreTradeLimits(
+            max_order_notional=50_000.0,
+            max_order_pct_account=0.1,
+            max_gross_turnover_pct=0.5,
+            max_price_deviation_pct=0.1,
+        )
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "NVDA", "ZG", "BAD"],
+                "price": [200.0, 400.0, 0.0, 50.0, 10.0],
+                "shares": [10.0, 200.0, 5.0, 1.0, 1.0],
+                "action": ["BUY", "SELL", "BUY", "BUY", "SELL"],
+            }
+        ).pipe(encode_tickers)
+        reference_prices = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "NVDA", "BAD"],
+                "price": [201.0, 300.0, 100.0, 10.0],
+            }
+        ).pipe(encode_tickers)
+        restricted_tickers = pl.DataFrame({"ticker": ["BAD"]}).pipe(encode_tickers)
+
+        violations = service.check_orders(
+            orders, reference_prices, 100_000.0, restricted_tickers
+        ).pipe(decode_tickers)
+
+        assert sorted(
+            violations.select(pl.col("ticker").fill_null("*"), "check").rows()
+        ) == [
+            ("*", "max_gross_turnover_pct"),
+            ("BAD", "restricted"),
+            ("MSFT", "max_order_notional"),
+            ("MSFT", "max_order_pct_account"),
+            ("MSFT", "max_price_deviation_pct"),
+            ("NVDA", "invalid_price"),
+            ("NVDA", "max_price_deviation_pct"),
+            ("ZG", "missing_reference_price"),
+        ]
 
     def test_cancel_orders_calls_broker_cancel_orders(
         self,
@@ -258,4 +668,75 @@ class TestOrderService:
 
         service.cancel_orders()
 
-        fake_config.broker.cancel_orders.assert_called_once()
\ No newline at end of file
+        fake_config.broker.cancel_orders.assert_called_once()
+
+    def test_cancel_orders_passes_filters_to_broker(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+        )
+
+        service.cancel_orders(tickers=["AAPL"], action="SELL")
+
+        fake_config.broker.cancel_orders.assert_called_once_with(
+            tickers=["AAPL"], action="SELL", global_cancel=False
+        )
+
+    def test_get_write_orders_reuses_stage_cache_until_positions_change(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+        tmp_path,
+    ):
+        portfolio_dao.get_input_files.return_value = []
+        surface_dao.read_portfolio.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [3.0, 4.0],
+            }
+        ).pipe(encode_tickers)
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [1.0, 5.0],
+            }
+        ).pipe(encode_tickers)
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+            }
+        ).pipe(encode_tickers)
+
+        service = OrderService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            stage_cache_dao=StageCacheDAO(str(tmp_path)),
+        )
+
+        first = service.get_write_orders()
+        second = service.get_write_orders()
+
+        portfolio_dao.get_prices_by_date.assert_called_once()
+        assert_frame_equal(second.pipe(decode_tickers), first.pipe(decode_tickers))
+        assert surface_dao.write_orders.call_count == 2
+
+        # A fill moves the positions, which invalidates the cached orders
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [3.0, 5.0],
+            }
+        ).pipe(encode_tickers)
+        third = service.get_write_orders()
+
+        assert portfolio_dao.get_prices_by_date.call_count == 2
+        assert third["ticker"].cast(pl.String).to_list() == ["MSFT"]
@@ -0,0 +1,71 @@
+import threading
+
+from sf_trader.dal.broker.order_tracker import MergedOrderTracker, OrderTracker
+
+
+class TestOrderTracker:
+    def test_fills_reflect_latest_status_per_order(self):
+        tracker = OrderTracker(batch_size=2)
+        tracker.record_order(1, "AAPL", "BUY", 10.0)
+        tracker.record_order(2, "MSFT", "SELL", 5.0)
+        tracker.record_order(1, "AAPL", "BUY", 10.0)
+        tracker.record_status(1, "Submitted", 4.0, 6.0, 200.0)
+        tracker.record_status(1, "Filled", 10.0, 0.0, 201.0)
+
+        fills = tracker.fills().cast({"ticker": str}).sort("order_id")
+
+        assert fills["ticker"].to_list() == ["AAPL", "MSFT"]
+        assert fills["status"].to_list() == ["Filled", "Submitted"]
+        assert fills["filled"].to_list() == [10.0, 0.0]
+        assert fills["remaining"].to_list() == [0.0, 5.0]
+        assert not tracker.is_complete()
+
+        tracker.record_status(2, "Cancelled", 0.0, 5.0, 0.0)
+        assert tracker.is_complete()
+
+    def test_stream_ends_when_orders_complete(self):
+        tracker = OrderTracker()
+        tracker.record_order(1, "AAPL", "BUY", 10.0)
+        threading.Timer(0.05, tracker.record_status, (1, "Filled", 10.0, 0.0, 200.0)).start()
+
+        updates = list(tracker.stream(timeout=5, poll_interval=1))
+
+        assert updates[-1]["status"].to_list() == ["Filled"]
+
+    def test_persist_writes_only_new_batches(self, tmp_path):
+        tracker = OrderTracker(batch_size=2)
+        tracker.record_order(1, "AAPL", "BUY", 10.0)
+        tracker.record_status(1, "Submitted", 0.0, 10.0, 0.0)
+
+        first = tracker.persist(str(tmp_path))
+        second = tracker.persist(str(tmp_path))
+
+        tracker.record_execution("e1", 1, "AAPL", "BOT", 10.0, 200.0)
+        third = tracker.persist(str(tmp_path))
+
+        assert len(first) == 2
+        assert second == []
+        assert len(third) == 1 and "executions" in third[0]
+
+    def test_merged_tracker_combines_connections(self, tmp_path):
+        first, second = OrderTracker(), OrderTracker()
+        merged = MergedOrderTracker({1: first, 2: second})
+
+        # Order IDs are only unique per connection
+        first.record_order(1, "AAPL", "BUY", 10.0)
+        second.record_order(1, "MSFT", "SELL", 5.0)
+        first.record_status(1, "Filled", 10.0, 0.0, 200.0)
+
+        fills = merged.fills().cast({"ticker": str})
+
+        assert fills["ticker"].to_list() == ["AAPL", "MSFT"]
+        assert not merged.is_complete()
+
+        threading.Timer(0.05, second.record_status, (1, "Filled", 5.0, 0.0, 100.0)).start()
+        updates = list(merged.stream(timeout=5, poll_interval=1))
+
+        assert updates[-1]["status"].to_list() == ["Filled", "Filled"]
+
+        paths = merged.persist(str(tmp_path))
+        assert any("client_1" in path for path in paths)
+        assert any("client_2" in path for path in paths)
@@ -0,0 +1,79 @@
+import datetime as dt
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.models.table_model import TableName
+
+
+def make_assets() -> pl.DataFrame:
+    dates = [dt.date(2024, 12, 30), dt.date(2024, 12, 31), dt.date(2025, 1, 2), dt.date(2026, 1, 2)]
+    return pl.DataFrame(
+        {
+            "date": [date for date in dates for _ in range(2)],
+            "ticker": ["MSFT", "AAPL"] * len(dates),
+            "price": [float(i) for i in range(2 * len(dates))],
+            "barrid": ["USA1", "USA2"] * len(dates),
+        }
+    )
+
+
+class TestPortfolioDAO:
+    def test_sink_prices_between_matches_the_collected_prices(
+        self, catalog, write_table, tmp_path
+    ):
+        write_table(TableName.ASSETS, make_assets())
+        portfolio_dao = PortfolioDAO(catalog=catalog, streaming=True)
+        path = str(tmp_path / "out" / "prices.parquet")
+
+        start, end = dt.date(2024, 12, 31), dt.date(2026, 1, 2)
+        portfolio_dao.sink_prices_between(start, end, path, tickers=["AAPL", "MSFT"])
+
+        sunk = pl.read_parquet(path)
+        collected = portfolio_dao.get_prices_between(start, end, tickers=["AAPL", "MSFT"])
+
+        # Projection pushdown keeps only the queried columns, sorted across the years
+        assert sunk.columns == ["date", "ticker", "price"]
+        assert_frame_equal(sunk, collected)
+        assert collected["date"].to_list() == [dt.date(2024, 12, 31)] * 2 + [
+            dt.date(2025, 1, 2)
+        ] * 2 + [dt.date(2026, 1, 2)] * 2
+        assert collected["ticker"].cast(pl.String).to_list() == ["AAPL", "MSFT"] * 3
+        assert not [name for name in (tmp_path / "out").iterdir() if name.name.startswith(".")]
+
+    def test_sink_skips_years_without_files(self, catalog, write_table, tmp_path):
+        write_table(TableName.ASSETS, make_assets().filter(pl.col("date").dt.year() != 2025))
+        portfolio_dao = PortfolioDAO(catalog=catalog, streaming=True)
+        path = str(tmp_path / "prices.parquet")
+
+        portfolio_dao.sink_prices_between(dt.date(2024, 1, 1), dt.date(2026, 12, 31), path)
+
+        assert pl.read_parquet(path)["date"].unique().sort().to_list() == [
+            dt.date(2024, 12, 30),
+            dt.date(2024, 12, 31),
+            dt.date(2026, 1, 2),
+        ]
+
+    def test_between_reads_cross_the_year_boundary(self, catalog, write_table):
+        write_table(TableName.ASSETS, make_assets())
+        write_table(
+            TableName.OPTIMAL_WEIGHTS,
+            make_assets().select("date", "ticker", pl.col("price").alias("weight")),
+        )
+        portfolio_dao = PortfolioDAO(catalog=catalog)
+
+        start, end = dt.date(2024, 12, 31), dt.date(2025, 1, 2)
+        prices = portfolio_dao.get_prices_between(start, end, tickers=["AAPL"])
+        weights = portfolio_dao.get_optimal_weights_between(start, end)
+
+        assert prices.cast({"ticker": pl.String}).rows() == [
+            (dt.date(2024, 12, 31), "AAPL", 3.0),
+            (dt.date(2025, 1, 2), "AAPL", 5.0),
+        ]
+        assert weights.cast({"ticker": pl.String}).rows() == [
+            (dt.date(2024, 12, 31), "AAPL", 3.0),
+            (dt.date(2024, 12, 31), "MSFT", 2.0),
+            (dt.date(2025, 1, 2), "AAPL", 5.0),
+            (dt.date(2025, 1, 2), "MSFT", 4.0),
+        ]
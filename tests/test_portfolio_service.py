@@ -1,6 +1,13 @@
+import datetime as dt
+from unittest.mock import create_autospec
+
+import numpy as np
 import polars as pl
 from polars.testing import assert_frame_equal
 
+from sf_trader.dal.dao.stage_cache_dao import StageCacheDAO
+from sf_trader.dal.models.ticker_dictionary import decode_tickers, encode_tickers
+from sf_trader.service.calculate_service import CalculateService
 from sf_trader.service.portfolio_service import PortfolioService
 
 
@@ -96,15 +103,15 @@ class TestPortfolioService:
         service.get_write_portfolio()
 
         portfolio_dao.get_universe_by_date.assert_called_once_with(
-            date="2026-03-25"
+            date=dt.date(2026, 3, 25)
         )
         fake_config.broker.get_account_value.assert_called_once()
         portfolio_dao.get_prices_by_date.assert_called_once_with(
-            date="2026-03-25",
+            date=dt.date(2026, 3, 25),
             tickers=["AAPL", "MSFT"],
         )
         portfolio_dao.get_optimal_weights_by_date.assert_called_once_with(
-            date="2026-03-25"
+            date=dt.date(2026, 3, 25)
         )
 
         surface_dao.write_portfolio.assert_called_once()
@@ -118,4 +125,152 @@ class TestPortfolioService:
             }
         )
 
-        assert_frame_equal(written_df, expected)
\ No newline at end of file
+        assert_frame_equal(written_df, expected)
+
+    def test_get_write_portfolio_reuses_stage_cache(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+        tmp_path,
+    ):
+        portfolio_dao.get_input_files.return_value = []
+        portfolio_dao.get_universe_by_date.return_value = ["AAPL", "MSFT"]
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+            }
+        )
+        portfolio_dao.get_optimal_weights_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "weight": [0.6, 0.4],
+            }
+        )
+
+        service = PortfolioService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            stage_cache_dao=StageCacheDAO(str(tmp_path)),
+        )
+
+        service.get_write_portfolio()
+        service.get_write_portfolio()
+
+        # The second run has the same inputs and is served from the cache
+        portfolio_dao.get_universe_by_date.assert_called_once()
+        assert surface_dao.write_portfolio.call_count == 2
+        assert_frame_equal(
+            surface_dao.write_portfolio.call_args_list[1].args[0].pipe(decode_tickers),
+            surface_dao.write_portfolio.call_args_list[0].args[0].pipe(decode_tickers),
+        )
+
+        service.get_write_portfolio(force=True)
+        assert portfolio_dao.get_universe_by_date.call_count == 2
+
+        # A different account value is a different key
+        fake_config.broker.get_account_value.return_value = 2000.0
+        service.get_write_portfolio()
+        assert portfolio_dao.get_universe_by_date.call_count == 3
+
+    def test_get_write_reoptimized_portfolio_keeps_held_names(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.broker.get_account_value.return_value = 10_000.0
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {
+                "ticker": ["MSFT", "GOOG"],
+                "shares": [50.0, 10.0],
+            }
+        )
+        portfolio_dao.get_benchmark_weights_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT", "GOOG", "AMZN"],
+                "weight": [0.25, 0.25, 0.25, 0.25],
+            }
+        )
+        portfolio_dao.get_optimal_weights_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "weight": [0.5, 0.5],
+            }
+        )
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "price": [100.0, 100.0, 100.0],
+            }
+        )
+        calculate_service = create_autospec(CalculateService, instance=True, spec_set=True)
+        calculate_service.get_covariance_matrix.return_value = np.diag([0.04, 0.04, 0.04])
+
+        service = PortfolioService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            calculate_service=calculate_service,
+        )
+
+        result = service.get_write_reoptimized_portfolio(turnover_penalty=0.04)
+
+        # AMZN is neither held nor targeted, so only the other three are solved over
+        calculate_service.get_covariance_matrix.assert_called_once_with(
+            tickers=["AAPL", "GOOG", "MSFT"]
+        )
+
+        # Equal risk and penalty put each name halfway between current and target,
+        # shifted equally to keep the target's fully invested budget
+        np.testing.assert_allclose(result.weights, np.array([0.25, 0.05, 0.5]) + 0.2 / 3, atol=1e-4)
+
+        written_df = surface_dao.write_portfolio.call_args.args[0].pipe(decode_tickers)
+        assert written_df.to_dict(as_series=False) == {
+            "ticker": ["AAPL", "GOOG", "MSFT"],
+            "shares": [31.0, 11.0, 56.0],
+        }
+
+    def test_get_write_reoptimized_portfolio_prefers_live_quotes(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.broker.get_account_value.return_value = 10_000.0
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {"ticker": ["MSFT"], "shares": [50.0]}
+        )
+        # GOOG has no quote and keeps the data date's price
+        fake_config.broker.get_prices.return_value = pl.DataFrame(
+            {"ticker": ["MSFT"], "price": [200.0]}
+        ).pipe(encode_tickers)
+        portfolio_dao.get_benchmark_weights_by_date.return_value = pl.DataFrame(
+            {"ticker": ["GOOG", "MSFT"], "weight": [0.5, 0.5]}
+        )
+        portfolio_dao.get_optimal_weights_by_date.return_value = pl.DataFrame(
+            {"ticker": ["GOOG", "MSFT"], "weight": [0.5, 0.5]}
+        )
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {"ticker": ["GOOG", "MSFT"], "price": [100.0, 100.0]}
+        )
+        calculate_service = create_autospec(CalculateService, instance=True, spec_set=True)
+        calculate_service.get_covariance_matrix.return_value = np.diag([0.04, 0.04])
+
+        service = PortfolioService(
+            config=fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            calculate_service=calculate_service,
+        )
+
+        service.get_write_reoptimized_portfolio(turnover_penalty=0.0, live_prices=True)
+
+        fake_config.broker.get_prices.assert_called_once_with(["GOOG", "MSFT"])
+        written_df = surface_dao.write_portfolio.call_args.args[0].pipe(decode_tickers)
+        assert written_df.to_dict(as_series=False) == {
+            "ticker": ["GOOG", "MSFT"],
+            "shares": [50.0, 25.0],
+        }
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from sf_trader.dal.broker.positions_cache import PositionsCache
+
+
+class FakeApp:
+    def __init__(self, positions: list[tuple[str, str, float]]) -> None:
+        self.position = lambda *args: None
+        self.positionEnd = lambda: None
+        self.connectionClosed = lambda: None
+        self.error = lambda *args: None
+        self.positions = positions
+        self.requests = 0
+
+    def reqPositions(self) -> None:
+        self.requests += 1
+        for account, symbol, shares in self.positions:
+            self.position(account, SimpleNamespace(symbol=symbol), shares, 0.0)
+        self.positionEnd()
+
+
+class TestPositionsCache:
+    def test_updates_are_applied_in_place_and_versioned(self):
+        app = FakeApp([("U1", "AAPL", 10.0), ("U1", "BRK B", 5.0), ("U2", "MSFT", 99.0)])
+        cache = PositionsCache(capacity=1)
+        cache.attach(app)
+
+        cache.subscribe(app)
+        cache.subscribe(app)
+        positions = cache.get_positions(timeout=1)
+        version = cache.version
+
+        assert app.requests == 1
+        assert positions.cast({"ticker": str}).rows() == [("AAPL", 10.0), ("BRK.B", 5.0)]
+        assert cache.get_positions(timeout=1) is positions
+
+        app.position("U1", SimpleNamespace(symbol="AAPL"), 0.0, 0.0)
+        app.position("U1", SimpleNamespace(symbol="ZG"), 3.0, 0.0)
+
+        assert cache.version == version + 2
+        assert cache.get_positions(timeout=1).cast({"ticker": str}).rows() == [
+            ("AAPL", 0.0),
+            ("BRK.B", 5.0),
+            ("ZG", 3.0),
+        ]
+
+    def test_lost_connection_resubscribes_on_next_use(self):
+        app = FakeApp([("U1", "AAPL", 10.0)])
+        cache = PositionsCache()
+        cache.attach(app)
+
+        cache.subscribe(app)
+        cache.get_positions(timeout=1)
+        version = cache.version
+
+        # Informational errors leave the subscription alone
+        app.error(-1, 2104, "Market data farm connection is OK", "")
+        cache.subscribe(app)
+        assert app.requests == 1
+
+        app.error(-1, 1101, "Connectivity restored, data lost", "")
+        assert cache.version > version
+
+        app.positions = [("U1", "MSFT", 4.0)]
+        cache.subscribe(app)
+        assert app.requests == 2
+        assert cache.get_positions(timeout=1).cast({"ticker": str}).rows() == [("MSFT", 4.0)]
+
+        app.connectionClosed()
+        cache.subscribe(app)
+        assert app.requests == 3
@@ -0,0 +1,79 @@
+import numpy as np
+
+from sf_trader.dal.models.reoptimizer import Reoptimizer, project_to_budget
+
+
+def random_covariance(n: int, factors: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    exposures = rng.normal(size=(n, factors)) * 0.2
+    return exposures @ exposures.T + np.diag(rng.uniform(0.01, 0.05, n))
+
+
+def objective(weights, target, current, covariance_matrix, penalty) -> float:
+    active = weights - target
+    return active @ covariance_matrix @ active + penalty * np.sum((weights - current) ** 2)
+
+
+class TestReoptimizer:
+    def test_project_to_budget_is_feasible_and_nearest(self):
+        weights = np.random.default_rng(0).normal(size=100) * 0.05
+
+        projected = project_to_budget(weights, 1.0, long_only=True)
+
+        assert np.isclose(projected.sum(), 1.0)
+        assert (projected >= 0).all()
+
+        # Any other point on the simplex is further away
+        other = np.random.default_rng(1).dirichlet(np.ones(100))
+        assert np.linalg.norm(weights - projected) <= np.linalg.norm(weights - other)
+
+        shifted = project_to_budget(weights, 0.0, long_only=False)
+        assert np.isclose(shifted.sum(), 0.0)
+
+    def test_zero_penalty_returns_the_target(self):
+        rng = np.random.default_rng(2)
+        target = rng.dirichlet(np.ones(30))
+        current = rng.dirichlet(np.ones(30))
+
+        result = Reoptimizer(random_covariance(30, 3), turnover_penalty=0.0).solve(target, current)
+
+        np.testing.assert_array_equal(result.weights, target)
+        assert result.iterations == 0
+        assert result.tracking_error == 0.0
+
+    def test_long_short_solution_matches_the_closed_form(self):
+        n, penalty = 80, 0.05
+        covariance_matrix = random_covariance(n, 4, seed=3)
+        rng = np.random.default_rng(3)
+        target = rng.normal(size=n) * 0.02
+        current = rng.normal(size=n) * 0.02
+
+        result = Reoptimizer(covariance_matrix, penalty, tolerance=1e-9).solve(target, current)
+
+        # Equality constrained quadratic: solve the KKT system directly
+        kkt = np.zeros((n + 1, n + 1))
+        kkt[:n, :n] = 2 * (covariance_matrix + penalty * np.eye(n))
+        kkt[:n, n] = kkt[n, :n] = 1.0
+        rhs = np.append(2 * (covariance_matrix @ target + penalty * current), target.sum())
+        expected = np.linalg.solve(kkt, rhs)[:n]
+
+        np.testing.assert_allclose(result.weights, expected, atol=1e-5)
+
+    def test_long_only_solution_trades_off_tracking_error_and_turnover(self):
+        n, penalty = 200, 0.1
+        covariance_matrix = random_covariance(n, 5, seed=4)
+        rng = np.random.default_rng(4)
+        target = rng.dirichlet(np.ones(n))
+        current = rng.dirichlet(np.ones(n))
+
+        result = Reoptimizer(covariance_matrix, penalty).solve(target, current)
+
+        assert np.isclose(result.weights.sum(), 1.0)
+        assert (result.weights >= 0).all()
+        assert result.iterations < 1000
+
+        # Better than either end point on the combined objective
+        value = objective(result.weights, target, current, covariance_matrix, penalty)
+        assert value < objective(target, target, current, covariance_matrix, penalty)
+        assert value < objective(current, target, current, covariance_matrix, penalty)
+        assert result.turnover < np.abs(target - current).sum()
@@ -0,0 +1,61 @@
+import datetime as dt
+
+import numpy as np
+import polars as pl
+import pytest
+
+from sf_trader.dal.dao.portfolio_dao import PortfolioDAO
+from sf_trader.dal.models.table_model import TableName
+from sf_trader.service.calculate_service import CalculateService
+from sf_trader.service.risk_history_service import compute_risk_metrics, split_dates
+
+
+class TestRiskHistoryService:
+    def test_compute_risk_metrics_matches_compute_risk(self):
+        rng = np.random.default_rng(0)
+        factors = rng.normal(size=(5, 5))
+        covariance_matrix = factors @ factors.T
+        weights = np.array([0.4, 0.3, -0.1, 0.0, 0.2])
+        benchmark = np.full(5, 0.2)
+
+        metrics = compute_risk_metrics(weights, benchmark, covariance_matrix)
+
+        assert metrics["num_long"] == 3
+        assert metrics["num_short"] == 1
+        assert metrics["num_positions"] == 4
+        assert metrics["gross_exposure"] == pytest.approx(1.0)
+        assert metrics["net_exposure"] == pytest.approx(0.8)
+        assert metrics["total_risk"] == pytest.approx(
+            CalculateService.compute_risk(weights, covariance_matrix)
+        )
+        assert metrics["active_risk"] == pytest.approx(
+            np.sqrt((weights - benchmark) @ covariance_matrix @ (weights - benchmark))
+        )
+
+    def test_split_dates_keeps_chunks_contiguous(self):
+        dates = [dt.date(2025, 12, 29) + dt.timedelta(days=day) for day in range(10)]
+
+        chunks = split_dates(dates, 4)
+
+        assert [date for chunk in chunks for date in chunk] == dates
+        assert [len(chunk) for chunk in chunks] == [3, 3, 2, 2]
+        assert split_dates(dates[:2], 4) == [[dates[0]], [dates[1]]]
+
+    def test_release_years_drops_only_earlier_years(self, monkeypatch):
+        portfolio_dao = PortfolioDAO(cache_years=True)
+        scanned = []
+
+        class FakeTable:
+            def scan(self, year: int) -> pl.LazyFrame:
+                scanned.append(year)
+                return pl.LazyFrame({"date": [dt.date(year, 1, 2)], "value": [year]})
+
+        monkeypatch.setattr(portfolio_dao, "get_table", lambda table_name: FakeTable())
+
+        portfolio_dao._scan_by_date(TableName.ASSETS, dt.date(2024, 1, 2))
+        portfolio_dao._scan_by_date(TableName.ASSETS, dt.date(2025, 1, 2))
+        portfolio_dao.release_years(before=2025)
+        portfolio_dao._scan_by_date(TableName.ASSETS, dt.date(2025, 1, 3))
+        portfolio_dao._scan_by_date(TableName.ASSETS, dt.date(2024, 1, 3))
+
+        assert scanned == [2024, 2025, 2024]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from sf_trader.dal.models.scenario_risk import ScenarioRisk, factor_covariance
+
+
+def random_covariance(n: int, factors: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    exposures = rng.normal(size=(n, factors)) * 0.2
+    return exposures @ exposures.T + np.diag(rng.uniform(0.01, 0.05, n))
+
+
+class TestScenarioRisk:
+    def test_factor_covariance_reproduces_covariance(self):
+        covariance_matrix = random_covariance(50, 5)
+
+        factor = factor_covariance(covariance_matrix)
+
+        np.testing.assert_allclose(factor @ factor.T, covariance_matrix, atol=1e-12)
+
+        # Rows of the factor reproduce the covariance of a ticker subset
+        subset = np.array([3, 7, 20])
+        np.testing.assert_allclose(
+            factor[subset] @ factor[subset].T,
+            covariance_matrix[np.ix_(subset, subset)],
+            atol=1e-12,
+        )
+
+    def test_factor_covariance_falls_back_to_eigen_for_singular_matrices(self):
+        exposures = np.random.default_rng(1).normal(size=(20, 3))
+        covariance_matrix = exposures @ exposures.T  # rank 3
+
+        factor = factor_covariance(covariance_matrix)
+
+        np.testing.assert_allclose(factor @ factor.T, covariance_matrix, atol=1e-10)
+
+    def test_var_and_expected_shortfall_match_the_normal_distribution(self):
+        covariance_matrix = random_covariance(200, 10)
+        rng = np.random.default_rng(2)
+        weights = rng.dirichlet(np.ones(200))
+        benchmark = rng.dirichlet(np.ones(200))
+        exposures = np.column_stack([weights, weights - benchmark])
+
+        engine = ScenarioRisk(factor_covariance(covariance_matrix), chunk_size=1000, seed=3)
+        pnl = engine.simulate(exposures, simulations=100_000)
+        var, expected_shortfall = ScenarioRisk.value_at_risk(pnl, 0.95)
+
+        daily_risk = np.sqrt(
+            np.einsum("ik,ij,jk->k", exposures, covariance_matrix, exposures) / 252
+        )
+        np.testing.assert_allclose(var / daily_risk, 1.645, rtol=0.03)
+        np.testing.assert_allclose(expected_shortfall / daily_risk, 2.063, rtol=0.03)
+
+        # The same seed gives the same draws
+        np.testing.assert_array_equal(engine.simulate(exposures, simulations=100_000), pnl)
+
+    def test_value_at_risk_uses_the_loss_tail(self):
+        pnl = np.arange(-50, 50, dtype=np.float64).reshape(-1, 1)
+
+        var, expected_shortfall = ScenarioRisk.value_at_risk(pnl, 0.95)
+
+        assert var[0] == pytest.approx(46.0)
+        assert expected_shortfall[0] == pytest.approx(48.0)
@@ -0,0 +1,38 @@
+import datetime as dt
+import os
+
+import numpy as np
+import polars as pl
+
+from sf_trader.dal.dao.snapshot_dao import SnapshotDAO
+
+DATE = dt.date(2026, 3, 25)
+
+
+class TestSnapshotDAO:
+    def test_covariance_round_trips_without_staging_files(self, tmp_path):
+        snapshot_dao = SnapshotDAO(str(tmp_path))
+        snapshot_dao.write_tables(DATE, {"prices": pl.DataFrame({"ticker": ["AAPL"]})})
+
+        covariance_matrix = np.array([[0.04, 0.01], [0.01, 0.09]])
+        snapshot_dao.write_covariance(DATE, ["AAPL", "MSFT"], covariance_matrix)
+
+        tickers, result = snapshot_dao.read_covariance(DATE)
+
+        assert tickers == ["AAPL", "MSFT"]
+        np.testing.assert_array_equal(result, covariance_matrix)
+        assert not [
+            name for name in os.listdir(tmp_path / DATE.isoformat()) if name.startswith(".")
+        ]
+
+    def test_covariance_out_of_step_with_its_tickers_is_ignored(self, tmp_path):
+        snapshot_dao = SnapshotDAO(str(tmp_path))
+        snapshot_dao.write_tables(DATE, {"prices": pl.DataFrame({"ticker": ["AAPL"]})})
+        snapshot_dao.write_covariance(DATE, ["AAPL", "MSFT"], np.eye(2))
+
+        # A warm that died after rewriting the tickers but before the matrix
+        pl.DataFrame({"ticker": ["AAPL", "MSFT", "NVDA"]}).write_ipc(
+            tmp_path / DATE.isoformat() / "covariance_tickers.arrow"
+        )
+
+        assert snapshot_dao.read_covariance(DATE) is None
@@ -0,0 +1,110 @@
+from unittest.mock import create_autospec
+
+import numpy as np
+import polars as pl
+
+from sf_trader.dal.models.no_trade_bands import NoTradeBands
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+from sf_trader.service.calculate_service import CalculateService
+from sf_trader.service.order_service import OrderService
+from sf_trader.service.summary_service import SummaryService
+
+
+class TestSummaryService:
+    def test_get_portfolio_summary_renders_metrics_and_positions(
+        self,
+        fake_config,
+        portfolio_dao,
+        monkeypatch,
+        capsys,
+    ):
+        shares = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "shares": [2.0, 3.0],
+            }
+        )
+
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "MSFT"],
+                "price": [200.0, 100.0],
+            }
+        )
+
+        portfolio_dao.get_benchmark_weights_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "weight": [0.5, 0.3, 0.2],
+            }
+        )
+
+        calculate_service = CalculateService(fake_config, portfolio_dao=portfolio_dao)
+        monkeypatch.setattr(
+            calculate_service,
+            "get_covariance_matrix",
+            lambda tickers, **kwargs: np.eye(len(tickers)) * 0.04,
+        )
+
+        service = SummaryService(
+            fake_config,
+            portfolio_dao=portfolio_dao,
+            calculate_service=calculate_service,
+        )
+
+        service.get_portfolio_summary(shares)
+
+        fake_config.broker.get_account_value.assert_called_once_with()
+
+        output = capsys.readouterr().out
+        assert "Portfolio Metrics" in output
+        assert "$1,000" in output
+        assert "$700" in output
+        assert "AAPL" in output
+        assert "MSFT" in output
+
+    def test_get_orders_summary_bands_net_open_orders(
+        self,
+        fake_config,
+        portfolio_dao,
+        surface_dao,
+    ):
+        fake_config.no_trade_bands = NoTradeBands(min_shares=5.0)
+        open_orders = pl.DataFrame(
+            {
+                "order_id": [1],
+                "ticker": ["AAPL"],
+                "action": ["BUY"],
+                "shares": [4.0],
+                "remaining": [4.0],
+            }
+        ).pipe(encode_tickers)
+        fake_config.broker.get_open_orders.return_value = open_orders
+        fake_config.broker.get_positions.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"], "shares": [0.0]}
+        ).pipe(encode_tickers)
+
+        shares = pl.DataFrame({"ticker": ["AAPL"], "shares": [6.0]}).pipe(encode_tickers)
+        orders = pl.DataFrame(
+            {
+                "ticker": ["AAPL"],
+                "price": [200.0],
+                "shares": [2.0],
+                "action": ["BUY"],
+            }
+        ).pipe(encode_tickers)
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {"ticker": ["AAPL"], "price": [200.0]}
+        ).pipe(encode_tickers)
+
+        order_service = create_autospec(OrderService, instance=True, spec_set=True)
+        service = SummaryService(
+            fake_config,
+            portfolio_dao=portfolio_dao,
+            surface_dao=surface_dao,
+            order_service=order_service,
+        )
+
+        service.get_orders_summary(shares=shares, orders=orders, output="summary.json")
+
+        assert order_service.get_band_removals.call_args.kwargs["open_orders"] is open_orders
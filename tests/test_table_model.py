@@ -0,0 +1,50 @@
+import datetime as dt
+import os
+
+import polars as pl
+
+from sf_trader.dal.models.table_model import TableName
+
+
+def make_weights() -> pl.DataFrame:
+    dates = [dt.date(2023, 6, 1), dt.date(2024, 12, 31), dt.date(2025, 1, 2), dt.date(2026, 6, 1)]
+    return pl.DataFrame(
+        {
+            "date": dates,
+            "ticker": ["AAPL", "MSFT", "GOOG", "AMZN"],
+            "weight": [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+
+
+class TestTable:
+    def test_files_between_selects_overlapping_years(self, catalog, write_table):
+        write_table(TableName.OPTIMAL_WEIGHTS, make_weights())
+        table = catalog.get_table(TableName.OPTIMAL_WEIGHTS)
+
+        assert [os.path.basename(file) for file in table.files_between(2024, 2025)] == [
+            "optimal_weights_2024.parquet",
+            "optimal_weights_2025.parquet",
+        ]
+        assert table.files_between(2027, 2028) == []
+
+    def test_scan_between_opens_only_overlapping_years(self, catalog, write_table, monkeypatch):
+        write_table(TableName.OPTIMAL_WEIGHTS, make_weights())
+        table = catalog.get_table(TableName.OPTIMAL_WEIGHTS)
+
+        scanned = []
+        scan_parquet = pl.scan_parquet
+        monkeypatch.setattr(
+            pl,
+            "scan_parquet",
+            lambda files, **kwargs: scanned.append(files) or scan_parquet(files, **kwargs),
+        )
+
+        # The range crosses Dec 31 and the rows just outside it are excluded
+        result = table.scan_between(dt.date(2024, 12, 31), dt.date(2025, 1, 2)).collect()
+
+        assert [os.path.basename(file) for file in scanned[0]] == [
+            "optimal_weights_2024.parquet",
+            "optimal_weights_2025.parquet",
+        ]
+        assert result["date"].to_list() == [dt.date(2024, 12, 31), dt.date(2025, 1, 2)]
@@ -0,0 +1,30 @@
+import polars as pl
+
+from sf_trader.service.ui_service import UIService
+
+
+class TestUIService:
+    def test_format_number_matches_python_formatting(self):
+        values = [0.0, 1234567.891, -999.25, 0.5, 123456.0]
+        frame = pl.DataFrame({"value": values + [None, float("nan")]})
+
+        formatted = frame.select(
+            UIService.format_number(pl.col("value")).alias("whole"),
+            UIService.format_number(pl.col("value"), decimals=2, prefix="$").alias("dollars"),
+            UIService.format_number(pl.col("value"), decimals=2, suffix="%", scale=100).alias(
+                "percent"
+            ),
+        )
+
+        assert formatted["whole"].to_list() == [f"{value:,.0f}" for value in values] + [
+            "N/A",
+            "N/A",
+        ]
+        assert formatted["dollars"].to_list()[:5] == [
+            "$0.00",
+            "$1,234,567.89",
+            "-$999.25",
+            "$0.50",
+            "$123,456.00",
+        ]
+        assert formatted["percent"].to_list()[:5] == [f"{value:,.2%}" for value in values]
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from unittest.mock import create_autospec
+
+import numpy as np
+import polars as pl
+
+from sf_trader.dal.models.ticker_dictionary import encode_tickers
+from sf_trader.service.calculate_service import CalculateService
+from sf_trader.service.watch_service import WatchService
+
+
+class TestWatchService:
+    def test_refresh_only_updates_changed_rows(self, fake_config, portfolio_dao, monkeypatch):
+        portfolio_dao.get_benchmark_weights_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "weight": [0.5, 0.3, 0.2],
+            }
+        ).pipe(encode_tickers)
+        portfolio_dao.get_prices_by_date.return_value = pl.DataFrame(
+            {
+                "ticker": ["AAPL", "GOOG", "MSFT"],
+                "price": [200.0, 150.0, 100.0],
+            }
+        ).pipe(encode_tickers)
+
+        broker = fake_config.broker
+        positions_cache = SimpleNamespace(version=1)
+        broker.get_positions_cache.return_value = positions_cache
+        broker.get_positions.return_value = pl.DataFrame(
+            {"ticker": ["AAPL", "MSFT"], "shares": [10.0, 5.0]}
+        ).pipe(encode_tickers)
+
+        calculate_service = create_autospec(CalculateService, instance=True, spec_set=True)
+        calculate_service.get_covariance_matrix.side_effect = (
+            lambda tickers, **kwargs: np.eye(len(tickers)) * 0.04
+        )
+
+        service = WatchService(
+            fake_config, portfolio_dao=portfolio_dao, calculate_service=calculate_service
+        )
+        service.start()
+
+        updates = []
+        update = service.risk.update
+        monkeypatch.setattr(
+            service.risk,
+            "update",
+            lambda index, dollars: updates.append((index, dollars)) or update(index, dollars),
+        )
+
+        # Same cache version, positions are not read again
+        assert service.refresh() == 0
+        assert broker.get_positions.call_count == 1
+        assert updates[-1][0].size == 0
+
+        positions_cache.version = 2
+        broker.get_positions.return_value = pl.DataFrame(
+            {"ticker": ["AAPL", "MSFT"], "shares": [10.0, 8.0]}
+        ).pipe(encode_tickers)
+
+        assert service.refresh() == 1
+
+        index, dollars = updates[-1]
+        msft = np.flatnonzero(service.tickers == "MSFT")
+        np.testing.assert_array_equal(index, np.searchsorted(service._benchmark_index, msft))
+        np.testing.assert_array_equal(dollars, [800.0])
+        assert service.get_metrics().dollars_allocated == 2800.0